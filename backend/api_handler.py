@@ -4,33 +4,47 @@ import os
 from argparse import Namespace
 from time import perf_counter
 
-from ariadne import (
-    gql,
-    graphql_sync,
-)
+start = perf_counter()
 
 from dataall.api.Objects import bootstrap as bootstrap_schema, get_executable_schema
+from dataall.api.query_cache import (
+    get_document_cache,
+    graphql_cached,
+    load_operations,
+)
 from dataall.aws.handlers.service_handlers import Worker
 from dataall.aws.handlers.sqs import SqsQueue
 from dataall.db import init_permissions, get_engine, api, permissions
-from dataall.searchproxy import connect
+from dataall.searchproxy import LazyConnection
 
 logger = logging.getLogger()
 logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO'))
 log = logging.getLogger(__name__)
 
-start = perf_counter()
+imported = perf_counter()
 for name in ['boto3', 's3transfer', 'botocore', 'boto']:
     logging.getLogger(name).setLevel(logging.ERROR)
 
+# Validated SDL generated at package time, see api.Objects.save_type_defs
+TYPE_DEFS_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'schema.prebuilt.graphql'
+)
 SCHEMA = bootstrap_schema()
-TYPE_DEFS = gql(SCHEMA.gql(with_directives=False))
 ENVNAME = os.getenv('envname', 'local')
 ENGINE = get_engine(envname=ENVNAME)
-ES = connect(envname=ENVNAME)
+ES = LazyConnection(envname=ENVNAME)
 Worker.queue = SqsQueue.send
 
-init_permissions(ENGINE)
+PERMISSIONS_INITIALIZED = False
+KNOWN_TENANT_GROUPS = api.get_tenant_groups_cache()
+
+
+def ensure_permissions():
+    """Runs init_permissions once, on the first invocation instead of at import"""
+    global PERMISSIONS_INITIALIZED
+    if not PERMISSIONS_INITIALIZED:
+        init_permissions(ENGINE)
+        PERMISSIONS_INITIALIZED = True
 
 
 def resolver_adapter(resolver):
@@ -51,9 +65,21 @@ def resolver_adapter(resolver):
     return adapted
 
 
-executable_schema = get_executable_schema()
+executable_schema = get_executable_schema(
+    schema=SCHEMA, type_defs_path=TYPE_DEFS_PATH
+)
+DOCUMENT_CACHE = get_document_cache()
+schema_built = perf_counter()
+# Parses and validates the frontend operations saved at package time,
+# see api.query_cache.save_operations
+if os.getenv('GRAPHQL_DOCUMENT_CACHE_WARM_UP', 'false').lower() == 'true':
+    DOCUMENT_CACHE.warm_up(executable_schema, load_operations())
 end = perf_counter()
-print(f'Lambda Context ' f'Initialization took: {end - start:.3f} sec')
+print(
+    f'Lambda Context Initialization took: {end - start:.3f} sec '
+    f'(imports: {imported - start:.3f} sec, schema: {schema_built - imported:.3f} sec, '
+    f'warm up of {len(DOCUMENT_CACHE)} documents: {end - schema_built:.3f} sec)'
+)
 
 
 def get_groups(claims):
@@ -111,25 +137,24 @@ def handler(event, context):
             },
         }
 
+    ensure_permissions()
+
     if 'authorizer' in event['requestContext']:
         username = event['requestContext']['authorizer']['claims']['email']
         try:
             groups = get_groups(event['requestContext']['authorizer']['claims'])
             with ENGINE.scoped_session() as session:
-                for group in groups:
-                    policy = api.TenantPolicy.find_tenant_policy(
-                        session, group, 'dataall'
+                attached = api.TenantPolicy.ensure_groups_tenant_policy(
+                    session=session,
+                    groups=groups,
+                    permissions=permissions.TENANT_ALL,
+                    tenant_name='dataall',
+                    known_groups=KNOWN_TENANT_GROUPS,
+                )
+                if attached:
+                    print(
+                        f'No policy found for Teams {attached}. Attaching TENANT_ALL permissions'
                     )
-                    if not policy:
-                        print(
-                            f'No policy found for Team {group}. Attaching TENANT_ALL permissions'
-                        )
-                        api.TenantPolicy.attach_group_tenant_policy(
-                            session=session,
-                            group=group,
-                            permissions=permissions.TENANT_ALL,
-                            tenant_name='dataall',
-                        )
 
         except Exception as e:
             print(f'Error managing groups due to: {e}')
@@ -147,9 +172,18 @@ def handler(event, context):
         raise Exception(f'Could not initialize user context from event {event}')
 
     query = json.loads(event.get('body'))
-    success, response = graphql_sync(
-        schema=executable_schema, data=query, context_value=app_context
-    )
+    with api.request_permission_cache() as permission_cache:
+        success, response = graphql_cached(
+            schema=executable_schema,
+            data=query,
+            context_value=app_context,
+            cache=DOCUMENT_CACHE,
+        )
+    log.info('Permission cache %s', permission_cache.stats())
+    log.info('Document cache %s', DOCUMENT_CACHE.stats())
+    if app_context.get('loaders'):
+        log.info('Loaders %s', app_context['loaders'].stats())
+    log.debug('Connection pool %s', ENGINE.pool_metrics())
     response = json.dumps(response)
 
     log.info('Lambda Response %s', response)
@@ -1,8 +1,8 @@
-import json
 import logging
 import os
+import time
 
-from dataall.aws.handlers.service_handlers import Worker
+from dataall.aws.handlers.service_handlers import TASK_TIME_BUDGET, Worker
 from dataall.db import get_engine
 
 logger = logging.getLogger()
@@ -15,10 +15,20 @@ engine = get_engine(envname=ENVNAME)
 
 
 def handler(event, context=None):
-    """Processes  messages received from sqs"""
+    """Processes  messages received from sqs, reporting the failed ones"""
     log.info(f'Received Event: {event}')
+    messages = {}
     for record in event['Records']:
         log.info('Consumed record from queue: %s' % record)
-        message = json.loads(record['body'])
-        log.info(f'Extracted Message: {message}')
-        Worker.process(engine=engine, task_ids=message)
+        messages[record['messageId']] = record['body']
+    # tasks are not started when the Lambda could time out while running them
+    deadline = (
+        time.monotonic() + context.get_remaining_time_in_millis() / 1000 - TASK_TIME_BUDGET
+        if context
+        else None
+    )
+    failures = Worker.process_messages(
+        engine=engine, messages=messages, deadline=deadline
+    )
+    log.info(f'Processed {len(messages)} messages, {len(failures)} failed')
+    return {'batchItemFailures': [{'itemIdentifier': m} for m in failures]}
@@ -1,8 +1,67 @@
+import csv
+import hashlib
+import os
+import threading
+import time
+
 import nanoid
 from pyathena import connect
 
 from ....db import models
-from ....aws.handlers.sts import SessionHelper
+from ....aws.handlers.sts import SessionHelper, REMOTE_SESSIONS
+from ....db import exceptions
+
+# Maximum number of rows returned by athena:GetQueryResults
+MAX_PAGE_SIZE = 1000
+DEFAULT_PAGE_SIZE = 500
+INTEGER_TYPES = ['tinyint', 'smallint', 'integer', 'int', 'bigint']
+FLOAT_TYPES = ['float', 'real', 'double']
+RUNNING_STATES = ['QUEUED', 'RUNNING']
+
+
+class QueryResultCache:
+    """
+    Ids of the recently started queries, keyed by the hash of their SQL,
+    their workgroup and the role running them, so that identical queries
+    started within ttl seconds share the same execution and results.
+    A ttl of 0 disables the cache.
+    """
+
+    def __init__(self, ttl: float = None, clock=time.monotonic):
+        self.ttl = (
+            ttl if ttl is not None else float(os.getenv('ATHENA_RESULT_CACHE_TTL', '300'))
+        )
+        self.clock = clock
+        self._queries = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(sql, workgroup, role_arn):
+        return hashlib.sha256(sql.strip().encode('utf-8')).hexdigest(), workgroup, role_arn
+
+    def get(self, key):
+        with self._lock:
+            entry = self._queries.get(key)
+            if entry and entry[0] > self.clock():
+                return entry[1]
+            self._queries.pop(key, None)
+            return None
+
+    def add(self, key, query_id):
+        if self.ttl > 0:
+            with self._lock:
+                self._queries[key] = (self.clock() + self.ttl, query_id)
+
+    def discard(self, key):
+        with self._lock:
+            self._queries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._queries.clear()
+
+
+QUERY_RESULT_CACHE = QueryResultCache()
 
 
 def random_key():
@@ -81,3 +140,240 @@ def run_query_with_role(environment: models.Environment, environment_group: mode
         'rows': rows,
         'columns': columns,
     }
+
+
+def get_role_session(environment: models.Environment, environment_group: models.EnvironmentGroup):
+    """Session of the environment group role, cached like the pivot role sessions"""
+    role_arn = environment_group.environmentIAMRoleArn
+    return REMOTE_SESSIONS.get(
+        (environment.AwsAccountId, role_arn, environment.region),
+        lambda: SessionHelper.get_refreshable_session(
+            SessionHelper.remote_session(accountid=environment.AwsAccountId), role_arn
+        ),
+    )
+
+
+def get_athena_client(environment: models.Environment, environment_group: models.EnvironmentGroup):
+    return get_role_session(environment, environment_group).client('athena', region_name=environment.region)
+
+
+def start_query(client, environment: models.Environment, environment_group: models.EnvironmentGroup, sql):
+    return client.start_query_execution(
+        QueryString=sql,
+        WorkGroup=environment_group.environmentAthenaWorkGroup,
+        ResultConfiguration={
+            'OutputLocation': f's3://{environment.EnvironmentDefaultBucketName}/athenaqueries/{environment_group.environmentAthenaWorkGroup}/'
+        },
+    )['QueryExecutionId']
+
+
+def wait_for_query(client, query_id, poll_interval=0.5, timeout=None):
+    """
+    Polls the query execution until it completes or the timeout expires.
+    The default timeout keeps the request below the API Gateway limit,
+    a query still running after it is returned with its status.
+    """
+    if timeout is None:
+        timeout = float(os.getenv('ATHENA_QUERY_WAIT_TIMEOUT', '25'))
+    deadline = time.monotonic() + timeout
+    while True:
+        execution = client.get_query_execution(QueryExecutionId=query_id)['QueryExecution']
+        if execution['Status']['State'] not in ['QUEUED', 'RUNNING'] or time.monotonic() > deadline:
+            return execution
+        time.sleep(poll_interval)
+
+
+def cast_value(value, type_name):
+    """Converts the Athena string value of a cell to its JSON type"""
+    if value is None:
+        return None
+    if type_name in INTEGER_TYPES:
+        return int(value)
+    if type_name in FLOAT_TYPES:
+        # NaN and Infinity have no JSON representation
+        number = float(value)
+        return number if number - number == 0 else value
+    if type_name == 'boolean':
+        return value == 'true'
+    # decimals are kept as strings not to lose their precision
+    return value
+
+
+def query_execution_result(execution):
+    """Status and statistics of the query execution, without results"""
+    return {
+        'Error': execution['Status'].get('StateChangeReason'),
+        'Status': execution['Status']['State'],
+        'AthenaQueryId': execution['QueryExecutionId'],
+        'ElapsedTimeInMs': execution.get('Statistics', {}).get('TotalExecutionTimeInMillis'),
+        'DataScannedInBytes': execution.get('Statistics', {}).get('DataScannedInBytes'),
+        'OutputLocation': execution.get('ResultConfiguration', {}).get('OutputLocation'),
+        'columns': [],
+        'records': [],
+        'nextToken': None,
+    }
+
+
+def get_query_results_page(client, query_id, next_token=None, limit=DEFAULT_PAGE_SIZE, execution=None):
+    """
+    Page of the results of a completed query, in columnar form:
+    the columns once and the rows as arrays of typed values.
+    The nextToken of the page fetches the next one, it is None on the last page.
+    """
+    if limit is not None and not 0 < limit <= MAX_PAGE_SIZE:
+        raise exceptions.InvalidInput('limit', limit, f'between 1 and {MAX_PAGE_SIZE}')
+    limit = limit or DEFAULT_PAGE_SIZE
+    execution = execution or client.get_query_execution(QueryExecutionId=query_id)['QueryExecution']
+    result = query_execution_result(execution)
+    if result['Status'] != 'SUCCEEDED':
+        return result
+
+    # the first row of the results of a SELECT is its header
+    skip_header = not next_token and execution.get('StatementType') == 'DML'
+    params = {'QueryExecutionId': query_id, 'MaxResults': min(limit + 1, MAX_PAGE_SIZE) if skip_header else limit}
+    if next_token:
+        params['NextToken'] = next_token
+    response = client.get_query_results(**params)
+    types = []
+    for column in response['ResultSet']['ResultSetMetadata']['ColumnInfo']:
+        result['columns'].append({'columnName': column['Name'], 'typeName': column['Type']})
+        types.append(column['Type'])
+    rows = response['ResultSet']['Rows'][1 if skip_header else 0:]
+    result['records'] = [
+        [cast_value(cell.get('VarCharValue'), types[position]) for position, cell in enumerate(row['Data'])]
+        for row in rows
+    ]
+    result['nextToken'] = response.get('NextToken')
+    return result
+
+
+def run_paginated_query_with_role(
+    environment: models.Environment, environment_group: models.EnvironmentGroup, sql=None, limit=DEFAULT_PAGE_SIZE
+):
+    """
+    Runs the query and returns the first page of its results.
+    If the query is still running, only its id and status are returned
+    and the client polls getWorksheetQueryStatus then fetches the
+    results with getAthenaQueryResultPage.
+    """
+    client = get_athena_client(environment, environment_group)
+    query_id = start_query(client, environment, environment_group, sql)
+    execution = wait_for_query(client, query_id)
+    return get_query_results_page(client, query_id, limit=limit, execution=execution)
+
+
+def get_query_results_page_with_role(
+    environment: models.Environment,
+    environment_group: models.EnvironmentGroup,
+    query_id,
+    next_token=None,
+    limit=DEFAULT_PAGE_SIZE,
+):
+    client = get_athena_client(environment, environment_group)
+    return get_query_results_page(client, query_id, next_token=next_token, limit=limit)
+
+
+def start_query_with_role(environment: models.Environment, environment_group: models.EnvironmentGroup, sql=None):
+    """
+    Starts the query without waiting for it, unless an identical query was
+    started recently by the same role in the same workgroup, in which case
+    that execution is returned instead.
+    """
+    client = get_athena_client(environment, environment_group)
+    key = QUERY_RESULT_CACHE.key(
+        sql, environment_group.environmentAthenaWorkGroup, environment_group.environmentIAMRoleArn
+    )
+    query_id = QUERY_RESULT_CACHE.get(key)
+    if query_id:
+        execution = client.get_query_execution(QueryExecutionId=query_id)['QueryExecution']
+        if execution['Status']['State'] in RUNNING_STATES + ['SUCCEEDED']:
+            return query_execution_result(execution)
+        QUERY_RESULT_CACHE.discard(key)
+
+    query_id = start_query(client, environment, environment_group, sql)
+    QUERY_RESULT_CACHE.add(key, query_id)
+    return {'AthenaQueryId': query_id, 'Status': 'QUEUED'}
+
+
+def get_query_status_with_role(environment: models.Environment, environment_group: models.EnvironmentGroup, query_id):
+    client = get_athena_client(environment, environment_group)
+    return query_execution_result(client.get_query_execution(QueryExecutionId=query_id)['QueryExecution'])
+
+
+def parse_offset(next_token):
+    try:
+        offset = int(next_token or 0)
+    except ValueError:
+        offset = -1
+    if offset < 0:
+        raise exceptions.InvalidInput('nextToken', next_token, 'a token returned by a previous page')
+    return offset
+
+
+def read_csv_results(s3, output_location, types, offset=0, limit=DEFAULT_PAGE_SIZE):
+    """
+    Reads limit rows of the CSV output of a query from S3, starting at the
+    byte offset. Returns the typed rows and the offset of the next row, or
+    None once the whole file was read. Empty CSV fields are read as nulls.
+    """
+    bucket, key = output_location[len('s3://'):].split('/', 1)
+    params = {'Bucket': bucket, 'Key': key}
+    if offset:
+        params['Range'] = f'bytes={offset}-'
+    response = s3.get_object(**params)
+    size = offset + response['ContentLength']
+    position = offset
+
+    def lines():
+        nonlocal position
+        for line in response['Body'].iter_lines(keepends=True):
+            position += len(line)
+            yield line.decode('utf-8')
+
+    reader = csv.reader(lines())
+    if not offset:
+        next(reader, None)
+    records = []
+    try:
+        for row in reader:
+            records.append([cast_value(value if value != '' else None, types[i]) for i, value in enumerate(row)])
+            if len(records) == limit:
+                break
+    finally:
+        response['Body'].close()
+    return records, position if position < size else None
+
+
+def get_query_result_with_role(
+    environment: models.Environment,
+    environment_group: models.EnvironmentGroup,
+    query_id,
+    next_token=None,
+    limit=DEFAULT_PAGE_SIZE,
+):
+    """
+    Page of the results of a completed query read from its S3 output, in
+    the same columnar form as get_query_results_page. For SELECT statements
+    the nextToken of the page is the byte offset of its next row in the output.
+    """
+    if not 0 < limit <= MAX_PAGE_SIZE:
+        raise exceptions.InvalidInput('limit', limit, f'between 1 and {MAX_PAGE_SIZE}')
+    client = get_athena_client(environment, environment_group)
+    execution = client.get_query_execution(QueryExecutionId=query_id)['QueryExecution']
+    result = query_execution_result(execution)
+    if result['Status'] != 'SUCCEEDED':
+        return result
+    if execution.get('StatementType') != 'DML':
+        # only the results of SELECT statements are written as CSV
+        return get_query_results_page(client, query_id, next_token=next_token, limit=limit, execution=execution)
+    offset = parse_offset(next_token)
+
+    metadata = client.get_query_results(QueryExecutionId=query_id, MaxResults=1)
+    types = []
+    for column in metadata['ResultSet']['ResultSetMetadata']['ColumnInfo']:
+        result['columns'].append({'columnName': column['Name'], 'typeName': column['Type']})
+        types.append(column['Type'])
+    s3 = get_role_session(environment, environment_group).client('s3', region_name=environment.region)
+    result['records'], next_offset = read_csv_results(s3, result['OutputLocation'], types, offset, limit)
+    result['nextToken'] = str(next_offset) if next_offset is not None else None
+    return result
@@ -0,0 +1,8 @@
+import json
+
+
+def resolve_records(context, source, **kwargs):
+    if not source:
+        return None
+    records = source.get('records') if isinstance(source, dict) else source.records
+    return json.dumps(records) if records is not None else None
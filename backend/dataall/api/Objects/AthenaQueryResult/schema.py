@@ -1,4 +1,5 @@
 from ... import gql
+from .resolvers import *
 
 AthenaResultColumnDescriptor = gql.ObjectType(
     name='AthenaResultColumnDescriptor',
@@ -41,5 +42,7 @@ AthenaQueryResult = gql.ObjectType(
             name='columns', type=gql.ArrayType(gql.Ref('AthenaResultColumnDescriptor'))
         ),
         gql.Field(name='rows', type=gql.ArrayType(gql.Ref('AthenaResultRecord'))),
+        gql.Field(name='records', type=gql.String, resolver=resolve_records),
+        gql.Field(name='nextToken', type=gql.String),
     ],
 )
@@ -20,6 +20,8 @@ class AthenaQueryResult:
         'OutputLocation',
         'rows',
         'columns',
+        'records',
+        'nextToken',
     ]
 
     def __init__(
@@ -32,6 +34,8 @@ class AthenaQueryResult:
         OutputLocation: str = None,
         rows: List = None,
         columns: List = None,
+        records: List = None,
+        nextToken: str = None,
         **kwargs
     ):
         self._error = Error
@@ -42,6 +46,8 @@ class AthenaQueryResult:
         self._loc = OutputLocation
         self._rows = rows
         self._columns = columns
+        self._records = records
+        self._next_token = nextToken
 
     def to_dict(self):
         return {k: getattr(self, k) for k in AthenaQueryResult.props}
@@ -77,3 +83,11 @@ class AthenaQueryResult:
     @property
     def columns(self):
         return self._columns
+
+    @property
+    def records(self):
+        return self._records
+
+    @property
+    def nextToken(self):
+        return self._next_token
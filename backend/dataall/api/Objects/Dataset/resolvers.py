@@ -10,6 +10,7 @@ from ....api.constants import (
     DatasetRole,
 )
 from ....api.context import Context
+from ....api.loaders import get_loaders
 from ....aws.handlers.glue import Glue
 from ....aws.handlers.service_handlers import Worker
 from ....aws.handlers.sts import SessionHelper
@@ -182,9 +183,15 @@ def list_datasets(context: Context, source, filter: dict = None):
     if not filter:
         filter = {'page': 1, 'pageSize': 5}
     with context.engine.scoped_session() as session:
-        return Dataset.paginated_user_datasets(
+        datasets = Dataset.paginated_user_datasets(
             session, context.username, context.groups, uri=None, data=filter
         )
+        ResourcePolicy.prefetch_user_resource_permissions(
+            session,
+            groups=context.groups,
+            resource_uris=[dataset.datasetUri for dataset in datasets['nodes']],
+        )
+        return datasets
 
 
 def list_locations(context, source: models.Dataset, filter: dict = None):
@@ -220,15 +227,19 @@ def list_tables(context, source: models.Dataset, filter: dict = None):
 def get_dataset_organization(context, source: models.Dataset, **kwargs):
     if not source:
         return None
-    with context.engine.scoped_session() as session:
-        return Organization.get_organization_by_uri(session, source.organizationUri)
+    organization = get_loaders(context).load('Organization', source.organizationUri)
+    if not organization:
+        raise exceptions.ObjectNotFound('Organization', source.organizationUri)
+    return organization
 
 
 def get_dataset_environment(context, source: models.Dataset, **kwargs):
     if not source:
         return None
-    with context.engine.scoped_session() as session:
-        return Environment.get_environment_by_uri(session, source.environmentUri)
+    environment = get_loaders(context).load('Environment', source.environmentUri)
+    if not environment:
+        raise exceptions.ObjectNotFound(models.Environment.__name__, source.environmentUri)
+    return environment
 
 
 def get_dataset_owners_group(context, source: models.Dataset, **kwargs):
@@ -267,19 +278,7 @@ def update_dataset(context, source, datasetUri: str = None, input: dict = None):
 def get_dataset_statistics(context: Context, source: models.Dataset, **kwargs):
     if not source:
         return None
-    with context.engine.scoped_session() as session:
-        count_tables = db.api.Dataset.count_dataset_tables(session, source.datasetUri)
-        count_locations = db.api.Dataset.count_dataset_locations(
-            session, source.datasetUri
-        )
-        count_upvotes = db.api.Vote.count_upvotes(
-            session, None, None, source.datasetUri, {'targetType': 'dataset'}
-        )
-    return {
-        'tables': count_tables or 0,
-        'locations': count_locations or 0,
-        'upvotes': count_upvotes or 0,
-    }
+    return get_loaders(context).load('Dataset.statistics', source.datasetUri)
 
 
 def get_dataset_etl_credentials(context: Context, source, datasetUri: str = None):
@@ -48,5 +48,7 @@ DatasetTableFilter = gql.InputType(
         gql.Argument('sort', gql.ArrayType(DatasetSortCriteria)),
         gql.Argument('page', gql.Integer),
         gql.Argument('pageSize', gql.Integer),
+        gql.Argument('cursor', gql.String),
+        gql.Argument('countMode', gql.Ref('PaginationCount')),
     ],
 )
@@ -87,6 +87,8 @@ EnvironmentFilter = gql.InputType(
         gql.Argument('quicksight', gql.Boolean),
         gql.Argument('sort', gql.ArrayType(EnvironmentSortCriteria)),
         gql.Argument('pageSize', gql.Integer),
+        gql.Argument('cursor', gql.String),
+        gql.Argument('countMode', gql.Ref('PaginationCount')),
     ],
 )
 
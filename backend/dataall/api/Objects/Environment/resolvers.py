@@ -10,6 +10,7 @@ from sqlalchemy import and_
 from ..Organization.resolvers import *
 from ..Stack import stack_helper
 from ...constants import *
+from ...loaders import get_loaders
 from ....aws.handlers.sts import SessionHelper
 from ....aws.handlers.quicksight import Quicksight
 from ....aws.handlers.cloudformation import CloudFormation
@@ -343,7 +344,9 @@ def list_environment_networks(
 
 
 def get_parent_organization(context: Context, source, **kwargs):
-    org = get_organization(context, source, organizationUri=source.organizationUri)
+    org = get_loaders(context).load('Organization', source.organizationUri)
+    if not org:
+        raise exceptions.ObjectNotFound('Organization', source.organizationUri)
     return org
 
 
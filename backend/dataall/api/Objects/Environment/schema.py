@@ -111,6 +111,8 @@ EnvironmentSearchResult = gql.ObjectType(
         gql.Field(name='previousPage', type=gql.Integer),
         gql.Field(name='hasNext', type=gql.Boolean),
         gql.Field(name='hasPrevious', type=gql.Boolean),
+        gql.Field(name='nextCursor', type=gql.String),
+        gql.Field(name='previousCursor', type=gql.String),
     ],
 )
 
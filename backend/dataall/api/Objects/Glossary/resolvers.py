@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import and_, or_, asc
+from sqlalchemy import and_, or_
 
 from .... import db
 from ....api.context import Context
@@ -57,27 +57,7 @@ def node_tree(context: Context, source: models.GlossaryNode, filter: dict = None
     if not filter:
         filter = {}
     with context.engine.scoped_session() as session:
-        q = (
-            session.query(models.GlossaryNode)
-            .filter(models.GlossaryNode.path.startswith(source.path))
-            .filter(models.GlossaryNode.deleted.is_(None))
-            .order_by(asc(models.GlossaryNode.path))
-        )
-        term = filter.get('term')
-        nodeType = filter.get('nodeType')
-        if term:
-            q = q.filter(
-                or_(
-                    models.GlossaryNode.label.ilike(term),
-                    models.GlossaryNode.readme.ilike(term),
-                )
-            )
-        if nodeType:
-            q = q.filter(models.GlossaryNode.nodeType == nodeType)
-
-    return paginate(
-        q, page_size=filter.get('pageSize', 10), page=filter.get('page', 1)
-    ).to_dict()
+        return db.api.Glossary.node_tree(session, source, filter)
 
 
 def list_node_children(
@@ -310,7 +290,7 @@ def link_term(
 def resolve_term_glossary(context, source: models.GlossaryNode, **kwargs):
     with context.engine.scoped_session() as session:
         parentUri = source.path.split('/')[1]
-        return session.query(models.GlossaryNode).get(parentUri)
+        return db.api.Glossary.get_snapshot_node(session, parentUri)
 
 
 def get_link(context: Context, source, linkUri: str = None):
@@ -366,42 +346,8 @@ def resolve_term_associations(
 
 
 def resolve_stats(context, source: models.GlossaryNode, **kwargs):
-
     with context.engine.scoped_session() as session:
-        categories = (
-            session.query(models.GlossaryNode)
-            .filter(
-                and_(
-                    models.GlossaryNode.path.startswith(source.path),
-                    models.GlossaryNode.nodeType == 'C',
-                    models.GlossaryNode.deleted.is_(None),
-                )
-            )
-            .count()
-        )
-        terms = (
-            session.query(models.GlossaryNode)
-            .filter(
-                and_(
-                    models.GlossaryNode.path.startswith(source.path),
-                    models.GlossaryNode.nodeType == 'T',
-                    models.GlossaryNode.deleted.is_(None),
-                )
-            )
-            .count()
-        )
-
-        associations = (
-            session.query(models.TermLink)
-            .join(
-                models.GlossaryNode,
-                models.GlossaryNode.nodeType == models.TermLink.nodeUri,
-            )
-            .filter(models.GlossaryNode.path.startswith(source.path))
-            .count()
-        )
-
-    return {'categories': categories, 'terms': terms, 'associations': associations}
+        return db.api.Glossary.node_stats(session, source)
 
 
 def list_asset_linked_terms(
@@ -433,7 +379,7 @@ def list_asset_linked_terms(
 
 def resolve_link_node(context: Context, source: models.TermLink, **kwargs):
     with context.engine.scoped_session() as session:
-        term = session.query(models.GlossaryNode).get(source.nodeUri)
+        term = db.api.Glossary.get_snapshot_node(session, source.nodeUri)
     return term
 
 
@@ -58,6 +58,8 @@ ShareObjectFilter = gql.InputType(
         gql.Argument('sort', gql.ArrayType(ShareSortCriteria)),
         gql.Argument('page', gql.Integer),
         gql.Argument('pageSize', gql.Integer),
+        gql.Argument('cursor', gql.String),
+        gql.Argument('countMode', gql.Ref('PaginationCount')),
         gql.Argument('roles', gql.ArrayType(OrganisationUserRole.toGraphQLEnum())),
         gql.Argument('tags', gql.ArrayType(gql.String)),
     ],
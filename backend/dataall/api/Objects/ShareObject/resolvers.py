@@ -5,6 +5,7 @@ from .... import db
 from .... import utils
 from ....api.constants import *
 from ....api.context import Context
+from ....api.loaders import get_loaders
 from ....aws.handlers.service_handlers import Worker
 from ....db import models
 
@@ -242,19 +243,22 @@ def resolve_user_role(context: Context, source: models.ShareObject, **kwargs):
 def resolve_dataset(context: Context, source: models.ShareObject, **kwargs):
     if not source:
         return None
-    with context.engine.scoped_session() as session:
-        ds: models.Dataset = db.api.Dataset.get_dataset_by_uri(session, source.datasetUri)
-        if ds:
-            env: models.Environment = db.api.Environment.get_environment_by_uri(session, ds.environmentUri)
-            return {
-                'datasetUri': source.datasetUri,
-                'datasetName': ds.name if ds else 'NotFound',
-                'SamlAdminGroupName': ds.SamlAdminGroupName if ds else 'NotFound',
-                'environmentName': env.label if env else 'NotFound',
-                'AwsAccountId': env.AwsAccountId if env else 'NotFound',
-                'region': env.region if env else 'NotFound',
-                'exists': True if ds else False,
-            }
+    loaders = get_loaders(context)
+    ds: models.Dataset = loaders.load('Dataset', source.datasetUri)
+    if not ds:
+        return None
+    env: models.Environment = loaders.load('Environment', ds.environmentUri)
+    if not env:
+        return None
+    return {
+        'datasetUri': source.datasetUri,
+        'datasetName': ds.name,
+        'SamlAdminGroupName': ds.SamlAdminGroupName,
+        'environmentName': env.label,
+        'AwsAccountId': env.AwsAccountId,
+        'region': env.region,
+        'exists': True,
+    }
 
 
 def union_resolver(object, *_):
@@ -278,11 +282,7 @@ def resolve_principal(context: Context, source: models.ShareObject, **kwargs):
 def resolve_environment(context: Context, source: models.ShareObject, **kwargs):
     if not source:
         return None
-    with context.engine.scoped_session() as session:
-        environment = db.api.Environment.get_environment_by_uri(
-            session, source.environmentUri
-        )
-        return environment
+    return get_loaders(context).load('Environment', source.environmentUri)
 
 
 def resolve_group(context: Context, source: models.ShareObject, **kwargs):
@@ -310,10 +310,7 @@ def resolve_consumption_data(context: Context, source: models.ShareObject, **kwa
 def resolve_share_object_statistics(context: Context, source: models.ShareObject, **kwargs):
     if not source:
         return None
-    with context.engine.scoped_session() as session:
-        return db.api.ShareObject.resolve_share_object_statistics(
-            session, source.shareUri
-        )
+    return get_loaders(context).load('ShareObject.statistics', source.shareUri)
 
 
 def resolve_existing_shared_items(context: Context, source: models.ShareObject, **kwargs):
@@ -164,6 +164,8 @@ ShareSearchResult = gql.ObjectType(
         gql.Field(name='previousPage', type=gql.Integer),
         gql.Field(name='hasNext', type=gql.Boolean),
         gql.Field(name='hasPrevious', type=gql.Boolean),
+        gql.Field(name='nextCursor', type=gql.String),
+        gql.Field(name='previousCursor', type=gql.String),
         gql.Field(name='nodes', type=gql.ArrayType(gql.Ref('ShareObject'))),
     ],
 )
@@ -4,6 +4,7 @@ import requests
 
 from .... import db
 from ....api.context import Context
+from ....api.loaders import get_loaders
 from ....aws.handlers.service_handlers import Worker
 from ....aws.handlers.ecs import Ecs
 from ....db import models
@@ -11,24 +12,23 @@ from ....utils import Parameter
 
 
 def get_stack_with_cfn_resources(context: Context, targetUri: str, environmentUri: str):
-    with context.engine.scoped_session() as session:
-        env: models.Environment = session.query(models.Environment).get(environmentUri)
-        stack: models.Stack = db.api.Stack.find_stack_by_target_uri(
-            session, target_uri=targetUri
+    loaders = get_loaders(context)
+    env: models.Environment = loaders.load('Environment', environmentUri)
+    stack: models.Stack = loaders.load('Stack.targetUri', targetUri)
+    if not stack:
+        stack = models.Stack(
+            stack='environment',
+            payload={},
+            targetUri=targetUri,
+            accountid=env.AwsAccountId if env else 'UNKNOWN',
+            region=env.region if env else 'UNKNOWN',
+            resources=str({}),
+            error=str({}),
+            outputs=str({}),
         )
-        if not stack:
-            stack = models.Stack(
-                stack='environment',
-                payload={},
-                targetUri=targetUri,
-                accountid=env.AwsAccountId if env else 'UNKNOWN',
-                region=env.region if env else 'UNKNOWN',
-                resources=str({}),
-                error=str({}),
-                outputs=str({}),
-            )
-            return stack
+        return stack
 
+    with context.engine.scoped_session() as session:
         cfn_task = save_describe_stack_task(session, env, stack, targetUri)
         Worker.queue(engine=context.engine, task_ids=[cfn_task.taskUri])
     return stack
@@ -57,3 +57,16 @@ deleteWorksheet = gql.MutationField(
     ],
     type=gql.Boolean,
 )
+
+
+startWorksheetQuery = gql.MutationField(
+    name='startWorksheetQuery',
+    resolver=start_worksheet_query,
+    args=[
+        gql.Argument(name='worksheetUri', type=gql.NonNullableType(gql.String)),
+        gql.Argument(
+            name='input', type=gql.NonNullableType(gql.Ref('WorksheetQueryInput'))
+        ),
+    ],
+    type=gql.Ref('AthenaQueryResult'),
+)
@@ -25,6 +25,47 @@ runAthenaSqlQuery = gql.QueryField(
         gql.Argument(name='environmentUri', type=gql.NonNullableType(gql.String)),
         gql.Argument(name='worksheetUri', type=gql.NonNullableType(gql.String)),
         gql.Argument(name='sqlQuery', type=gql.NonNullableType(gql.String)),
+        gql.Argument(name='limit', type=gql.Integer),
     ],
     resolver=run_sql_query,
 )
+
+
+getAthenaQueryResultPage = gql.QueryField(
+    name='getAthenaQueryResultPage',
+    type=gql.Ref('AthenaQueryResult'),
+    args=[
+        gql.Argument(name='environmentUri', type=gql.NonNullableType(gql.String)),
+        gql.Argument(name='worksheetUri', type=gql.NonNullableType(gql.String)),
+        gql.Argument(name='athenaQueryId', type=gql.NonNullableType(gql.String)),
+        gql.Argument(name='nextToken', type=gql.String),
+        gql.Argument(name='limit', type=gql.Integer),
+    ],
+    resolver=get_query_result_page,
+)
+
+
+getWorksheetQueryStatus = gql.QueryField(
+    name='getWorksheetQueryStatus',
+    type=gql.Ref('AthenaQueryResult'),
+    args=[
+        gql.Argument(name='environmentUri', type=gql.NonNullableType(gql.String)),
+        gql.Argument(name='worksheetUri', type=gql.NonNullableType(gql.String)),
+        gql.Argument(name='athenaQueryId', type=gql.NonNullableType(gql.String)),
+    ],
+    resolver=get_worksheet_query_status,
+)
+
+
+getWorksheetQueryResult = gql.QueryField(
+    name='getWorksheetQueryResult',
+    type=gql.Ref('AthenaQueryResult'),
+    args=[
+        gql.Argument(name='environmentUri', type=gql.NonNullableType(gql.String)),
+        gql.Argument(name='worksheetUri', type=gql.NonNullableType(gql.String)),
+        gql.Argument(name='athenaQueryId', type=gql.NonNullableType(gql.String)),
+        gql.Argument(name='nextToken', type=gql.String),
+        gql.Argument(name='limit', type=gql.Integer),
+    ],
+    resolver=get_worksheet_query_result,
+)
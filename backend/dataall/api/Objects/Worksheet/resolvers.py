@@ -134,9 +134,7 @@ def resolve_shares(context: Context, source: models.Worksheet, filter: dict = No
     ).to_dict()
 
 
-def run_sql_query(
-    context: Context, source, environmentUri: str = None, worksheetUri: str = None, sqlQuery: str = None
-):
+def get_worksheet_environment_group(context: Context, environmentUri, worksheetUri):
     with context.engine.scoped_session() as session:
         ResourcePolicy.check_user_resource_permission(
             session=session,
@@ -151,12 +149,74 @@ def run_sql_query(
         env_group = db.api.Environment.get_environment_group(
             session, worksheet.SamlAdminGroupName, environment.environmentUri
         )
+    return environment, env_group
+
+
+def run_sql_query(
+    context: Context, source, environmentUri: str = None, worksheetUri: str = None, sqlQuery: str = None,
+    limit: int = None
+):
+    environment, env_group = get_worksheet_environment_group(context, environmentUri, worksheetUri)
 
+    if limit:
+        return athena_helpers.run_paginated_query_with_role(
+            environment=environment, environment_group=env_group, sql=sqlQuery, limit=limit
+        )
     return athena_helpers.run_query_with_role(
         environment=environment, environment_group=env_group, sql=sqlQuery
     )
 
 
+def get_query_result_page(
+    context: Context, source, environmentUri: str = None, worksheetUri: str = None, athenaQueryId: str = None,
+    nextToken: str = None, limit: int = None
+):
+    environment, env_group = get_worksheet_environment_group(context, environmentUri, worksheetUri)
+
+    return athena_helpers.get_query_results_page_with_role(
+        environment=environment,
+        environment_group=env_group,
+        query_id=athenaQueryId,
+        next_token=nextToken,
+        limit=limit or athena_helpers.DEFAULT_PAGE_SIZE,
+    )
+
+
+def start_worksheet_query(context: Context, source, worksheetUri: str = None, input: dict = None):
+    if not input or not input.get('sqlBody'):
+        raise exceptions.RequiredParameter('sqlBody')
+    environment, env_group = get_worksheet_environment_group(context, input.get('environmentUri'), worksheetUri)
+
+    return athena_helpers.start_query_with_role(
+        environment=environment, environment_group=env_group, sql=input['sqlBody']
+    )
+
+
+def get_worksheet_query_status(
+    context: Context, source, environmentUri: str = None, worksheetUri: str = None, athenaQueryId: str = None
+):
+    environment, env_group = get_worksheet_environment_group(context, environmentUri, worksheetUri)
+
+    return athena_helpers.get_query_status_with_role(
+        environment=environment, environment_group=env_group, query_id=athenaQueryId
+    )
+
+
+def get_worksheet_query_result(
+    context: Context, source, environmentUri: str = None, worksheetUri: str = None, athenaQueryId: str = None,
+    nextToken: str = None, limit: int = None
+):
+    environment, env_group = get_worksheet_environment_group(context, environmentUri, worksheetUri)
+
+    return athena_helpers.get_query_result_with_role(
+        environment=environment,
+        environment_group=env_group,
+        query_id=athenaQueryId,
+        next_token=nextToken,
+        limit=limit or athena_helpers.DEFAULT_PAGE_SIZE,
+    )
+
+
 def delete_worksheet(context, source, worksheetUri: str = None):
     with context.engine.scoped_session() as session:
         return db.api.Worksheet.delete_worksheet(
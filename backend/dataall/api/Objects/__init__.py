@@ -1,3 +1,4 @@
+import os
 from argparse import Namespace
 
 from ariadne import (
@@ -11,6 +12,7 @@ from ariadne import (
 )
 
 from .. import gql
+from ..loaders import Loaders
 from ...api.constants import GraphQLEnumMapper
 from . import (
     Permission,
@@ -83,8 +85,21 @@ def save():
         f.write(schema.gql())
 
 
+def save_type_defs(path):
+    """
+    Writes the validated SDL of the schema. Done at package time, it lets
+    get_executable_schema skip rendering and validating the type definitions.
+    """
+    schema = bootstrap()
+    with open(path, 'w') as f:
+        f.write(GQL(schema.gql(with_directives=False)))
+
+
 def resolver_adapter(resolver):
     def adapted(obj, info, **kwargs):
+        loaders = info.context.get('loaders')
+        if loaders is None:
+            loaders = info.context['loaders'] = Loaders(info.context['engine'])
         response = resolver(
             context=Namespace(
                 engine=info.context['engine'],
@@ -93,17 +108,19 @@ def resolver_adapter(resolver):
                 groups=info.context['groups'],
                 schema=info.context['schema'],
                 cdkproxyurl=info.context['cdkproxyurl'],
+                loaders=loaders,
             ),
             source=obj or None,
             **kwargs,
         )
+        loaders.prime_from(response)
         return response
 
     return adapted
 
 
-def get_executable_schema():
-    schema = bootstrap()
+def get_executable_schema(schema=None, type_defs_path=None):
+    schema = schema or bootstrap()
     _types = []
     for _type in schema.types:
         if _type.name == 'Query':
@@ -137,6 +154,10 @@ def get_executable_schema():
     for union in schema.unions:
         _unions.append(UnionType(union.name, union.resolver))
 
-    type_defs = GQL(schema.gql(with_directives=False))
+    if type_defs_path and os.path.exists(type_defs_path):
+        with open(type_defs_path) as f:
+            type_defs = f.read()
+    else:
+        type_defs = GQL(schema.gql(with_directives=False))
     executable_schema = make_executable_schema(type_defs, *(_types + _enums + _unions))
     return executable_schema
@@ -239,4 +239,10 @@ class WorksheetRole(GraphQLEnumMapper):
     NoPermission = '000'
 
 
+class PaginationCount(GraphQLEnumMapper):
+    Exact = 'exact'
+    Estimate = 'estimate'
+    Skip = 'none'
+
+
 GLUEBUSINESSPROPERTIES = ['EXAMPLE_GLUE_PROPERTY_TO_BE_ADDED_ON_ES']
@@ -0,0 +1,136 @@
+import logging
+
+from .. import db
+from ..db import models
+
+log = logging.getLogger(__name__)
+
+
+class Loader:
+    """
+    Request scoped loader of values by key, in the manner of a DataLoader.
+    Keys are queued with prime, and the first load of a key that is not
+    cached fetches it with all the queued keys in one call to batch, which
+    maps the keys it found to their value. Keys not found load as None.
+    """
+
+    def __init__(self, engine, batch):
+        self.engine = engine
+        self.batch = batch
+        self.pending = set()
+        self.cache = {}
+        self.hits = 0
+        self.misses = 0
+        self.batches = 0
+
+    def prime(self, keys):
+        self.pending.update(k for k in keys if k is not None and k not in self.cache)
+
+    def load(self, key):
+        if key is None:
+            return None
+        if key in self.cache:
+            self.hits += 1
+            return self.cache[key]
+        self.misses += 1
+        self.pending.add(key)
+        self.dispatch()
+        return self.cache.get(key)
+
+    def dispatch(self):
+        keys, self.pending = self.pending, set()
+        if not keys:
+            return
+        self.batches += 1
+        with self.engine.scoped_session() as session:
+            values = self.batch(session, list(keys))
+        for key in keys:
+            self.cache[key] = values.get(key)
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'batches': self.batches}
+
+
+def rows_by(model, column):
+    """Batch function loading the rows of the model by the values of the column"""
+
+    def batch(session, keys):
+        return {
+            getattr(row, column.key): row
+            for row in session.query(model).filter(column.in_(keys))
+        }
+
+    return batch
+
+
+# Batch functions of the loaders, by loader name
+BATCHES = {
+    'Organization': rows_by(models.Organization, models.Organization.organizationUri),
+    'Environment': rows_by(models.Environment, models.Environment.environmentUri),
+    'Dataset': rows_by(models.Dataset, models.Dataset.datasetUri),
+    'Stack.targetUri': rows_by(models.Stack, models.Stack.targetUri),
+    'Dataset.statistics': lambda session, keys: db.api.Dataset.count_datasets_statistics(
+        session, keys
+    ),
+    'ShareObject.statistics': lambda session, keys: db.api.ShareObject.resolve_share_objects_statistics(
+        session, keys
+    ),
+}
+
+# Keys queued for the loaders when a resolver returns rows of the model,
+# as (loader name, attribute of the row)
+PRIMERS = {
+    models.Dataset: [
+        ('Environment', 'environmentUri'),
+        ('Organization', 'organizationUri'),
+        ('Stack.targetUri', 'datasetUri'),
+        ('Dataset.statistics', 'datasetUri'),
+    ],
+    models.Environment: [
+        ('Organization', 'organizationUri'),
+        ('Stack.targetUri', 'environmentUri'),
+    ],
+    models.ShareObject: [
+        ('Dataset', 'datasetUri'),
+        ('Environment', 'environmentUri'),
+        ('ShareObject.statistics', 'shareUri'),
+    ],
+}
+
+
+class Loaders:
+    """The loaders of one request, created on first use"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.loaders = {}
+
+    def get(self, name) -> Loader:
+        if name not in self.loaders:
+            self.loaders[name] = Loader(self.engine, BATCHES[name])
+        return self.loaders[name]
+
+    def load(self, name, key):
+        return self.get(name).load(key)
+
+    def prime_from(self, result):
+        """Queues the keys related to the rows of a resolver result"""
+        if isinstance(result, dict):
+            result = result.get('nodes')
+        rows = result if isinstance(result, list) else [result]
+        by_model = {}
+        for row in rows:
+            if type(row) in PRIMERS:
+                by_model.setdefault(type(row), []).append(row)
+        for model, model_rows in by_model.items():
+            for name, attribute in PRIMERS[model]:
+                self.get(name).prime(getattr(row, attribute) for row in model_rows)
+
+    def stats(self):
+        return {name: loader.stats() for name, loader in self.loaders.items()}
+
+
+def get_loaders(context) -> Loaders:
+    """Loaders of the request, or new ones when resolving outside of a request"""
+    loaders = getattr(context, 'loaders', None)
+    return loaders if loaders is not None else Loaders(context.engine)
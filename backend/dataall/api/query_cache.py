@@ -0,0 +1,264 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from ariadne import format_error
+from ariadne.graphql import (
+    handle_graphql_errors,
+    handle_query_result,
+    parse_query,
+    validate_data,
+    validate_operation_name,
+    validate_query,
+    validate_variables,
+)
+from graphql import (
+    FieldNode,
+    GraphQLError,
+    NameNode,
+    OperationDefinitionNode,
+    SelectionSetNode,
+    Visitor,
+    parse,
+    print_ast,
+    visit,
+)
+from graphql.execution import ExecutionContext, execute_sync
+
+log = logging.getLogger(__name__)
+
+# Operations of the frontend, written at package time by save_operations
+OPERATIONS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'operations.prebuilt.json',
+)
+
+# gql`...` templates of the frontend api files
+GQL_TEMPLATE = re.compile(r'gql`([^`]*)`')
+
+PERSISTED_QUERY_NOT_FOUND = 'PersistedQueryNotFound'
+
+
+def query_hash(query: str) -> str:
+    """Hash of a query, as sent by the persisted queries link of the frontend"""
+    return hashlib.sha256(query.encode('utf-8')).hexdigest()
+
+
+class DocumentCache:
+    """
+    Process wide LRU cache of parsed and validated query documents,
+    keyed by the sha256 hash of their query.
+    Only documents without validation errors are cached.
+    """
+
+    def __init__(self, max_size: int = None):
+        self.max_size = (
+            max_size
+            if max_size is not None
+            else int(os.getenv('GRAPHQL_DOCUMENT_CACHE_SIZE', '1000'))
+        )
+        self._documents = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            document = self._documents.get(key)
+            if document is None:
+                self.misses += 1
+                return None
+            self._documents.move_to_end(key)
+            self.hits += 1
+            return document
+
+    def set(self, key, document):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._documents[key] = document
+            self._documents.move_to_end(key)
+            while len(self._documents) > self.max_size:
+                self._documents.popitem(last=False)
+
+    def load(self, schema, query):
+        """
+        Parses and validates the query, caching its document when valid.
+        Returns the document and the validation errors.
+        """
+        document = parse_query(query)
+        errors = validate_query(schema, document)
+        if not errors:
+            self.set(query_hash(query), document)
+        return document, errors
+
+    def warm_up(self, schema, queries):
+        """Loads the queries, returns the number of documents cached"""
+        cached = 0
+        for query in queries:
+            try:
+                document, errors = self.load(schema, query)
+            except GraphQLError as e:
+                log.warning(f'Skipping operation that does not parse: {e}')
+                continue
+            if errors:
+                log.warning(f'Skipping invalid operation: {errors[0].message}')
+            else:
+                cached += 1
+        return cached
+
+    def __len__(self):
+        return len(self._documents)
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self)}
+
+
+document_cache = DocumentCache()
+
+
+def get_document_cache() -> DocumentCache:
+    return document_cache
+
+
+def persisted_query_hash(data):
+    extensions = data.get('extensions') or {}
+    persisted_query = extensions.get('persistedQuery') or {}
+    return persisted_query.get('sha256Hash')
+
+
+def graphql_cached(schema, data, context_value=None, cache: DocumentCache = None):
+    """
+    Executes the operation like ariadne.graphql_sync, taking its document
+    from the cache when it was already parsed and validated.
+    Supports automatic persisted queries: the client may send the hash of the
+    query in extensions.persistedQuery.sha256Hash without the query, and sends
+    the query again when the hash is answered with PersistedQueryNotFound.
+    """
+    cache = cache if cache is not None else document_cache
+    try:
+        if not isinstance(data, dict):
+            raise GraphQLError('Operation data should be a JSON object')
+        query = data.get('query')
+        sha256_hash = persisted_query_hash(data)
+        if query is None and sha256_hash:
+            document = cache.get(sha256_hash)
+            if document is None:
+                return True, {
+                    'errors': [
+                        {
+                            'message': PERSISTED_QUERY_NOT_FOUND,
+                            'extensions': {'code': 'PERSISTED_QUERY_NOT_FOUND'},
+                        }
+                    ]
+                }
+            validate_variables(data.get('variables'))
+            validate_operation_name(data.get('operationName'))
+        else:
+            validate_data(data)
+            key = query_hash(query)
+            if sha256_hash and sha256_hash != key:
+                raise GraphQLError('provided sha does not match query')
+            document = cache.get(key)
+        if document is None:
+            document, errors = cache.load(schema, query)
+            if errors:
+                return handle_graphql_errors(
+                    errors, logger=None, error_formatter=format_error, debug=False
+                )
+        result = execute_sync(
+            schema,
+            document,
+            context_value=context_value,
+            variable_values=data.get('variables'),
+            operation_name=data.get('operationName'),
+            execution_context_class=ExecutionContext,
+        )
+    except GraphQLError as error:
+        return handle_graphql_errors(
+            [error], logger=None, error_formatter=format_error, debug=False
+        )
+    return handle_query_result(
+        result, logger=None, error_formatter=format_error, debug=False
+    )
+
+
+def extract_operations(source_dir):
+    """Queries of the gql templates found in the .js files under source_dir"""
+    queries = []
+    for root, _, files in sorted(os.walk(source_dir)):
+        for name in sorted(files):
+            if not name.endswith('.js'):
+                continue
+            with open(os.path.join(root, name)) as f:
+                for template in GQL_TEMPLATE.findall(f.read()):
+                    if '${' not in template:
+                        queries.append(template)
+    return queries
+
+
+class TypenameAdder(Visitor):
+    """Adds __typename to the selection sets, as the Apollo client cache does"""
+
+    def enter_selection_set(self, node, key, parent, *_):
+        if isinstance(parent, OperationDefinitionNode):
+            return None
+        for selection in node.selections:
+            if isinstance(selection, FieldNode) and selection.name.value.startswith(
+                '__'
+            ):
+                return None
+        if isinstance(parent, FieldNode) and any(
+            directive.name.value == 'export' for directive in parent.directives or []
+        ):
+            return None
+        return SelectionSetNode(
+            selections=(
+                *node.selections,
+                FieldNode(name=NameNode(value='__typename'), arguments=(), directives=()),
+            )
+        )
+
+
+def client_query(template):
+    """Query of a gql template as the frontend sends it"""
+    return print_ast(visit(parse(template), TypenameAdder()))
+
+
+def save_operations(source_dir, path=OPERATIONS_PATH, schema=None):
+    """
+    Writes the operations of the frontend that validate against the schema,
+    by hash. Done at package time, it lets the api handler warm up its
+    document cache at cold start.
+    """
+    from . import get_executable_schema
+
+    schema = schema or get_executable_schema()
+    cache = DocumentCache(max_size=0)
+    operations = {}
+    for template in extract_operations(source_dir):
+        try:
+            query = client_query(template)
+            _, errors = cache.load(schema, query)
+        except GraphQLError as e:
+            log.info(f'Skipping operation that does not parse: {e}')
+            continue
+        if errors:
+            log.info(f'Skipping invalid operation: {errors[0].message}')
+        else:
+            operations[query_hash(query)] = query
+    with open(path, 'w') as f:
+        json.dump(operations, f)
+    return operations
+
+
+def load_operations(path=OPERATIONS_PATH):
+    """Queries saved by save_operations, none when the file is missing"""
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return list(json.load(f).values())
@@ -97,7 +97,7 @@ class Ecs:
             stack.EcsTaskArn = Ecs.run_cdkproxy_task(stack_uri=task.targetUri)
 
     @staticmethod
-    def run_cdkproxy_task(stack_uri):
+    def run_cdkproxy_task(stack_uri, force=False):
         envname = os.environ.get('envname', 'local')
         cdkproxy_task_definition = Parameter().get_parameter(
             env=envname, path='ecs/task_def_arn/cdkproxy'
@@ -124,6 +124,7 @@ class Ecs:
                         'name': 'AWS_REGION',
                         'value': os.getenv('AWS_REGION', 'eu-west-1'),
                     },
+                    {'name': 'forceDeploy', 'value': str(force).lower()},
                 ],
                 started_by=f'awsworker-{stack_uri}',
             )
@@ -181,14 +182,33 @@ class Ecs:
 
     @staticmethod
     def is_task_running(cluster_name, started_by):
+        return bool(Ecs.get_running_task_arns(cluster_name, started_by))
+
+    @staticmethod
+    def get_running_task_arns(cluster_name, started_by):
         try:
             client = boto3.client('ecs')
             running_tasks = client.list_tasks(
                 cluster=cluster_name, startedBy=started_by, desiredStatus='RUNNING'
             )
-            if running_tasks and running_tasks.get('taskArns'):
-                return True
-            return False
+            return (running_tasks or {}).get('taskArns', [])
+        except ClientError as e:
+            log.error(e)
+            raise e
+
+    @staticmethod
+    def describe_tasks(cluster_name, task_arns):
+        """Tasks by ARN, described 100 at a time"""
+        tasks = {}
+        try:
+            client = boto3.client('ecs')
+            for i in range(0, len(task_arns), 100):
+                response = client.describe_tasks(
+                    cluster=cluster_name, tasks=task_arns[i : i + 100]
+                )
+                for task in response.get('tasks', []):
+                    tasks[task['taskArn']] = task
+            return tasks
         except ClientError as e:
             log.error(e)
             raise e
@@ -2,6 +2,7 @@ import logging
 
 from botocore.exceptions import ClientError
 
+from .lakeformation import LakeFormation
 from .service_handlers import Worker
 from .sts import SessionHelper
 from ... import db
@@ -9,6 +10,14 @@ from ...db import models
 
 log = logging.getLogger('aws:glue')
 
+# Error codes of throttled AWS calls, which are worth retrying
+THROTTLING_ERROR_CODES = [
+    'ThrottlingException',
+    'Throttling',
+    'TooManyRequestsException',
+    'RequestLimitExceeded',
+]
+
 
 class Glue:
     def __init__(self):
@@ -116,6 +125,9 @@ class Glue:
                 f'Failed to retrieve tables for database {accountid}|{database}: {e}',
                 exc_info=True,
             )
+            # an empty list would flag every table of the database as deleted
+            if e.response['Error']['Code'] in THROTTLING_ERROR_CODES:
+                raise e
         return found_tables
 
     @staticmethod
@@ -763,31 +775,62 @@ class Glue:
         :param client:
         :return:
         """
-        if not client:
-            client = SessionHelper.remote_session(table.AWSAccountId).client(
-                'lakeformation', region_name=table.region
+        Glue.grant_principals_all_tables_permissions(
+            [table], principals=principals, client=client
+        )
+
+    @staticmethod
+    def grant_principals_all_tables_permissions(
+        tables: [models.DatasetTable], principals: [str], client=None
+    ):
+        """
+        Grants the principals all permissions on the tables with batched
+        Lake Formation calls, one series per account and region.
+        The client, if given, is used for all the tables.
+        Every catalog is attempted, then the first failure is raised.
+        :param tables:
+        :param principals:
+        :param client:
+        :return:
+        """
+        error = None
+        tables_by_catalog = {}
+        for table in tables:
+            tables_by_catalog.setdefault((table.AWSAccountId, table.region), []).append(
+                table
+            )
+        for (accountid, region), catalog_tables in tables_by_catalog.items():
+            lf_client = client or SessionHelper.remote_session(accountid).client(
+                'lakeformation', region_name=region
             )
-        for principal in principals:
             try:
-                grant_dict = dict(
-                    Principal={'DataLakePrincipalIdentifier': principal},
-                    Resource={
-                        'Table': {
-                            'DatabaseName': table.GlueDatabaseName,
-                            'Name': table.name,
+                LakeFormation.batch_grant_permissions(
+                    lf_client,
+                    accountid,
+                    [
+                        {
+                            'Principal': {'DataLakePrincipalIdentifier': principal},
+                            'Resource': {
+                                'Table': {
+                                    'DatabaseName': table.GlueDatabaseName,
+                                    'Name': table.name,
+                                }
+                            },
+                            'Permissions': ['ALL'],
                         }
-                    },
-                    Permissions=['ALL'],
+                        for table in catalog_tables
+                        for principal in principals
+                    ],
                 )
-                response = client.grant_permissions(**grant_dict)
-                log.error(
-                    f'Successfully granted principals {principals} all permissions on table '
-                    f'aws://{table.AWSAccountId}/{table.GlueDatabaseName}/{table.name} '
-                    f'access: {response}'
+                log.info(
+                    f'Successfully granted principals {principals} all permissions on '
+                    f'{len(catalog_tables)} tables of aws://{accountid}'
                 )
             except ClientError as e:
                 log.error(
-                    f'Failed to grant admin roles {principals} all permissions on table '
-                    f'aws://{table.AWSAccountId}/{table.GlueDatabaseName}/{table.name} '
-                    f'access: {e}'
+                    f'Failed to grant admin roles {principals} all permissions on '
+                    f'tables of aws://{accountid}: {e}'
                 )
+                error = error or e
+        if error:
+            raise error
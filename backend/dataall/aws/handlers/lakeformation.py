@@ -1,4 +1,5 @@
 import logging
+import time
 import uuid
 
 from botocore.exceptions import ClientError
@@ -8,6 +9,16 @@ from .sts import SessionHelper
 log = logging.getLogger('aws:lakeformation')
 PIVOT_ROLE_NAME_PREFIX = "dataallPivotRole"
 
+# Maximum number of entries accepted by lakeformation:BatchGrantPermissions
+BATCH_GRANT_SIZE = 20
+# Failures of batch grant entries that succeed when retried
+RETRYABLE_GRANT_ERRORS = [
+    'ConcurrentModificationException',
+    'InternalServiceException',
+    'OperationTimeoutException',
+    'ThrottlingException',
+]
+
 
 class LakeFormation:
     def __init__(self):
@@ -110,6 +121,68 @@ class LakeFormation:
             )
             # raise e
 
+    @staticmethod
+    def batch_grant_permissions(client, accountid, entries, max_attempts=3, backoff=1):
+        """
+        Batch grant permissions to entries, in chunks of the API maximum
+        Only the entries that failed with a retryable error, or whose whole
+        call failed with one, are sent again
+        :param client:
+        :param accountid:
+        :param entries:
+        :param max_attempts:
+        :param backoff: seconds to wait before the first retry, doubled after each one
+        :return: number of batch_grant_permissions calls
+        """
+        entries = [dict(entry, Id=entry.get('Id') or str(uuid.uuid4())) for entry in entries]
+        log.info(f'Batch Granting {entries}')
+        calls = 0
+        permanent_failures = []
+        retryable_failures = []
+        for attempt in range(1, max_attempts + 1):
+            retryable_failures = []
+            for i in range(0, len(entries), BATCH_GRANT_SIZE):
+                chunk = entries[i : i + BATCH_GRANT_SIZE]
+                calls += 1
+                try:
+                    response = client.batch_grant_permissions(
+                        CatalogId=accountid, Entries=chunk
+                    )
+                    failures = response.get('Failures', [])
+                except ClientError as e:
+                    code = e.response['Error']['Code']
+                    if code not in RETRYABLE_GRANT_ERRORS:
+                        raise e
+                    failures = [
+                        {'RequestEntry': entry, 'Error': {'ErrorCode': code, 'ErrorMessage': str(e)}}
+                        for entry in chunk
+                    ]
+                for failure in failures:
+                    if failure['Error']['ErrorCode'] in RETRYABLE_GRANT_ERRORS:
+                        retryable_failures.append(failure)
+                    else:
+                        permanent_failures.append(failure)
+            if not retryable_failures or attempt == max_attempts:
+                break
+            log.info(f'Retrying {len(retryable_failures)} failed grant entries')
+            retryable = {failure['RequestEntry']['Id'] for failure in retryable_failures}
+            entries = [entry for entry in entries if entry['Id'] in retryable]
+            time.sleep(backoff * 2 ** (attempt - 1))
+
+        failures = permanent_failures + retryable_failures
+        if failures:
+            log.warning(f'Batch Grant ended with failures: {failures}')
+            raise ClientError(
+                error_response={
+                    'Error': {
+                        'Code': 'LakeFormation.batch_grant_permissions',
+                        'Message': f'Operation ended with failures: {failures}',
+                    }
+                },
+                operation_name='LakeFormation.batch_grant_permissions',
+            )
+        return calls
+
     @staticmethod
     def revoke_iamallowedgroups_super_permission_from_table(
         client, accountid, database, table
@@ -199,63 +272,73 @@ class LakeFormation:
 
     @staticmethod
     def grant_resource_link_permission_on_target(client, source, target):
-        for principal in target['principals']:
-            try:
-                table_grant = dict(
-                    Principal={'DataLakePrincipalIdentifier': principal},
-                    Resource={
-                        'TableWithColumns': {
-                            'DatabaseName': source['database'],
-                            'Name': source['tablename'],
-                            'ColumnWildcard': {},
-                            'CatalogId': source['accountid'],
-                        }
-                    },
-                    Permissions=['DESCRIBE', 'SELECT'],
-                    PermissionsWithGrantOption=[],
-                )
-                client.grant_permissions(**table_grant)
-                log.info(
-                    f'Successfully granted permissions DESCRIBE,SELECT to {principal} on target '
-                    f'{source["accountid"]}://{source["database"]}/{source["tablename"]}'
-                )
-            except ClientError as e:
-                logging.error(
-                    f'Failed granting principal {principal} '
-                    'read access to resource link on target'
-                    f' {source["accountid"]}://{source["database"]}/{source["tablename"]} '
-                    f'due to: {e}'
-                )
-                raise e
+        try:
+            LakeFormation.batch_grant_permissions(
+                client,
+                target['accountid'],
+                [
+                    {
+                        'Principal': {'DataLakePrincipalIdentifier': principal},
+                        'Resource': {
+                            'TableWithColumns': {
+                                'DatabaseName': source['database'],
+                                'Name': source['tablename'],
+                                'ColumnWildcard': {},
+                                'CatalogId': source['accountid'],
+                            }
+                        },
+                        'Permissions': ['DESCRIBE', 'SELECT'],
+                        'PermissionsWithGrantOption': [],
+                    }
+                    for principal in target['principals']
+                ],
+            )
+            log.info(
+                f'Successfully granted permissions DESCRIBE,SELECT to {target["principals"]} on target '
+                f'{source["accountid"]}://{source["database"]}/{source["tablename"]}'
+            )
+        except ClientError as e:
+            logging.error(
+                f'Failed granting principals {target["principals"]} '
+                'read access to resource link on target'
+                f' {source["accountid"]}://{source["database"]}/{source["tablename"]} '
+                f'due to: {e}'
+            )
+            raise e
 
     @staticmethod
     def grant_resource_link_permission(client, source, target, target_database):
-        for principal in target['principals']:
-            resourcelink_grant = dict(
-                Principal={'DataLakePrincipalIdentifier': principal},
-                Resource={
-                    'Table': {
-                        'DatabaseName': target_database,
-                        'Name': source['tablename'],
-                        'CatalogId': target['accountid'],
+        try:
+            LakeFormation.batch_grant_permissions(
+                client,
+                target['accountid'],
+                [
+                    {
+                        'Principal': {'DataLakePrincipalIdentifier': principal},
+                        'Resource': {
+                            'Table': {
+                                'DatabaseName': target_database,
+                                'Name': source['tablename'],
+                                'CatalogId': target['accountid'],
+                            }
+                        },
+                        # Resource link only supports DESCRIBE and DROP permissions no SELECT
+                        'Permissions': ['DESCRIBE'],
                     }
-                },
-                # Resource link only supports DESCRIBE and DROP permissions no SELECT
-                Permissions=['DESCRIBE'],
+                    for principal in target['principals']
+                ],
             )
-            try:
-                client.grant_permissions(**resourcelink_grant)
-                log.info(
-                    f'Granted resource link DESCRIBE access '
-                    f'to principal {principal} on {target["accountid"]}://{target_database}/{source["tablename"]}'
-                )
-            except ClientError as e:
-                logging.error(
-                    f'Failed granting principal {principal} '
-                    f'read access to resource link on {target["accountid"]}://{target_database}/{source["tablename"]} '
-                    f'due to: {e}'
-                )
-                raise e
+            log.info(
+                f'Granted resource link DESCRIBE access '
+                f'to principals {target["principals"]} on {target["accountid"]}://{target_database}/{source["tablename"]}'
+            )
+        except ClientError as e:
+            logging.error(
+                f'Failed granting principals {target["principals"]} '
+                f'read access to resource link on {target["accountid"]}://{target_database}/{source["tablename"]} '
+                f'due to: {e}'
+            )
+            raise e
 
     @staticmethod
     def revoke_source_table_access(**data):
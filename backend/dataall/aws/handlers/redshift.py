@@ -1,5 +1,8 @@
 import json
 import logging
+import os
+import threading
+import time
 from datetime import datetime, timedelta
 
 from botocore.exceptions import ClientError
@@ -12,6 +15,68 @@ from ...db import models
 
 log = logging.getLogger(__name__)
 
+# Statuses of Redshift Data API statements that will not change anymore
+DONE_STATEMENT_STATUSES = ['FINISHED', 'FAILED', 'ABORTED']
+STATEMENT_POLL_INTERVAL = 2
+# Seconds a copy waits for its clusters, well below the 15 minutes of the
+# worker Lambda that processes up to 10 tasks per invocation
+STATEMENT_TIMEOUT = int(os.getenv('REDSHIFT_COPY_TIMEOUT', '300'))
+
+
+class GlueSchemaCache:
+    """
+    Process wide cache of the Glue columns of the dataset tables, keyed by
+    table and by the last update of its catalog entry, so that a new table
+    version synced by the tables syncer is read again.
+    Entries expire after ttl seconds.
+    """
+
+    def __init__(self, ttl: float = None, clock=time.monotonic):
+        self.ttl = (
+            ttl if ttl is not None else float(os.getenv('GLUE_SCHEMA_CACHE_TTL', '300'))
+        )
+        self.clock = clock
+        self._schemas = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_columns(self, table: models.DatasetTable):
+        """Columns and VersionId of the Glue table, or (None, None) if it is missing"""
+        key = (
+            table.AWSAccountId,
+            table.region,
+            table.GlueDatabaseName,
+            table.GlueTableName,
+            table.updated or table.created,
+        )
+        with self._lock:
+            entry = self._schemas.get(key)
+            if entry and entry[0] > self.clock():
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        glue_table = Glue.table_exists(
+            **{
+                'accountid': table.AWSAccountId,
+                'region': table.region,
+                'database': table.GlueDatabaseName,
+                'tablename': table.GlueTableName,
+            }
+        )
+        if not glue_table:
+            return None, None
+        schema = (
+            glue_table['Table'].get('StorageDescriptor', {}).get('Columns'),
+            glue_table['Table'].get('VersionId'),
+        )
+        with self._lock:
+            self._schemas[key] = (self.clock() + self.ttl, schema)
+        return schema
+
+
+glue_schema_cache = GlueSchemaCache()
+
 
 class Redshift:
     def __init__(self):
@@ -436,6 +501,12 @@ class Redshift:
     @staticmethod
     @Worker.handler(path='redshift.subscriptions.copy')
     def copy_data(engine, task: models.Task):
+        """
+        Copies the updated table to the clusters of the environment where its
+        copy is enabled. The statements of each cluster run as one transaction
+        and the clusters are copied concurrently.
+        Returns the copy report of every cluster, with the timing of its statements.
+        """
         with engine.scoped_session() as session:
 
             environment: models.Environment = session.query(models.Environment).get(
@@ -465,18 +536,13 @@ class Redshift:
             if not message:
                 raise Exception('Task message can not be found')
 
-            glue_table = Glue.table_exists(
-                **{
-                    'accountid': table.AWSAccountId,
-                    'region': table.region,
-                    'database': table.GlueDatabaseName,
-                    'tablename': table.GlueTableName,
-                }
-            )
-            columns = (
-                glue_table.get('Table').get('StorageDescriptor', {}).get('Columns')
-            )
-            log.info(f'Glue table columns: {columns}')
+            columns, version = glue_schema_cache.get_columns(table)
+            if columns is None:
+                raise Exception(
+                    f'Glue table {table.GlueDatabaseName}.{table.GlueTableName} '
+                    f'can not be found'
+                )
+            log.info(f'Glue table columns of version {version}: {columns}')
 
             ddl_columns = ','.join(
                 [
@@ -486,6 +552,8 @@ class Redshift:
             )
             log.info(f'DDL Columns: {ddl_columns}')
 
+            table_name = table.GlueTableName
+            batches = []
             for cluster in env_clusters:
                 cluster_dataset_table = (
                     db.api.RedshiftCluster.get_cluster_dataset_table(
@@ -497,51 +565,133 @@ class Redshift:
                         f'Cluster {cluster}|{environment.AwsAccountId} '
                         f'copy from {dataset.name} for table {table.GlueTableName} is enabled'
                     )
-                    queries = list()
-                    queries.append(
-                        f'CREATE SCHEMA IF NOT EXISTS {cluster_dataset_table.schema}'
-                    )
-                    queries.append(
-                        f'GRANT ALL ON SCHEMA {cluster_dataset_table.schema} TO {cluster.databaseUser}'
-                    )
-                    queries.append(
-                        f'GRANT ALL ON SCHEMA {cluster_dataset_table.schema} TO GROUP PUBLIC'
-                    )
-                    queries.append(
-                        Redshift.get_create_table_statement(
-                            cluster_dataset_table.schema,
-                            table.GlueTableName,
-                            ddl_columns,
-                        )
-                    )
-                    queries.append(
-                        f'GRANT ALL ON TABLE {cluster_dataset_table.schema}.{table.GlueTableName} TO {cluster.databaseUser}'
-                    )
-                    queries.append(
-                        f'GRANT ALL ON TABLE {cluster_dataset_table.schema}.{table.GlueTableName} TO GROUP PUBLIC'
-                    )
-                    data_prefix = Redshift.get_data_prefix(cluster_dataset_table)
-                    queries.extend(
-                        Redshift.get_merge_table_statements(
-                            cluster_dataset_table.schema,
-                            table.GlueTableName,
-                            data_prefix,
-                            environment.EnvironmentDefaultIAMRoleArn,
-                            ddl_columns,
+                    batches.append(
+                        (
+                            cluster,
+                            Redshift.get_copy_statements(
+                                cluster_dataset_table.schema,
+                                table.GlueTableName,
+                                cluster.databaseUser,
+                                Redshift.get_data_prefix(cluster_dataset_table),
+                                environment.EnvironmentDefaultIAMRoleArn,
+                                ddl_columns,
+                            ),
                         )
                     )
-                    for query in queries:
-                        Redshift.run_query(
-                            **{
-                                'accountid': cluster.AwsAccountId,
-                                'region': cluster.region,
-                                'cluster_id': cluster.name,
-                                'database': cluster.databaseName,
-                                'dbuser': cluster.databaseUser,
-                                'sql_query': query,
-                            }
-                        )
-        return True
+
+        report = Redshift.batch_execute_statements(batches)
+        failed = [entry for entry in report if entry['status'] != 'FINISHED']
+        if failed:
+            raise Exception(
+                f'Copy of table {table_name} failed on '
+                f'{len(failed)} of {len(report)} clusters: {failed}'
+            )
+        return {'glueTableVersion': version, 'clusters': report}
+
+    @staticmethod
+    def get_copy_statements(
+        schema, table_name, database_user, data_prefix, iam_role_arn, columns
+    ):
+        """Statements replacing the cluster table with the data of the prefix"""
+        statements = [
+            f'CREATE SCHEMA IF NOT EXISTS {schema}',
+            f'GRANT ALL ON SCHEMA {schema} TO {database_user}',
+            f'GRANT ALL ON SCHEMA {schema} TO GROUP PUBLIC',
+        ]
+        statements.extend(
+            Redshift.get_merge_table_statements(
+                schema, table_name, data_prefix, iam_role_arn, columns
+            )
+        )
+        statements.extend(
+            [
+                f'GRANT ALL ON TABLE {schema}.{table_name} TO {database_user}',
+                f'GRANT ALL ON TABLE {schema}.{table_name} TO GROUP PUBLIC',
+            ]
+        )
+        return statements
+
+    @staticmethod
+    def batch_execute_statements(batches, poll_interval=None, timeout=None):
+        """
+        Submits the statements of every (cluster, statements) batch with one
+        batch_execute_statement, run by Redshift as a single transaction.
+        All batches are submitted before their completion is polled, so the
+        clusters run them concurrently. Batches still running after timeout
+        seconds, REDSHIFT_COPY_TIMEOUT by default, are reported as TIMEOUT.
+        Returns one report per cluster with the duration of its statements.
+        """
+        poll_interval = (
+            poll_interval if poll_interval is not None else STATEMENT_POLL_INTERVAL
+        )
+        timeout = timeout if timeout is not None else STATEMENT_TIMEOUT
+        report, pending = [], {}
+        for cluster, statements in batches:
+            entry = {
+                'clusterUri': cluster.clusterUri,
+                'cluster': cluster.name,
+                'status': 'SUBMITTED',
+            }
+            report.append(entry)
+            try:
+                client = SessionHelper.remote_session(cluster.AwsAccountId).client(
+                    'redshift-data', region_name=cluster.region
+                )
+                response = client.batch_execute_statement(
+                    ClusterIdentifier=cluster.name,
+                    Database=cluster.databaseName,
+                    DbUser=cluster.databaseUser,
+                    Sqls=statements,
+                )
+                log.info(f'Submitted {len(statements)} statements to {cluster.name}')
+                pending[response['Id']] = (client, entry)
+            except ClientError as e:
+                log.error(f'Failed to submit statements to {cluster.name}: {e}')
+                entry.update(status='FAILED', error=str(e))
+
+        deadline = time.monotonic() + timeout
+        while pending:
+            for statement_id, (client, entry) in list(pending.items()):
+                try:
+                    description = client.describe_statement(Id=statement_id)
+                except ClientError as e:
+                    log.error(f'Failed to describe statement {statement_id}: {e}')
+                    entry.update(status='FAILED', error=str(e))
+                    del pending[statement_id]
+                    continue
+                if description['Status'] in DONE_STATEMENT_STATUSES:
+                    entry.update(Redshift.get_statement_report(description))
+                    del pending[statement_id]
+            if pending and time.monotonic() > deadline:
+                for statement_id, (client, entry) in pending.items():
+                    log.error(f'Statement {statement_id} timed out after {timeout}s')
+                    entry.update(status='TIMEOUT', id=statement_id)
+                break
+            if pending:
+                time.sleep(poll_interval)
+
+        for entry in report:
+            if entry['status'] != 'FINISHED':
+                log.error(f'Copy to cluster {entry["cluster"]} failed: {entry}')
+        return report
+
+    @staticmethod
+    def get_statement_report(description):
+        """Status, error and durations in seconds of a batch and its statements"""
+        return {
+            'status': description['Status'],
+            'error': description.get('Error'),
+            'duration': description.get('Duration', 0) / 1e9,
+            'statements': [
+                {
+                    'sql': statement.get('QueryString'),
+                    'status': statement.get('Status'),
+                    'duration': statement.get('Duration', 0) / 1e9,
+                    'error': statement.get('Error'),
+                }
+                for statement in description.get('SubStatements', [])
+            ],
+        }
 
     @staticmethod
     def get_data_prefix(table: models.RedshiftClusterDatasetTable):
@@ -586,28 +736,14 @@ class Redshift:
     def get_merge_table_statements(
         schema, table_name, data_prefix, iam_role_arn, columns
     ):
-        statements = list()
-        statements.append(
-            f"""CREATE TABLE "{schema}"."{table_name}_stage"({columns});"""
-        )
-        statements.append(
-            f"""COPY "{schema}"."{table_name}_stage" FROM '{data_prefix}' iam_role '{iam_role_arn}' format as parquet;"""
-        )
-        statements.append(
-            f"""CREATE TABLE "{schema}"."{table_name}_stage"({columns};"""
-        )
-        statements.append(
-            f"""
-                        -- Start a new transaction
-                        begin transaction;
-
-                        drop table if exists "{schema}"."{table_name}";
-
-                        -- Insert all the rows from the staging table into the target table
-                        alter table "{schema}"."{table_name}_stage" rename to "{table_name}";
-
-                        -- End transaction and commit
-                        end transaction;
         """
-        )
-        return statements
+        Statements loading the data in a stage table that replaces the table.
+        They are meant to run in one transaction, see batch_execute_statements.
+        """
+        return [
+            f'DROP TABLE IF EXISTS "{schema}"."{table_name}_stage"',
+            f'CREATE TABLE "{schema}"."{table_name}_stage"({columns})',
+            f"""COPY "{schema}"."{table_name}_stage" FROM '{data_prefix}' iam_role '{iam_role_arn}' format as parquet""",
+            f'DROP TABLE IF EXISTS "{schema}"."{table_name}"',
+            f'ALTER TABLE "{schema}"."{table_name}_stage" RENAME TO "{table_name}"',
+        ]
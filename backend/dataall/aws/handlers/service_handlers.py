@@ -1,6 +1,8 @@
+import json
 import logging
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from functools import wraps
 
 from ...db.models import Task
@@ -8,6 +10,18 @@ from ...utils.json_utils import to_json
 
 log = logging.getLogger(__name__)
 ENVNAME = os.getenv('envname', 'local')
+MAX_WORKERS = int(os.getenv('WORKER_MAX_WORKERS', '4'))
+# Seconds a task may need, no task is started closer than this to the timeout
+TASK_TIME_BUDGET = int(os.getenv('WORKER_TASK_TIME_BUDGET', '300'))
+
+
+class TaskTimeBudgetExceeded(Exception):
+    def __init__(self, task_ids):
+        super().__init__(
+            f'Not enough time left to start tasks {task_ids} '
+            f'(WORKER_TASK_TIME_BUDGET={TASK_TIME_BUDGET}s)'
+        )
+        self.task_ids = task_ids
 
 
 class WorkerHandler:
@@ -33,22 +47,44 @@ class WorkerHandler:
 
         return decorator
 
-    def process(self, engine, task_ids: [str], save_response=True):
+    def process(
+        self,
+        engine,
+        task_ids: [str],
+        save_response=True,
+        raise_errors=False,
+        deadline=None,
+    ):
+        """
+        Runs the tasks in the given order and returns their responses.
+        Tasks that are not pending or have no handler are skipped.
+        No task is started after the time.monotonic() deadline, the tasks
+        left are released as pending and TaskTimeBudgetExceeded is raised.
+        """
         tasks_responses = []
         if self.enabled:
-            for taskid in task_ids:
+            if deadline is not None and time.monotonic() > deadline:
+                raise TaskTimeBudgetExceeded(task_ids)
+            tasks = self.claim_tasks(engine, task_ids)
+            for i, taskid in enumerate(task_ids):
+                if taskid not in tasks:
+                    continue
+                if deadline is not None and time.monotonic() > deadline:
+                    left = [t for t in task_ids[i:] if t in tasks]
+                    self.release_tasks(engine, left)
+                    raise TaskTimeBudgetExceeded(left)
                 try:
                     log.info(f'Processing Task: {taskid}')
-                    handler, task = self.get_task_handler(engine, taskid)
-
+                    task = tasks[taskid]
+                    handler = self.handlers[task.action]
                     error, response, status = self.handle_task(engine, task, handler)
-                    if save_response:
-                        WorkerHandler.update_task(
-                            engine, taskid, error, to_json(response), status
-                        )
-
-                    else:
-                        WorkerHandler.update_task(engine, taskid, error, {}, status)
+                    WorkerHandler.update_task(
+                        engine,
+                        taskid,
+                        error,
+                        to_json(response) if save_response else {},
+                        status,
+                    )
                     tasks_responses.append(
                         {
                             'taskUri': taskid,
@@ -57,29 +93,107 @@ class WorkerHandler:
                             'status': status,
                         }
                     )
-                    return tasks_responses
                 except Exception as e:
                     log.exception('Error in process')
                     log.error(f'Task processing failed {e} : {taskid}')
+                    if raise_errors:
+                        self.release_tasks(
+                            engine, [t for t in task_ids[i + 1 :] if t in tasks]
+                        )
+                        raise e
         else:
             log.info(f'Worker disabled, tasks {task_ids} wont be processed')
+        return tasks_responses
+
+    def process_messages(
+        self, engine, messages: dict, max_workers=MAX_WORKERS, deadline=None
+    ):
+        """
+        Processes a batch of queue messages, each one holding a list of task
+        ids, given as {message_id: body}. The tasks of one message run in
+        order, but SqsQueue.send queues one task per message, so tasks queued
+        together are not ordered. The messages run concurrently on up to
+        max_workers threads, each with its own database session.
+        Messages whose tasks are not started before the deadline are failed
+        with their tasks left pending, so that they are delivered again.
+        Returns the ids of the messages that could not be processed.
+        """
 
-    def get_task_handler(self, engine, taskid):
+        def process_message(message_id, body):
+            try:
+                with engine.request_scope():
+                    self.process(
+                        engine=engine,
+                        task_ids=json.loads(body),
+                        raise_errors=True,
+                        deadline=deadline,
+                    )
+                return None
+            except Exception as e:
+                log.error(f'Failed to process message {message_id}: {e}')
+                return message_id
+
+        if len(messages) <= 1 or max_workers <= 1:
+            results = [process_message(*m) for m in messages.items()]
+        else:
+            with ThreadPoolExecutor(
+                max_workers=min(max_workers, len(messages))
+            ) as executor:
+                results = list(
+                    executor.map(lambda m: process_message(*m), messages.items())
+                )
+        return [message_id for message_id in results if message_id]
+
+    @staticmethod
+    def release_tasks(engine, task_ids: [str]):
+        """Sets claimed tasks that were not run back to pending"""
+        if not task_ids:
+            return
         with engine.scoped_session() as session:
-            task = session.query(Task).get(taskid)
-            handler = self.handlers.get(task.action)
-            log.info(
-                f' found handler {handler} for task action {task.action}|{task.taskUri}'
+            session.execute(
+                Task.__table__.update()
+                .where(Task.taskUri.in_(task_ids))
+                .where(Task.status == 'started')
+                .values(status='pending')
             )
-            if task.status != 'pending':
-                raise Exception(
-                    f'Could not start task {task.taskUri} as its status is {task.status}'
-                )
-            if not handler:
-                raise Exception(f'No handler defined for {task.action}')
-            task.status = 'started'
             session.commit()
-        return handler, task
+        log.info(f'Released tasks {task_ids}, they will be delivered again')
+
+    def claim_tasks(self, engine, task_ids: [str]) -> dict:
+        """
+        Marks the pending tasks having a handler as started with one UPDATE,
+        so that a task delivered twice runs once, and returns them by id.
+        """
+        if not task_ids:
+            return {}
+        with engine.scoped_session() as session:
+            claimed = session.execute(
+                Task.__table__.update()
+                .where(Task.taskUri.in_(task_ids))
+                .where(Task.status == 'pending')
+                .where(Task.action.in_(list(self.handlers.keys())))
+                .values(status='started')
+                .returning(Task.taskUri)
+            ).fetchall()
+            claimed = [row.taskUri for row in claimed]
+            tasks = (
+                {
+                    task.taskUri: task
+                    for task in session.query(Task).filter(Task.taskUri.in_(claimed))
+                }
+                if claimed
+                else {}
+            )
+            session.commit()
+        for taskid in set(task_ids) - set(tasks):
+            log.error(
+                f'Could not start task {taskid}: it is not pending or has no handler'
+            )
+        for task in tasks.values():
+            log.info(
+                f' found handler {self.handlers[task.action]} for task action {task.action}|{task.taskUri}'
+            )
+        return tasks
 
     @staticmethod
     def handle_task(engine, task: Task, handler):
@@ -3,13 +3,16 @@ import logging
 import os
 import uuid
 
-import boto3
 from botocore.exceptions import ClientError
 
 from ...utils import Parameter
+from ...utils.parameter_cache import parameter_cache
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of entries accepted by sqs:SendMessageBatch
+SEND_BATCH_SIZE = 10
+
 
 class SqsQueue:
     disabled = True
@@ -38,25 +41,43 @@ class SqsQueue:
     @classmethod
     def get_sqs_client(cls):
         if not cls.disabled:
-            client = boto3.client(
-                'sqs', region_name=os.getenv('AWS_REGION', 'eu-west-1')
-            )
-            return client
+            return parameter_cache.client('sqs')
 
     @classmethod
     def send(cls, engine, task_ids: [str]):
+        """
+        Sends one message per task with batched sqs:SendMessageBatch calls,
+        so that the worker processes the tasks concurrently and retries
+        them independently
+        """
         cls.configure_(
             Parameter().get_parameter(env=cls.get_envname(), path='sqs/queue_url')
         )
         client = cls.get_sqs_client()
         logger.debug(f'Sending task {task_ids} through SQS {cls.queue_url}')
+        responses = []
         try:
-            return client.send_message(
-                QueueUrl=cls.queue_url,
-                MessageBody=json.dumps(task_ids),
-                MessageGroupId=cls._get_random_message_id(),
-                MessageDeduplicationId=cls._get_random_message_id(),
-            )
+            for i in range(0, len(task_ids), SEND_BATCH_SIZE):
+                response = client.send_message_batch(
+                    QueueUrl=cls.queue_url,
+                    Entries=[
+                        {
+                            'Id': str(index),
+                            'MessageBody': json.dumps([task_id]),
+                            'MessageGroupId': cls._get_random_message_id(),
+                            'MessageDeduplicationId': cls._get_random_message_id(),
+                        }
+                        for index, task_id in enumerate(
+                            task_ids[i : i + SEND_BATCH_SIZE]
+                        )
+                    ],
+                )
+                if response.get('Failed'):
+                    raise Exception(
+                        f'Failed to send tasks to SQS: {response["Failed"]}'
+                    )
+                responses.append(response)
+            return responses
         except ClientError as e:
             logger.error(e)
             raise e
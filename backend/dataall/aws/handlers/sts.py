@@ -1,12 +1,16 @@
 import json
 import logging
 import os
+import threading
 import urllib
 
 import boto3
+import botocore.session
 from botocore.client import Config
+from botocore.credentials import RefreshableCredentials
 from botocore.exceptions import ClientError
 
+from dataall.utils.parameter_cache import parameter_cache, KNOWN_PATHS
 from dataall.version import __version__, __pkg_name__
 
 try:
@@ -20,6 +24,70 @@ except ImportError:
 log = logging.getLogger(__name__)
 
 
+class ClientCachingSession(boto3.Session):
+    """boto3 Session creating one client per service, region and endpoint"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._clients = {}
+        self._clients_lock = threading.Lock()
+
+    def client(self, service_name, region_name=None, endpoint_url=None, **kwargs):
+        if kwargs:
+            return super().client(
+                service_name, region_name=region_name, endpoint_url=endpoint_url, **kwargs
+            )
+        key = (service_name, region_name, endpoint_url)
+        with self._clients_lock:
+            if key not in self._clients:
+                self._clients[key] = super().client(
+                    service_name, region_name=region_name, endpoint_url=endpoint_url
+                )
+            return self._clients[key]
+
+
+class RemoteSessionCache:
+    """
+    Process wide cache of the assumed role sessions, keyed by
+    (account, role arn, region). The sessions hold refreshable credentials
+    that assume the role again shortly before they expire.
+    """
+
+    def __init__(self):
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    def get(self, key, create):
+        with self._lock:
+            session = self._sessions.get(key)
+            if session:
+                self.hits += 1
+                return session
+            self.misses += 1
+        session = create()
+        with self._lock:
+            return self._sessions.setdefault(key, session)
+
+    def invalidate(self, accountid=None):
+        with self._lock:
+            for key in [k for k in self._sessions if accountid in (None, k[0])]:
+                del self._sessions[key]
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'refreshes': self.refreshes,
+            'size': len(self._sessions),
+        }
+
+
+REMOTE_SESSIONS = RemoteSessionCache()
+
+
 class SessionHelper:
     """SessionHelpers is a class simplifying common aws boto3 session tasks and helpers"""
 
@@ -35,39 +103,75 @@ class SessionHelper:
                     If role_arn is provided, base_session should be a boto3 session on the aws accountid is defined
         """
         if role_arn:
-            external_id_secret = cls.get_external_id_secret()
-            if external_id_secret:
-                assume_role_dict = dict(
-                    RoleArn=role_arn,
-                    RoleSessionName=role_arn.split('/')[1],
-                    ExternalId=external_id_secret,
-                )
-            else:
-                assume_role_dict = dict(
-                    RoleArn=role_arn,
-                    RoleSessionName=role_arn.split('/')[1],
-                )
-            try:
-                region = os.getenv('AWS_REGION', 'eu-west-1')
-                sts = base_session.client(
-                    'sts',
-                    config=Config(user_agent_extra=f'{__pkg_name__}/{__version__}'),
-                    region_name=region,
-                    endpoint_url=f"https://sts.{region}.amazonaws.com"
-                )
-                response = sts.assume_role(**assume_role_dict)
-                return boto3.Session(
-                    aws_access_key_id=response['Credentials']['AccessKeyId'],
-                    aws_secret_access_key=response['Credentials']['SecretAccessKey'],
-                    aws_session_token=response['Credentials']['SessionToken'],
-                )
-            except ClientError as e:
-                log.error(f'Failed to assume role {role_arn} due to: {e} ')
-                raise e
+            response = cls._assume_role(base_session, role_arn)
+            return boto3.Session(
+                aws_access_key_id=response['Credentials']['AccessKeyId'],
+                aws_secret_access_key=response['Credentials']['SecretAccessKey'],
+                aws_session_token=response['Credentials']['SessionToken'],
+            )
 
         else:
             return boto3.Session()
 
+    @classmethod
+    def _assume_role(cls, base_session, role_arn):
+        external_id_secret = cls.get_external_id_secret()
+        if external_id_secret:
+            assume_role_dict = dict(
+                RoleArn=role_arn,
+                RoleSessionName=role_arn.split('/')[1],
+                ExternalId=external_id_secret,
+            )
+        else:
+            assume_role_dict = dict(
+                RoleArn=role_arn,
+                RoleSessionName=role_arn.split('/')[1],
+            )
+        try:
+            region = os.getenv('AWS_REGION', 'eu-west-1')
+            sts = base_session.client(
+                'sts',
+                config=Config(user_agent_extra=f'{__pkg_name__}/{__version__}'),
+                region_name=region,
+                endpoint_url=f"https://sts.{region}.amazonaws.com"
+            )
+            return sts.assume_role(**assume_role_dict)
+        except ClientError as e:
+            log.error(f'Failed to assume role {role_arn} due to: {e} ')
+            raise e
+
+    @classmethod
+    def get_refreshable_session(cls, base_session, role_arn):
+        """Returns a boto3 session assuming role_arn again when its credentials are about to expire
+        Args:
+            base_session(object) : a boto3 session allowed to assume role_arn
+            role_arn(string) : a role arn
+        Returns:
+            boto3.session.Session : a boto3 session reusing its clients
+        """
+
+        def assume_role():
+            credentials = cls._assume_role(base_session, role_arn)['Credentials']
+            return {
+                'access_key': credentials['AccessKeyId'],
+                'secret_key': credentials['SecretAccessKey'],
+                'token': credentials['SessionToken'],
+                'expiry_time': credentials['Expiration'].isoformat(),
+            }
+
+        def refresh():
+            log.info(f'Refreshing credentials of role {role_arn}')
+            REMOTE_SESSIONS.refreshes += 1
+            return assume_role()
+
+        botocore_session = botocore.session.get_session()
+        botocore_session._credentials = RefreshableCredentials.create_from_metadata(
+            metadata=assume_role(),
+            refresh_using=refresh,
+            method='sts-assume-role',
+        )
+        return ClientCachingSession(botocore_session=botocore_session)
+
     @classmethod
     def _get_parameter_value(cls, parameter_path=None):
         """
@@ -76,13 +180,14 @@ class SessionHelper:
         :rtype:
         """
         parameter_value = None
-        region = os.getenv('AWS_REGION', 'eu-west-1')
         if not parameter_path:
             raise Exception('Parameter name is None')
+        envname = os.getenv('envname', 'local')
         try:
-            session = SessionHelper.get_session()
-            client = session.client('ssm', region_name=region)
-            parameter_value = client.get_parameter(Name=parameter_path)['Parameter']['Value']
+            parameter_value = parameter_cache.get_parameter(
+                parameter_path,
+                prefetch=[f'/dataall/{envname}/{path}' for path in KNOWN_PATHS],
+            )
             log.debug(f'Found Parameter {parameter_path}|{parameter_value}')
         except ClientError as e:
             log.warning(f'Parameter {parameter_path} not found: {e}')
@@ -204,15 +309,16 @@ class SessionHelper:
         Returns :
             boto3.session.Session: boto3 Session, on the target aws accountid, assuming the delegation role or a provided role
         """
-        base_session = cls.get_session()
         if role:
             log.info(f"Remote boto3 session using role={role} for account={accountid}")
             role_arn = role
         else:
             log.info(f"Remote boto3 session using pivot role for account= {accountid}")
             role_arn = cls.get_delegation_role_arn(accountid=accountid)
-        session = SessionHelper.get_session(base_session=base_session, role_arn=role_arn)
-        return session
+        return REMOTE_SESSIONS.get(
+            (accountid, role_arn, os.getenv('AWS_REGION', 'eu-west-1')),
+            lambda: cls.get_refreshable_session(cls.get_session(), role_arn),
+        )
 
     @classmethod
     def get_account(cls, session=None):
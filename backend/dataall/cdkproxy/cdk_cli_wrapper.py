@@ -3,10 +3,14 @@
 # Additionally, it uses the cdk plugin cdk-assume-role-credential-plugin to run cdk commands on target accounts
 # see : https://github.com/aws-samples/cdk-assume-role-credential-plugin
 
+import hashlib
+import json
 import logging
 import os
+import shutil
 import subprocess
 import sys
+import tempfile
 import ast
 
 import boto3
@@ -23,6 +27,9 @@ logger = logging.getLogger('cdksass')
 
 ENVNAME = os.getenv('envname', 'local')
 
+# CloudFormation statuses of a stack left as its last deployed template
+DEPLOYED_STACK_STATUSES = ['CREATE_COMPLETE', 'UPDATE_COMPLETE', 'IMPORT_COMPLETE']
+
 
 def aws_configure(profile_name='default'):
     print('..............................................')
@@ -53,7 +60,69 @@ def update_stack_output(session, stack):
         stack.outputs = outputs
 
 
-def deploy_cdk_stack(engine: Engine, stackid: str, app_path: str = None, path: str = None):
+def template_fingerprint(assembly_dir, parameters):
+    """
+    Hash of the stack templates and asset hashes of a synthesized cloud
+    assembly, with the context parameters the stack was synthesized with.
+    """
+    digest = hashlib.sha256(json.dumps(parameters, sort_keys=True).encode('utf-8'))
+    with open(os.path.join(assembly_dir, 'manifest.json')) as f:
+        manifest = json.load(f)
+    for name, artifact in sorted(manifest.get('artifacts', {}).items()):
+        properties = artifact.get('properties', {})
+        if artifact.get('type') == 'aws:cloudformation:stack':
+            digest.update(name.encode('utf-8'))
+            with open(os.path.join(assembly_dir, properties['templateFile']), 'rb') as f:
+                digest.update(f.read())
+            digest.update(
+                json.dumps(properties.get('parameters', {}), sort_keys=True).encode('utf-8')
+            )
+        elif artifact.get('type') == 'cdk:asset-manifest':
+            with open(os.path.join(assembly_dir, properties['file'])) as f:
+                assets = json.load(f)
+            for kind in ['files', 'dockerImages']:
+                digest.update(json.dumps(sorted(assets.get(kind, {}))).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def synth_cdk_stack(app_args, context_args, env, cwd):
+    """Synthesizes the app in a temporary cloud assembly, None if synth fails"""
+    assembly_dir = tempfile.mkdtemp(prefix='cdk.out.')
+    cmd = ['' '. ~/.nvm/nvm.sh &&', 'cdk', 'synth', '--quiet', '-o', assembly_dir] + context_args + app_args
+    logger.info(f"Running command : \n {' '.join(cmd)}")
+    process = subprocess.run(
+        ' '.join(cmd),
+        text=True,
+        shell=True,  # nosec
+        encoding='utf-8',
+        env=env,
+        cwd=cwd,
+    )
+    if process.returncode != 0:
+        logger.warning(f'Failed to synthesize stack due to {str(process.stderr)}, deploying from the app')
+        shutil.rmtree(assembly_dir, ignore_errors=True)
+        return None
+    return assembly_dir
+
+
+def is_stack_unchanged(stack, fingerprint):
+    """True when the fingerprint was deployed last and the stack is still deployed"""
+    if not fingerprint or stack.templateFingerprint != fingerprint:
+        return False
+    try:
+        return describe_stack(stack)['StackStatus'] in DEPLOYED_STACK_STATUSES
+    except ClientError as e:
+        logger.warning(f'Failed to describe stack {stack.name} due to: {e}')
+        return False
+
+
+def deploy_cdk_stack(engine: Engine, stackid: str, app_path: str = None, path: str = None, force: bool = False):
+    """
+    Deploys the stack, unless its synthesized templates, assets and parameters
+    have the fingerprint of its last successful deployment and the
+    CloudFormation stack is still deployed. force deploys it anyway.
+    Returns 'deployed', 'skipped' or 'failed'.
+    """
     logger.warning(f'Starting new stack from  stackid {stackid}')
     region = os.getenv('AWS_REGION', 'eu-west-1')
     sts = boto3.client(
@@ -72,6 +141,8 @@ def deploy_cdk_stack(engine: Engine, stackid: str, app_path: str = None, path: s
             stack: models.Stack = session.query(models.Stack).get(stackid)
             logger.warning(f'stackuri = {stack.stackUri}, stackId = {stack.stackid}')
             stack.status = 'PENDING'
+            # set again when this deployment is skipped
+            stack.deploySkipped = False
             session.commit()
 
             if stack.stack == 'cdkpipeline':
@@ -115,33 +186,23 @@ def deploy_cdk_stack(engine: Engine, stackid: str, app_path: str = None, path: s
             app_path = app_path or './app.py'
 
             logger.info(f'app_path: {app_path}')
-            cmd = [
-                '' '. ~/.nvm/nvm.sh &&',
-                'cdk',
-                'deploy --all',
-                '--require-approval',
-                ' never',
-                '-c',
-                f"appid='{stack.name}'",
+            parameters = {
+                # the stack name
+                'appid': stack.name,
                 # the target accountid
-                '-c',
-                f"account='{stack.accountid}'",
+                'account': stack.accountid,
                 # the target region
-                '-c',
-                f"region='{stack.region}'",
+                'region': stack.region,
                 # the predefined stack
-                '-c',
-                f"stack='{stack.stack}'",
+                'stack': stack.stack,
                 # the payload for the stack with additional parameters
-                '-c',
-                f"target_uri='{stack.targetUri}'",
-                '-c',
-                "data='{}'",
-                # skips synth step when no changes apply
-                '--app',
-                f'"{sys.executable} {app_path}"',
-                '--verbose',
-            ]
+                'target_uri': stack.targetUri,
+                'data': '{}',
+            }
+            context_args = []
+            for key, value in parameters.items():
+                context_args.extend(['-c', f"{key}='{value}'"])
+            app_args = ['--app', f'"{sys.executable} {app_path}"']
 
             if stack.stack == 'cdkpipeline':
                 aws = SessionHelper.remote_session(stack.accountid)
@@ -158,6 +219,31 @@ def deploy_cdk_stack(engine: Engine, stackid: str, app_path: str = None, path: s
                     }
                 )
 
+            assembly_dir = synth_cdk_stack(app_args, context_args, env, cwd)
+            fingerprint = template_fingerprint(assembly_dir, parameters) if assembly_dir else None
+            if not force and is_stack_unchanged(stack, fingerprint):
+                logger.info(f'Stack {stack.name} is unchanged, skipping deployment')
+                shutil.rmtree(assembly_dir, ignore_errors=True)
+                if stack.stack == 'cdkpipeline':
+                    CDKPipelineStack.clean_up_repo(path=f'./{pipeline.repo}')
+                meta = describe_stack(stack)
+                stack.stackid = meta['StackId']
+                stack.status = meta['StackStatus']
+                stack.deploySkipped = True
+                update_stack_output(session, stack)
+                return 'skipped'
+
+            cmd = [
+                '' '. ~/.nvm/nvm.sh &&',
+                'cdk',
+                'deploy --all',
+                '--require-approval',
+                ' never',
+            ]
+            # deploys the synthesized cloud assembly, the app when synth failed
+            cmd += ['--app', assembly_dir] if assembly_dir else context_args + app_args
+            cmd += ['--verbose']
+
             logger.info(f"Running command : \n {' '.join(cmd)}")
 
             process = subprocess.run(
@@ -168,6 +254,8 @@ def deploy_cdk_stack(engine: Engine, stackid: str, app_path: str = None, path: s
                 env=env,
                 cwd=cwd,
             )
+            if assembly_dir:
+                shutil.rmtree(assembly_dir, ignore_errors=True)
             if stack.stack == 'cdkpipeline':
                 CDKPipelineStack.clean_up_repo(path=f'./{pipeline.repo}')
 
@@ -175,11 +263,15 @@ def deploy_cdk_stack(engine: Engine, stackid: str, app_path: str = None, path: s
                 meta = describe_stack(stack)
                 stack.stackid = meta['StackId']
                 stack.status = meta['StackStatus']
+                stack.templateFingerprint = fingerprint
                 update_stack_output(session, stack)
+                return 'deployed'
             else:
                 stack.status = 'CREATE_FAILED'
+                stack.templateFingerprint = None
                 logger.error(f'Failed to deploy stack {stackid} due to {str(process.stderr)}')
                 AlarmService().trigger_stack_deployment_failure_alarm(stack=stack)
+                return 'failed'
 
         except Exception as e:
             logger.error(f'Failed to deploy stack {stackid} due to {e}')
@@ -13,5 +13,5 @@ from .connection import (
     init_permissions,
 )
 from .dbconfig import DbConfig
-from .paginator import paginate
+from .paginator import paginate, keyset_paginate, paginate_data
 from . import api
@@ -1,6 +1,11 @@
 from .permission import Permission
+from .permission_cache import (
+    PermissionCache,
+    get_permission_cache,
+    request_permission_cache,
+)
 from .tenant import Tenant
-from .tenant_policy import TenantPolicy
+from .tenant_policy import TenantPolicy, TenantGroupsCache, get_tenant_groups_cache
 from .resource_policy import ResourcePolicy
 from .permission_checker import has_tenant_perm, has_resource_perm
 from .target_type import TargetType
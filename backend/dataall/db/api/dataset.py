@@ -1,7 +1,7 @@
 import logging
 from datetime import datetime
 
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, func
 from sqlalchemy.orm import Query
 
 from . import (
@@ -14,7 +14,7 @@ from . import (
     Stack
 )
 from . import Organization
-from .. import models, api, exceptions, permissions, paginate
+from .. import models, api, exceptions, permissions, paginate, paginate_data
 from ..models.Enums import Language, ConfidentialityClassification
 from ...utils.naming_convention import (
     NamingConventionService,
@@ -223,30 +223,29 @@ class Dataset:
     @staticmethod
     def query_user_datasets(session, username, groups, filter) -> Query:
         share_item_shared_states = api.ShareItemSM.get_share_item_shared_states()
-        query = (
-            session.query(models.Dataset)
-            .outerjoin(
-                models.ShareObject,
-                models.ShareObject.datasetUri == models.Dataset.datasetUri,
-            )
-            .outerjoin(
+        # shares are matched with EXISTS so that each dataset is returned once
+        shared = (
+            session.query(models.ShareObject)
+            .join(
                 models.ShareObjectItem,
-                models.ShareObjectItem.shareUri == models.ShareObject.shareUri
+                models.ShareObjectItem.shareUri == models.ShareObject.shareUri,
             )
             .filter(
+                models.ShareObject.datasetUri == models.Dataset.datasetUri,
+                models.ShareObjectItem.status.in_(share_item_shared_states),
                 or_(
-                    models.Dataset.owner == username,
-                    models.Dataset.SamlAdminGroupName.in_(groups),
-                    models.Dataset.stewards.in_(groups),
-                    and_(
-                        models.ShareObject.principalId.in_(groups),
-                        models.ShareObjectItem.status.in_(share_item_shared_states),
-                    ),
-                    and_(
-                        models.ShareObject.owner == username,
-                        models.ShareObjectItem.status.in_(share_item_shared_states),
-                    ),
-                )
+                    models.ShareObject.principalId.in_(groups),
+                    models.ShareObject.owner == username,
+                ),
+            )
+            .exists()
+        )
+        query = session.query(models.Dataset).filter(
+            or_(
+                models.Dataset.owner == username,
+                models.Dataset.SamlAdminGroupName.in_(groups),
+                models.Dataset.stewards.in_(groups),
+                shared,
             )
         )
         if filter and filter.get('term'):
@@ -262,11 +261,11 @@ class Dataset:
     def paginated_user_datasets(
         session, username, groups, uri, data=None, check_perm=None
     ) -> dict:
-        return paginate(
+        return paginate_data(
             query=Dataset.query_user_datasets(session, username, groups, data),
-            page=data.get('page', 1),
-            page_size=data.get('pageSize', 10),
-        ).to_dict()
+            data=data,
+            order_by=[models.Dataset.created.desc(), models.Dataset.datasetUri],
+        )
 
     @staticmethod
     def paginated_dataset_locations(
@@ -317,9 +316,14 @@ class Dataset:
                     ]
                 )
             )
-        return paginate(
-            query=query, page_size=data.get('pageSize', 10), page=data.get('page', 1)
-        ).to_dict()
+        return paginate_data(
+            query=query,
+            data=data,
+            order_by=[
+                models.DatasetTable.created.desc(),
+                models.DatasetTable.tableUri,
+            ],
+        )
 
     @staticmethod
     @has_tenant_perm(permissions.MANAGE_DATASETS)
@@ -721,6 +725,34 @@ class Dataset:
             .count()
         )
 
+    @staticmethod
+    def count_datasets_statistics(session, dataset_uris) -> dict:
+        """Number of tables, folders and upvotes of each dataset, with one query per count"""
+        statistics = {
+            uri: {'tables': 0, 'locations': 0, 'upvotes': 0} for uri in dataset_uris
+        }
+        if not statistics:
+            return statistics
+        counts = {
+            'tables': session.query(models.DatasetTable.datasetUri, func.count())
+            .filter(models.DatasetTable.datasetUri.in_(list(statistics)))
+            .group_by(models.DatasetTable.datasetUri),
+            'locations': session.query(models.DatasetStorageLocation.datasetUri, func.count())
+            .filter(models.DatasetStorageLocation.datasetUri.in_(list(statistics)))
+            .group_by(models.DatasetStorageLocation.datasetUri),
+            'upvotes': session.query(models.Vote.targetUri, func.count())
+            .filter(
+                models.Vote.targetUri.in_(list(statistics)),
+                models.Vote.targetType == 'dataset',
+                models.Vote.upvote == True,
+            )
+            .group_by(models.Vote.targetUri),
+        }
+        for name, query in counts.items():
+            for uri, count in query:
+                statistics[uri][name] = count
+        return statistics
+
     @staticmethod
     def count_dataset_locations(session, dataset_uri):
         return (
@@ -1,9 +1,11 @@
+import hashlib
+import json
 import logging
 from typing import List
 
 from sqlalchemy.sql import and_
 
-from .. import models, api, permissions, exceptions, paginate
+from .. import models, api, permissions, exceptions, paginate, utils
 from . import has_tenant_perm, has_resource_perm, Glossary, ResourcePolicy, Environment
 from ..models import Dataset
 from ...utils import json_utils
@@ -225,84 +227,96 @@ class DatasetTable:
 
     @staticmethod
     def sync(session, datasetUri, glue_tables=None):
-
+        """
+        Reconciles the tables of the dataset and their columns with the Glue
+        tables. Only new or changed tables and columns are written, with bulk
+        statements, and the changes are committed once.
+        """
         dataset: Dataset = session.query(Dataset).get(datasetUri)
         if dataset:
+            glue_tables = glue_tables or []
             existing_tables = (
                 session.query(models.DatasetTable)
                 .filter(models.DatasetTable.datasetUri == datasetUri)
                 .all()
             )
-            existing_table_names = [e.GlueTableName for e in existing_tables]
             existing_dataset_tables_map = {t.GlueTableName: t for t in existing_tables}
 
             DatasetTable.update_existing_tables_status(existing_tables, glue_tables)
             logger.info(
-                f'existing_tables={glue_tables}'
+                f'Syncing {len(glue_tables)} Glue tables with {len(existing_tables)} '
+                f'existing tables for dataset db {dataset.GlueDatabaseName}'
             )
+            new_tables = []
             for table in glue_tables:
-                if table['Name'] not in existing_table_names:
+                properties = json_utils.to_json(table.get('Parameters', {}))
+                updated_table = existing_dataset_tables_map.get(table['Name'])
+                if not updated_table:
                     logger.info(
-                        f'Storing new table: {table} for dataset db {dataset.GlueDatabaseName}'
-                    )
-                    updated_table = models.DatasetTable(
-                        datasetUri=dataset.datasetUri,
-                        label=table['Name'],
-                        name=table['Name'],
-                        region=dataset.region,
-                        owner=dataset.owner,
-                        GlueDatabaseName=dataset.GlueDatabaseName,
-                        AWSAccountId=dataset.AwsAccountId,
-                        S3BucketName=dataset.S3BucketName,
-                        S3Prefix=table.get('StorageDescriptor', {}).get('Location'),
-                        GlueTableName=table['Name'],
-                        LastGlueTableStatus='InSync',
-                        GlueTableProperties=json_utils.to_json(
-                            table.get('Parameters', {})
-                        ),
+                        f'Storing new table: {table["Name"]} for dataset db {dataset.GlueDatabaseName}'
                     )
-                    session.add(updated_table)
-                    session.commit()
-                    # ADD DATASET TABLE PERMISSIONS
-                    env = Environment.get_environment_by_uri(session, dataset.environmentUri)
-                    permission_group = set([dataset.SamlAdminGroupName, env.SamlGroupName, dataset.stewards if dataset.stewards is not None else dataset.SamlAdminGroupName])
-                    for group in permission_group:
-                        ResourcePolicy.attach_resource_policy(
-                            session=session,
-                            group=group,
-                            permissions=permissions.DATASET_TABLE_READ,
-                            resource_uri=updated_table.tableUri,
-                            resource_type=models.DatasetTable.__name__,
+                    new_tables.append(
+                        models.DatasetTable(
+                            tableUri=utils.uuid('table')(None),
+                            datasetUri=dataset.datasetUri,
+                            label=table['Name'],
+                            name=table['Name'],
+                            region=dataset.region,
+                            owner=dataset.owner,
+                            GlueDatabaseName=dataset.GlueDatabaseName,
+                            AWSAccountId=dataset.AwsAccountId,
+                            S3BucketName=dataset.S3BucketName,
+                            S3Prefix=table.get('StorageDescriptor', {}).get('Location'),
+                            GlueTableName=table['Name'],
+                            LastGlueTableStatus='InSync',
+                            GlueTableProperties=properties,
                         )
-                else:
-                    logger.info(
-                        f'Updating table: {table} for dataset db {dataset.GlueDatabaseName}'
                     )
-                    updated_table: models.DatasetTable = (
-                        existing_dataset_tables_map.get(table['Name'])
-                    )
-                    updated_table.GlueTableProperties = json_utils.to_json(
-                        table.get('Parameters', {})
+                elif updated_table.GlueTableProperties != properties:
+                    logger.info(
+                        f'Updating table: {table["Name"]} for dataset db {dataset.GlueDatabaseName}'
                     )
+                    updated_table.GlueTableProperties = properties
+
+            if new_tables:
+                session.bulk_save_objects(new_tables)
+                # ADD DATASET TABLE PERMISSIONS
+                env = Environment.get_environment_by_uri(session, dataset.environmentUri)
+                ResourcePolicy.bulk_attach_resource_policies(
+                    session=session,
+                    groups=[
+                        dataset.SamlAdminGroupName,
+                        env.SamlGroupName,
+                        dataset.stewards or dataset.SamlAdminGroupName,
+                    ],
+                    permissions=permissions.DATASET_TABLE_READ,
+                    resource_uris=[t.tableUri for t in new_tables],
+                    resource_type=models.DatasetTable.__name__,
+                )
+                existing_dataset_tables_map.update(
+                    {t.GlueTableName: t for t in new_tables}
+                )
 
-                DatasetTable.sync_table_columns(session, updated_table, table)
+            DatasetTable.sync_tables_columns(
+                session,
+                [(existing_dataset_tables_map[t['Name']], t) for t in glue_tables],
+            )
+            session.commit()
 
         return True
 
     @staticmethod
     def update_existing_tables_status(existing_tables, glue_tables):
+        glue_table_names = {t['Name'] for t in glue_tables}
         for existing_table in existing_tables:
-            if existing_table.GlueTableName not in [t['Name'] for t in glue_tables]:
+            if existing_table.GlueTableName not in glue_table_names:
                 existing_table.LastGlueTableStatus = 'Deleted'
                 logger.info(
                     f'Table {existing_table.GlueTableName} status set to Deleted from Glue.'
                 )
 
     @staticmethod
-    def sync_table_columns(session, dataset_table, glue_table):
-
-        DatasetTable.delete_all_table_columns(session, dataset_table)
-
+    def get_glue_table_columns(glue_table) -> List[dict]:
         columns = [
             {**item, **{'columnType': 'column'}}
             for item in glue_table.get('StorageDescriptor', {}).get('Columns', [])
@@ -311,26 +325,123 @@ class DatasetTable:
             {**item, **{'columnType': f'partition_{index}'}}
             for index, item in enumerate(glue_table.get('PartitionKeys', []))
         ]
+        return [
+            {
+                'name': col['Name'],
+                'description': col.get('Comment', 'No description provided'),
+                'typeName': col['Type'],
+                'columnType': col['columnType'],
+            }
+            for col in columns + partitions
+        ]
 
-        logger.debug(f'Found columns {columns} for table {dataset_table}')
-        logger.debug(f'Found partitions {partitions} for table {dataset_table}')
-
-        for col in columns + partitions:
-            table_col = models.DatasetTableColumn(
-                name=col['Name'],
-                description=col.get('Comment', 'No description provided'),
-                label=col['Name'],
-                owner=dataset_table.owner,
-                datasetUri=dataset_table.datasetUri,
-                tableUri=dataset_table.tableUri,
-                AWSAccountId=dataset_table.AWSAccountId,
-                GlueDatabaseName=dataset_table.GlueDatabaseName,
-                GlueTableName=dataset_table.GlueTableName,
-                region=dataset_table.region,
-                typeName=col['Type'],
-                columnType=col['columnType'],
+    @staticmethod
+    def column_signature(column) -> str:
+        """Hash of the column attributes synced from Glue"""
+        if isinstance(column, models.DatasetTableColumn):
+            column = {
+                'name': column.name,
+                'description': column.description,
+                'typeName': column.typeName,
+                'columnType': column.columnType,
+            }
+        return hashlib.sha1(
+            json.dumps(
+                [
+                    column['name'],
+                    column['description'],
+                    column['typeName'],
+                    column['columnType'],
+                ]
+            ).encode()
+        ).hexdigest()
+
+    @staticmethod
+    def sync_table_columns(session, dataset_table, glue_table):
+        DatasetTable.sync_tables_columns(session, [(dataset_table, glue_table)])
+
+    @staticmethod
+    def sync_tables_columns(session, tables):
+        """
+        Diffs the columns of the (dataset_table, glue_table) pairs against the
+        stored ones by signature and applies the difference with one bulk
+        insert, update and delete. Unchanged columns keep their columnUri.
+        """
+        if not tables:
+            return
+        stored = {}
+        for database, table_names in DatasetTable._tables_by_database(tables).items():
+            for column in session.query(models.DatasetTableColumn).filter(
+                models.DatasetTableColumn.GlueDatabaseName == database,
+                models.DatasetTableColumn.GlueTableName.in_(table_names),
+            ):
+                stored.setdefault(
+                    (column.GlueDatabaseName, column.GlueTableName), []
+                ).append(column)
+
+        inserts, updates, deletes = [], [], []
+        for dataset_table, glue_table in tables:
+            columns = DatasetTable.get_glue_table_columns(glue_table)
+            current = stored.get(
+                (dataset_table.GlueDatabaseName, dataset_table.GlueTableName), []
+            )
+            current_signatures = sorted(DatasetTable.column_signature(c) for c in current)
+            if current_signatures == sorted(
+                DatasetTable.column_signature(c) for c in columns
+            ):
+                continue
+            logger.debug(f'Found columns {columns} for table {dataset_table}')
+
+            current_by_name = {}
+            for column in current:
+                if column.name in current_by_name:
+                    deletes.append(column.columnUri)
+                else:
+                    current_by_name[column.name] = column
+            for col in columns:
+                column = current_by_name.pop(col['name'], None)
+                if not column:
+                    inserts.append(
+                        models.DatasetTableColumn(
+                            columnUri=utils.uuid('col')(None),
+                            name=col['name'],
+                            description=col['description'],
+                            label=col['name'],
+                            owner=dataset_table.owner,
+                            datasetUri=dataset_table.datasetUri,
+                            tableUri=dataset_table.tableUri,
+                            AWSAccountId=dataset_table.AWSAccountId,
+                            GlueDatabaseName=dataset_table.GlueDatabaseName,
+                            GlueTableName=dataset_table.GlueTableName,
+                            region=dataset_table.region,
+                            typeName=col['typeName'],
+                            columnType=col['columnType'],
+                        )
+                    )
+                elif DatasetTable.column_signature(column) != DatasetTable.column_signature(col):
+                    updates.append({'columnUri': column.columnUri, **col})
+            deletes += [c.columnUri for c in current_by_name.values()]
+
+        logger.info(
+            f'Column sync: {len(inserts)} inserted, {len(updates)} updated, {len(deletes)} deleted'
+        )
+        if deletes:
+            session.query(models.DatasetTableColumn).filter(
+                models.DatasetTableColumn.columnUri.in_(deletes)
+            ).delete(synchronize_session=False)
+        if updates:
+            session.bulk_update_mappings(models.DatasetTableColumn, updates)
+        if inserts:
+            session.bulk_save_objects(inserts)
+
+    @staticmethod
+    def _tables_by_database(tables) -> dict:
+        databases = {}
+        for dataset_table, _ in tables:
+            databases.setdefault(dataset_table.GlueDatabaseName, set()).add(
+                dataset_table.GlueTableName
             )
-            session.add(table_col)
+        return databases
 
     @staticmethod
     def delete_all_table_columns(session, dataset_table):
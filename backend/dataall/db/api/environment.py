@@ -23,7 +23,7 @@ from ..models.Enums import (
 
 )
 from ..models.Permission import PermissionType
-from ..paginator import Page, paginate
+from ..paginator import Page, paginate, paginate_data
 from ...utils.naming_convention import (
     NamingConventionService,
     NamingConventionPattern,
@@ -577,18 +577,17 @@ class Environment:
 
     @staticmethod
     def query_user_environments(session, username, groups, filter) -> Query:
-        query = (
-            session.query(models.Environment)
-            .outerjoin(
-                models.EnvironmentGroup,
-                models.Environment.environmentUri
-                == models.EnvironmentGroup.environmentUri,
-            )
-            .filter(
-                or_(
-                    models.Environment.owner == username,
+        # groups are matched with EXISTS so that each environment is returned once
+        query = session.query(models.Environment).filter(
+            or_(
+                models.Environment.owner == username,
+                session.query(models.EnvironmentGroup)
+                .filter(
+                    models.EnvironmentGroup.environmentUri
+                    == models.Environment.environmentUri,
                     models.EnvironmentGroup.groupUri.in_(groups),
                 )
+                .exists(),
             )
         )
         if filter and filter.get('term'):
@@ -607,11 +606,15 @@ class Environment:
     def paginated_user_environments(
         session, username, groups, uri, data=None, check_perm=None
     ) -> dict:
-        return paginate(
+        return paginate_data(
             query=Environment.query_user_environments(session, username, groups, data),
-            page=data.get('page', 1),
-            page_size=data.get('pageSize', 5),
-        ).to_dict()
+            data=data,
+            default_page_size=5,
+            order_by=[
+                models.Environment.created.desc(),
+                models.Environment.environmentUri,
+            ],
+        )
 
     @staticmethod
     def query_user_environment_groups(session, username, groups, uri, filter) -> Query:
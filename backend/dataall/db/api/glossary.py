@@ -1,10 +1,17 @@
+import bisect
+import functools
 import logging
+import os
+import re
+import threading
+import time
 from datetime import datetime
 
-from sqlalchemy import asc, or_, and_, literal, case
-from sqlalchemy.orm import with_expression, aliased
+from sqlalchemy import asc, or_, and_, literal, event, func
+from sqlalchemy.orm import with_expression
 
 from .. import models, exceptions, permissions, paginate
+from ..paginator import Page
 from .permission_checker import (
     has_tenant_perm,
 )
@@ -12,6 +19,219 @@ from ..models.Glossary import GlossaryNodeStatus
 
 logger = logging.getLogger(__name__)
 
+TOKEN = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text):
+    return TOKEN.findall((text or '').lower())
+
+
+@functools.lru_cache(maxsize=256)
+def like_pattern(pattern):
+    """Regular expression matching like the SQL pattern with ilike"""
+    expression = ''.join(
+        '.*' if c == '%' else '.' if c == '_' else re.escape(c) for c in pattern
+    )
+    return re.compile(expression, re.IGNORECASE | re.DOTALL)
+
+
+def copy_node(node: models.GlossaryNode, **expressions) -> models.GlossaryNode:
+    """Copy of the node that is not attached to any session"""
+    copy = models.GlossaryNode(
+        **{
+            column.key: getattr(node, column.key)
+            for column in models.GlossaryNode.__table__.columns
+        }
+    )
+    for name, value in expressions.items():
+        setattr(copy, name, value)
+    return copy
+
+
+def paginate_list(items, page, page_size):
+    if page <= 0:
+        raise AttributeError('page needs to be >= 1')
+    if page_size <= 0:
+        raise AttributeError('page_size needs to be >= 1')
+    start = (page - 1) * page_size
+    return Page(items[start : start + page_size], page, page_size, len(items))
+
+
+class GlossaryTree:
+    """
+    Snapshot of the glossary nodes that are not deleted, ordered by path,
+    with the category, term and association counts of every subtree and
+    an index of the tokens of the node labels and readmes.
+    """
+
+    def __init__(self, nodes, link_counts, version):
+        self.version = version
+        self.nodes = {node.nodeUri: node for node in nodes}
+        self.ordered = sorted(nodes, key=lambda n: n.path)
+        self.paths = [node.path for node in self.ordered]
+        self.stats = {
+            uri: {'categories': 0, 'terms': 0, 'associations': 0} for uri in self.nodes
+        }
+        self.tokens = {}
+        for node in nodes:
+            for ancestor in self.ancestors(node):
+                stats = self.stats[ancestor.nodeUri]
+                if node.nodeType == 'C':
+                    stats['categories'] += 1
+                elif node.nodeType == 'T':
+                    stats['terms'] += 1
+                    stats['associations'] += link_counts.get(node.nodeUri, 0)
+            for token in set(tokenize(node.label) + tokenize(node.readme)):
+                self.tokens.setdefault(token, set()).add(node.nodeUri)
+
+    def ancestors(self, node):
+        """The node and its parents that are not deleted"""
+        return [
+            self.nodes[uri] for uri in node.path.split('/')[1:] if uri in self.nodes
+        ]
+
+    def subtree(self, node, include_root=True):
+        """The node and its descendants that are not deleted, ordered by path"""
+        # descendant paths sort between the path followed by '/' and by '0'
+        start = bisect.bisect_left(self.paths, f'{node.path}/')
+        end = bisect.bisect_left(self.paths, f'{node.path}0')
+        root = self.nodes.get(node.nodeUri) if include_root else None
+        return ([root] if root else []) + self.ordered[start:end]
+
+    def node_stats(self, node):
+        stats = self.stats.get(node.nodeUri)
+        if not stats:
+            return {'categories': 0, 'terms': 0, 'associations': 0}
+        return dict(stats)
+
+    def search(self, term):
+        """Uris of the nodes with a label or readme containing the term"""
+        pattern = like_pattern(f'%{term}%')
+        candidates = self.nodes.keys()
+        for query_token in tokenize(term):
+            candidates = {
+                uri
+                for token, uris in self.tokens.items()
+                if query_token in token
+                for uri in uris
+                if uri in candidates
+            }
+        return {
+            uri
+            for uri in candidates
+            if pattern.fullmatch(self.nodes[uri].label or '')
+            or pattern.fullmatch(self.nodes[uri].readme or '')
+        }
+
+    def filter(self, nodes, term=None, node_type=None):
+        """Nodes of which the label or readme match the term like with ilike"""
+        if term:
+            pattern = like_pattern(term)
+            nodes = [
+                n
+                for n in nodes
+                if pattern.fullmatch(n.label or '') or pattern.fullmatch(n.readme or '')
+            ]
+        if node_type:
+            nodes = [n for n in nodes if n.nodeType == node_type]
+        return nodes
+
+
+class GlossaryTreeSnapshot:
+    """
+    Process wide snapshot of the glossary tree, rebuilt with two queries
+    when it is stale. Glossary writes invalidate it, once when they are made
+    and again when their transaction commits. Writes of other processes are
+    noticed by comparing a fingerprint of the glossary tables, checked at
+    most every check_interval seconds.
+    """
+
+    def __init__(self, check_interval: float = None, clock=time.monotonic):
+        self.check_interval = (
+            check_interval
+            if check_interval is not None
+            else float(os.getenv('GLOSSARY_SNAPSHOT_CHECK_INTERVAL', '5'))
+        )
+        self.clock = clock
+        self.version = 0
+        self.tree: GlossaryTree = None
+        self.fingerprint = None
+        self.checked = None
+        self.builds = 0
+        self._lock = threading.Lock()
+
+    def invalidate(self, session=None):
+        with self._lock:
+            self.version += 1
+        if session is not None:
+            event.listen(session, 'after_commit', self._invalidate_on_commit, once=True)
+
+    def _invalidate_on_commit(self, session):
+        self.invalidate()
+
+    @staticmethod
+    def get_fingerprint(session):
+        nodes = session.query(
+            func.count(models.GlossaryNode.nodeUri),
+            func.max(models.GlossaryNode.created),
+            func.max(models.GlossaryNode.updated),
+            func.max(models.GlossaryNode.deleted),
+        ).subquery()
+        links = session.query(
+            func.count(models.TermLink.linkUri),
+            func.max(models.TermLink.created),
+            func.max(models.TermLink.updated),
+            func.max(models.TermLink.deleted),
+        ).subquery()
+        return tuple(session.query(nodes, links).one())
+
+    def get(self, session) -> GlossaryTree:
+        with self._lock:
+            version = self.version
+            tree = self.tree
+            check = self.checked is None or (
+                self.clock() - self.checked >= self.check_interval
+            )
+        if tree is not None and tree.version == version and not check:
+            return tree
+        fingerprint = GlossaryTreeSnapshot.get_fingerprint(session)
+        if (
+            tree is not None
+            and tree.version == version
+            and fingerprint == self.fingerprint
+        ):
+            with self._lock:
+                self.checked = self.clock()
+            return tree
+
+        nodes = (
+            session.query(models.GlossaryNode)
+            .filter(models.GlossaryNode.deleted.is_(None))
+            .all()
+        )
+        link_counts = dict(
+            session.query(models.TermLink.nodeUri, func.count(models.TermLink.linkUri))
+            .filter(models.TermLink.deleted.is_(None))
+            .group_by(models.TermLink.nodeUri)
+            .all()
+        )
+        tree = GlossaryTree([copy_node(node) for node in nodes], link_counts, version)
+        with self._lock:
+            self.builds += 1
+            if self.version == version:
+                self.tree = tree
+                self.fingerprint = fingerprint
+                self.checked = self.clock()
+        logger.info(f'Built glossary tree snapshot of {len(nodes)} nodes')
+        return tree
+
+
+glossary_tree_snapshot = GlossaryTreeSnapshot()
+
+
+def get_glossary_tree_snapshot() -> GlossaryTreeSnapshot:
+    return glossary_tree_snapshot
+
 
 class Glossary:
     @staticmethod
@@ -31,6 +251,7 @@ class Glossary:
         session.add(g)
         session.commit()
         g.path = f'/{g.nodeUri}'
+        glossary_tree_snapshot.invalidate(session)
         return g
 
     @staticmethod
@@ -52,6 +273,7 @@ class Glossary:
         session.add(cat)
         session.commit()
         cat.path = parent.path + '/' + cat.nodeUri
+        glossary_tree_snapshot.invalidate(session)
         return cat
 
     @staticmethod
@@ -77,6 +299,7 @@ class Glossary:
         session.add(term)
         session.commit()
         term.path = parent.path + '/' + term.nodeUri
+        glossary_tree_snapshot.invalidate(session)
         return term
 
     @staticmethod
@@ -98,6 +321,7 @@ class Glossary:
             children.update({'deleted': datetime.now()}, synchronize_session=False)
         else:
             count = 1
+        glossary_tree_snapshot.invalidate(session)
         return count
 
     @staticmethod
@@ -108,6 +332,7 @@ class Glossary:
             raise exceptions.ObjectNotFound('Node', uri)
         for k in data.keys():
             setattr(node, k, data.get(k))
+        glossary_tree_snapshot.invalidate(session)
         return node
 
     @staticmethod
@@ -153,6 +378,7 @@ class Glossary:
             targetType=targetType,
         )
         session.add(link)
+        glossary_tree_snapshot.invalidate(session)
         return link
 
     @staticmethod
@@ -217,81 +443,31 @@ class Glossary:
 
     @staticmethod
     def hierarchical_search(session, username, groups, uri, data=None, check_perm=None):
-        q = session.query(models.GlossaryNode).options(
-            with_expression(models.GlossaryNode.isMatch, literal(True))
-        )
-        q = q.filter(models.GlossaryNode.deleted.is_(None))
+        """
+        Nodes of which the label or readme contain the term, with their
+        parents and descendants, flagged with isMatch when they match it
+        """
+        tree = get_glossary_tree_snapshot().get(session)
         term = data.get('term', None)
         if term:
-            q = q.filter(
-                or_(
-                    models.GlossaryNode.label.ilike('%' + term.upper() + '%'),
-                    models.GlossaryNode.readme.ilike('%' + term.upper() + '%'),
-                )
-            )
-        matches = q.subquery('matches')
-        parents = aliased(models.GlossaryNode, name='parents')
-        children = aliased(models.GlossaryNode, name='children')
-
-        if term:
-            parent_expr = case(
-                [
-                    (
-                        or_(
-                            parents.label.ilike(f'%{term}%'),
-                            parents.readme.ilike(f'%{term}%'),
-                        )
-                    )
-                ],
-                else_=literal(False),
-            )
-        else:
-            parent_expr = literal(False)
-
-        ascendants = (
-            session.query(parents)
-            .options(with_expression(parents.isMatch, parent_expr))
-            .join(
-                and_(
-                    matches,
-                    matches.c.path.startswith(parents.path),
-                    matches,
-                    matches.c.deleted.is_(None),
-                )
-            )
-        )
-
-        if term:
-            child_expr = case(
-                [
-                    (
-                        or_(
-                            children.label.ilike(f'%{term}%'),
-                            children.readme.ilike(f'%{term}%'),
-                        ),
-                        and_(children.deleted.is_(None)),
-                    )
-                ],
-                else_=literal(False),
-            )
+            matches = tree.search(term)
+            uris = set()
+            for match in matches:
+                node = tree.nodes[match]
+                uris.update(n.nodeUri for n in tree.ancestors(node))
+                uris.update(n.nodeUri for n in tree.subtree(node))
+            nodes = [node for node in tree.ordered if node.nodeUri in uris]
         else:
-            child_expr = literal(False)
+            matches = set()
+            nodes = tree.ordered
 
-        descendants = (
-            session.query(children)
-            .options(with_expression(children.isMatch, child_expr))
-            .join(
-                matches,
-                children.path.startswith(matches.c.path),
-            )
+        page = paginate_list(
+            nodes, page=data.get('page', 1), page_size=data.get('pageSize', 100)
         )
-
-        all = ascendants.union(descendants)
-        q = all.order_by(models.GlossaryNode.path)
-
-        return paginate(
-            q, page=data.get('page', 1), page_size=data.get('pageSize', 100)
-        ).to_dict()
+        page.items = [
+            copy_node(node, isMatch=node.nodeUri in matches) for node in page.items
+        ]
+        return page.to_dict()
 
     @staticmethod
     def search_terms(session, username, groups, uri, data=None, check_perm=None):
@@ -320,26 +496,38 @@ class Glossary:
 
     @staticmethod
     def list_node_children(session, source, filter):
-        q = (
-            session.query(models.GlossaryNode)
-            .filter(models.GlossaryNode.path.startswith(source.path + '/'))
-            .order_by(asc(models.GlossaryNode.path))
+        tree = get_glossary_tree_snapshot().get(session)
+        nodes = tree.filter(
+            tree.subtree(source, include_root=False),
+            term=filter.get('term'),
+            node_type=filter.get('nodeType'),
         )
-        term = filter.get('term')
-        nodeType = filter.get('nodeType')
-        if term:
-            q = q.filter(
-                or_(
-                    models.GlossaryNode.label.ilike(term),
-                    models.GlossaryNode.readme.ilike(term),
-                )
-            )
-        if nodeType:
-            q = q.filter(models.GlossaryNode.nodeType == nodeType)
-        return paginate(
-            q, page_size=filter.get('pageSize', 10), page=filter.get('page', 1)
+        return paginate_list(
+            nodes, page_size=filter.get('pageSize', 10), page=filter.get('page', 1)
         ).to_dict()
 
+    @staticmethod
+    def node_tree(session, source, filter):
+        tree = get_glossary_tree_snapshot().get(session)
+        nodes = tree.filter(
+            tree.subtree(source),
+            term=filter.get('term'),
+            node_type=filter.get('nodeType'),
+        )
+        return paginate_list(
+            nodes, page_size=filter.get('pageSize', 10), page=filter.get('page', 1)
+        ).to_dict()
+
+    @staticmethod
+    def node_stats(session, source):
+        return get_glossary_tree_snapshot().get(session).node_stats(source)
+
+    @staticmethod
+    def get_snapshot_node(session, uri):
+        """Node of the snapshot, or from the database when it is deleted"""
+        node = get_glossary_tree_snapshot().get(session).nodes.get(uri)
+        return node or session.query(models.GlossaryNode).get(uri)
+
     @staticmethod
     def list_term_associations(
         session, username, groups, uri, data=None, check_perm=None
@@ -425,6 +613,7 @@ class Glossary:
     def set_glossary_terms_links(
         session, username, target_uri, target_type, glossary_terms
     ):
+        glossary_tree_snapshot.invalidate(session)
         current_links = session.query(models.TermLink).filter(
             models.TermLink.targetUri == target_uri
         )
@@ -485,3 +674,4 @@ class Glossary:
         )
         for link in term_links:
             session.delete(link)
+        glossary_tree_snapshot.invalidate(session)
@@ -0,0 +1,132 @@
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from .. import models
+
+logger = logging.getLogger(__name__)
+
+_request_cache: ContextVar = ContextVar('permission_cache', default=None)
+
+
+class PermissionCache:
+    """
+    Request scoped cache of the permissions granted to a set of groups.
+    Resource permissions are keyed by (groups, resourceUri) and tenant
+    permissions by (groups, tenant_name). Every entry maps a permission
+    name to the policy granting it, so one query answers all the
+    permission checks on a given resource for the whole request.
+    """
+
+    def __init__(self):
+        self.resources = {}
+        self.tenants = {}
+        self.hits = 0
+        self.queries = 0
+
+    @staticmethod
+    def _key(groups, uri):
+        return frozenset(groups or []), uri
+
+    def get_resource_policy(self, session, groups, resource_uri, permission_name):
+        key = PermissionCache._key(groups, resource_uri)
+        if key in self.resources:
+            self.hits += 1
+        else:
+            self.prefetch_resources(session, groups, [resource_uri])
+        return self.resources[key].get(permission_name)
+
+    def prefetch_resources(self, session, groups, resource_uris):
+        uris = {
+            uri
+            for uri in resource_uris
+            if uri and PermissionCache._key(groups, uri) not in self.resources
+        }
+        if not uris:
+            return
+        for uri in uris:
+            self.resources[PermissionCache._key(groups, uri)] = {}
+        if not groups:
+            return
+        rows = (
+            session.query(models.ResourcePolicy, models.Permission.name)
+            .join(
+                models.ResourcePolicyPermission,
+                models.ResourcePolicy.sid == models.ResourcePolicyPermission.sid,
+            )
+            .join(
+                models.Permission,
+                models.Permission.permissionUri
+                == models.ResourcePolicyPermission.permissionUri,
+            )
+            .filter(
+                models.ResourcePolicy.principalId.in_(groups),
+                models.ResourcePolicy.principalType == 'GROUP',
+                models.ResourcePolicy.resourceUri.in_(uris),
+            )
+            .all()
+        )
+        self.queries += 1
+        for policy, permission_name in rows:
+            granted = self.resources[PermissionCache._key(groups, policy.resourceUri)]
+            granted.setdefault(permission_name, policy)
+
+    def get_tenant_policy(self, session, groups, tenant_name, permission_name):
+        key = PermissionCache._key(groups, tenant_name)
+        if key in self.tenants:
+            self.hits += 1
+        else:
+            self.tenants[key] = {}
+            if groups:
+                rows = (
+                    session.query(models.TenantPolicy, models.Permission.name)
+                    .join(
+                        models.TenantPolicyPermission,
+                        models.TenantPolicy.sid == models.TenantPolicyPermission.sid,
+                    )
+                    .join(
+                        models.Tenant,
+                        models.Tenant.tenantUri == models.TenantPolicy.tenantUri,
+                    )
+                    .join(
+                        models.Permission,
+                        models.Permission.permissionUri
+                        == models.TenantPolicyPermission.permissionUri,
+                    )
+                    .filter(
+                        models.TenantPolicy.principalId.in_(groups),
+                        models.Tenant.name == tenant_name,
+                    )
+                    .all()
+                )
+                self.queries += 1
+                for policy, name in rows:
+                    self.tenants[key].setdefault(name, policy)
+        return self.tenants[key].get(permission_name)
+
+    def invalidate_resource(self, resource_uri):
+        for key in [k for k in self.resources if k[1] == resource_uri]:
+            del self.resources[key]
+
+    def invalidate_tenant(self, tenant_name):
+        for key in [k for k in self.tenants if k[1] == tenant_name]:
+            del self.tenants[key]
+
+    def stats(self):
+        return {'hits': self.hits, 'queries': self.queries, 'saved': self.hits}
+
+
+def get_permission_cache() -> PermissionCache:
+    return _request_cache.get()
+
+
+@contextmanager
+def request_permission_cache():
+    """Activates a PermissionCache for the duration of one API request"""
+    cache = PermissionCache()
+    token = _request_cache.set(cache)
+    try:
+        yield cache
+    finally:
+        _request_cache.reset(token)
+        logger.debug('Permission cache stats %s', cache.stats())
@@ -1,11 +1,13 @@
+import datetime
 import logging
 from typing import Optional
 
 from sqlalchemy.sql import and_
 
 from .. import exceptions
-from .. import models
+from .. import models, utils
 from . import Permission
+from .permission_cache import get_permission_cache
 from ..models.Permission import PermissionType
 
 logger = logging.getLogger(__name__)
@@ -40,6 +42,12 @@ class ResourcePolicy:
         if not username or not permission_name or not resource_uri:
             return None
 
+        cache = get_permission_cache()
+        if cache:
+            return cache.get_resource_policy(
+                session, groups, resource_uri, permission_name
+            )
+
         policy: models.ResourcePolicy = (
             session.query(models.ResourcePolicy)
             .join(
@@ -67,6 +75,16 @@ class ResourcePolicy:
         else:
             return policy
 
+    @staticmethod
+    def prefetch_user_resource_permissions(
+        session, groups: [str], resource_uris: [str]
+    ):
+        """Loads the groups permissions on a list of resources in one query
+        into the request permission cache, if there is one"""
+        cache = get_permission_cache()
+        if cache:
+            cache.prefetch_resources(session, groups, resource_uris)
+
     @staticmethod
     def has_group_resource_permission(
         session, group_uri: str, resource_uri: str, permission_name: str
@@ -143,8 +161,105 @@ class ResourcePolicy:
             session, group, permissions, resource_uri, policy
         )
 
+        cache = get_permission_cache()
+        if cache:
+            cache.invalidate_resource(resource_uri)
+
         return policy
 
+    @staticmethod
+    def bulk_attach_resource_policies(
+        session,
+        groups: [str],
+        permissions: [str],
+        resource_uris: [str],
+        resource_type: str,
+    ) -> int:
+        """
+        Attaches the permissions to every group on every resource.
+        Missing policies are created, and the permissions missing from the
+        policies are added, with one multi-row insert each. Nothing is
+        committed.
+        Returns the number of policies created.
+        """
+        groups = {group for group in groups if group}
+        resource_uris = set(resource_uris)
+        if not groups or not resource_uris:
+            return 0
+        ResourcePolicy.validate_attach_resource_policy_params(
+            next(iter(groups)), permissions, next(iter(resource_uris)), resource_type
+        )
+        permission_uris = dict(
+            session.query(models.Permission.name, models.Permission.permissionUri)
+            .filter(
+                models.Permission.name.in_(set(permissions)),
+                models.Permission.type == PermissionType.RESOURCE.name,
+            )
+            .all()
+        )
+        missing = set(permissions) - set(permission_uris)
+        if missing:
+            raise exceptions.ObjectNotFound('Permission', ', '.join(sorted(missing)))
+
+        existing = {}
+        for sid, group, resource_uri in session.query(
+            models.ResourcePolicy.sid,
+            models.ResourcePolicy.principalId,
+            models.ResourcePolicy.resourceUri,
+        ).filter(
+            models.ResourcePolicy.principalId.in_(groups),
+            models.ResourcePolicy.resourceUri.in_(resource_uris),
+        ):
+            existing.setdefault((group, resource_uri), []).append(sid)
+        granted = {}
+        if existing:
+            sids = {sid: key for key, sids in existing.items() for sid in sids}
+            for sid, permission_uri in session.query(
+                models.ResourcePolicyPermission.sid,
+                models.ResourcePolicyPermission.permissionUri,
+            ).filter(models.ResourcePolicyPermission.sid.in_(sids)):
+                granted.setdefault(sids[sid], set()).add(permission_uri)
+
+        now = datetime.datetime.now()
+        policies = [
+            dict(
+                sid=utils.uuid('resource_policy')(None),
+                principalId=group,
+                principalType='GROUP',
+                resourceUri=resource_uri,
+                resourceType=resource_type,
+                created=now,
+            )
+            for resource_uri in sorted(resource_uris)
+            for group in sorted(groups)
+            if (group, resource_uri) not in existing
+        ]
+        policy_permissions = [
+            dict(sid=policy['sid'], permissionUri=uri, created=now)
+            for policy in policies
+            for uri in permission_uris.values()
+        ] + [
+            dict(sid=sids[0], permissionUri=uri, created=now)
+            for key, sids in sorted(existing.items())
+            for uri in permission_uris.values()
+            if uri not in granted.get(key, set())
+        ]
+        if policies:
+            session.execute(models.ResourcePolicy.__table__.insert().values(policies))
+        if policy_permissions:
+            session.execute(
+                models.ResourcePolicyPermission.__table__.insert().values(
+                    policy_permissions
+                )
+            )
+
+        cache = get_permission_cache()
+        if cache:
+            for resource_uri in resource_uris:
+                cache.invalidate_resource(resource_uri)
+
+        return len(policies)
+
     @staticmethod
     def delete_resource_policy(
         session,
@@ -163,6 +278,10 @@ class ResourcePolicy:
             session.delete(policy)
             session.commit()
 
+        cache = get_permission_cache()
+        if cache:
+            cache.invalidate_resource(resource_uri)
+
         return True
 
     @staticmethod
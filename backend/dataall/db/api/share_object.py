@@ -8,7 +8,7 @@ from . import (
     Environment,
 )
 from .. import api, utils
-from .. import models, exceptions, permissions, paginate
+from .. import models, exceptions, permissions, paginate, paginate_data
 from ..models.Enums import ShareObjectStatus, ShareItemStatus, ShareObjectActions, ShareItemActions, ShareableType, PrincipalType
 
 logger = logging.getLogger(__name__)
@@ -1067,7 +1067,11 @@ class ShareObject:
                 )
             )
         )
-        return paginate(query, data.get('page', 1), data.get('pageSize', 10)).to_dict()
+        return paginate_data(
+            query,
+            data,
+            order_by=[models.ShareObject.created.desc(), models.ShareObject.shareUri],
+        )
 
     @staticmethod
     def list_user_sent_share_requests(
@@ -1089,7 +1093,11 @@ class ShareObject:
                 )
             )
         )
-        return paginate(query, data.get('page', 1), data.get('pageSize', 10)).to_dict()
+        return paginate_data(
+            query,
+            data,
+            order_by=[models.ShareObject.created.desc(), models.ShareObject.shareUri],
+        )
 
     @staticmethod
     def get_share_by_dataset_and_environment(session, dataset_uri, environment_uri):
@@ -1362,72 +1370,55 @@ class ShareObject:
 
     @staticmethod
     def resolve_share_object_statistics(session, uri, **kwargs):
+        return ShareObject.resolve_share_objects_statistics(session, [uri])[uri]
+
+    @staticmethod
+    def resolve_share_objects_statistics(session, uris) -> dict:
+        """
+        Statistics of the items of every share in uris,
+        counted with a single GROUP BY shareUri, itemType, status query
+        """
         share_item_shared_states = ShareItemSM.get_share_item_shared_states()
-        tables = (
-            session.query(models.ShareObjectItem)
-            .filter(
-                and_(
-                    models.ShareObjectItem.shareUri == uri,
-                    models.ShareObjectItem.itemType == 'DatasetTable',
-                )
-            )
-            .count()
-        )
-        locations = (
-            session.query(models.ShareObjectItem)
-            .filter(
-                and_(
-                    models.ShareObjectItem.shareUri == uri,
-                    models.ShareObjectItem.itemType == 'DatasetStorageLocation',
-                )
-            )
-            .count()
-        )
-        shared_items = (
-            session.query(models.ShareObjectItem)
-            .filter(
-                and_(
-                    models.ShareObjectItem.shareUri == uri,
-                    models.ShareObjectItem.status.in_(share_item_shared_states),
-                )
-            )
-            .count()
-        )
-        revoked_items = (
-            session.query(models.ShareObjectItem)
-            .filter(
-                and_(
-                    models.ShareObjectItem.shareUri == uri,
-                    models.ShareObjectItem.status.in_([ShareItemStatus.Revoke_Succeeded.value]),
-                )
-            )
-            .count()
-        )
         failed_states = [
             ShareItemStatus.Share_Failed.value,
             ShareItemStatus.Revoke_Failed.value
         ]
-        failed_items = (
-            session.query(models.ShareObjectItem)
-            .filter(
-                and_(
-                    models.ShareObjectItem.shareUri == uri,
-                    models.ShareObjectItem.status.in_(failed_states),
-                )
-            )
-            .count()
-        )
         pending_states = [
             ShareItemStatus.PendingApproval.value
         ]
-        pending_items = (
-            session.query(models.ShareObjectItem)
-            .filter(
-                and_(
-                    models.ShareObjectItem.shareUri == uri,
-                    models.ShareObjectItem.status.in_(pending_states),
-                )
+        statistics = {
+            uri: {'tables': 0, 'locations': 0, 'sharedItems': 0, 'revokedItems': 0, 'failedItems': 0, 'pendingItems': 0}
+            for uri in uris
+        }
+        if not statistics:
+            return statistics
+        counts = (
+            session.query(
+                models.ShareObjectItem.shareUri,
+                models.ShareObjectItem.itemType,
+                models.ShareObjectItem.status,
+                func.count(),
+            )
+            .filter(models.ShareObjectItem.shareUri.in_(list(statistics)))
+            .group_by(
+                models.ShareObjectItem.shareUri,
+                models.ShareObjectItem.itemType,
+                models.ShareObjectItem.status,
             )
-            .count()
+            .all()
         )
-        return {'tables': tables, 'locations': locations, 'sharedItems': shared_items, 'revokedItems': revoked_items, 'failedItems': failed_items, 'pendingItems': pending_items}
+        for uri, item_type, status, count in counts:
+            share_statistics = statistics[uri]
+            if item_type == 'DatasetTable':
+                share_statistics['tables'] += count
+            elif item_type == 'DatasetStorageLocation':
+                share_statistics['locations'] += count
+            if status in share_item_shared_states:
+                share_statistics['sharedItems'] += count
+            if status == ShareItemStatus.Revoke_Succeeded.value:
+                share_statistics['revokedItems'] += count
+            if status in failed_states:
+                share_statistics['failedItems'] += count
+            if status in pending_states:
+                share_statistics['pendingItems'] += count
+        return statistics
@@ -1,11 +1,16 @@
+import datetime
 import logging
+import os
+import threading
+import time
 
 from sqlalchemy.sql import and_
 
 from .. import exceptions, permissions, paginate
-from .. import models
+from .. import models, utils
 from ..api.permission import Permission
 from ..api.tenant import Tenant
+from .permission_cache import get_permission_cache
 from ..models.Permission import PermissionType
 
 logger = logging.getLogger(__name__)
@@ -13,6 +18,49 @@ logger = logging.getLogger(__name__)
 TENANT_NAME = 'dataall'
 
 
+class TenantGroupsCache:
+    """
+    Process wide cache of the groups known to have a tenant policy.
+    Entries expire after ttl seconds so that policies deleted by another
+    process are eventually noticed, the policies deleted by this process
+    are discarded right away.
+    """
+
+    def __init__(self, ttl: float = None, clock=time.monotonic):
+        self.ttl = (
+            ttl if ttl is not None else float(os.getenv('TENANT_GROUPS_CACHE_TTL', '300'))
+        )
+        self.clock = clock
+        self._expires = {}
+        self._lock = threading.Lock()
+
+    def unknown(self, groups, tenant_name) -> set:
+        now = self.clock()
+        with self._lock:
+            return {
+                group
+                for group in groups
+                if group and self._expires.get((tenant_name, group), 0) <= now
+            }
+
+    def add(self, groups, tenant_name):
+        expires = self.clock() + self.ttl
+        with self._lock:
+            for group in groups:
+                self._expires[(tenant_name, group)] = expires
+
+    def discard(self, group, tenant_name):
+        with self._lock:
+            self._expires.pop((tenant_name, group), None)
+
+
+tenant_groups_cache = TenantGroupsCache()
+
+
+def get_tenant_groups_cache() -> TenantGroupsCache:
+    return tenant_groups_cache
+
+
 class TenantPolicy:
     @staticmethod
     def is_tenant_admin(groups: [str]):
@@ -55,6 +103,11 @@ class TenantPolicy:
     ):
         if not username or not permission_name:
             return False
+        cache = get_permission_cache()
+        if cache:
+            return cache.get_tenant_policy(
+                session, groups, tenant_name, permission_name
+            )
         tenant_policy: models.TenantPolicy = (
             session.query(models.TenantPolicy)
             .join(
@@ -159,8 +212,124 @@ class TenantPolicy:
             session, group, permissions, tenant_name, policy
         )
 
+        cache = get_permission_cache()
+        if cache:
+            cache.invalidate_tenant(tenant_name)
+
         return policy
 
+    @staticmethod
+    def find_groups_without_tenant_policy(
+        session, groups: [str], tenant_name: str
+    ) -> set:
+        if not tenant_name:
+            raise exceptions.RequiredParameter(param_name='tenant_name')
+        groups = {group for group in groups or [] if group}
+        if not groups:
+            return set()
+        existing = (
+            session.query(models.TenantPolicy.principalId)
+            .join(
+                models.Tenant, models.Tenant.tenantUri == models.TenantPolicy.tenantUri
+            )
+            .filter(
+                and_(
+                    models.TenantPolicy.principalId.in_(groups),
+                    models.Tenant.name == tenant_name,
+                )
+            )
+        )
+        return groups - {policy.principalId for policy in existing}
+
+    @staticmethod
+    def bulk_attach_groups_tenant_policy(
+        session,
+        groups: [str],
+        permissions: [str],
+        tenant_name: str,
+    ) -> [str]:
+        """
+        Creates the tenant policies of groups and their permissions with one
+        insert statement each. The caller ensures the groups have no policy
+        yet, see find_groups_without_tenant_policy.
+        """
+        groups = sorted({group for group in groups or [] if group})
+        if not groups:
+            return []
+        TenantPolicy.validate_attach_tenant_policy(groups, permissions, tenant_name)
+
+        tenant = Tenant.get_tenant_by_name(session, tenant_name)
+        permission_uris = dict(
+            session.query(models.Permission.name, models.Permission.permissionUri)
+            .filter(
+                models.Permission.name.in_(set(permissions)),
+                models.Permission.type == PermissionType.TENANT.name,
+            )
+            .all()
+        )
+        missing = set(permissions) - set(permission_uris)
+        if missing:
+            raise exceptions.ObjectNotFound('Permission', ', '.join(sorted(missing)))
+
+        now = datetime.datetime.now()
+        policies = [
+            dict(
+                sid=utils.uuid('tenant_policy')(None),
+                tenantUri=tenant.tenantUri,
+                principalId=group,
+                principalType='GROUP',
+                created=now,
+            )
+            for group in groups
+        ]
+        session.execute(models.TenantPolicy.__table__.insert().values(policies))
+        session.execute(
+            models.TenantPolicyPermission.__table__.insert().values(
+                [
+                    dict(sid=policy['sid'], permissionUri=uri, created=now)
+                    for policy in policies
+                    for uri in permission_uris.values()
+                ]
+            )
+        )
+        session.commit()
+
+        cache = get_permission_cache()
+        if cache:
+            cache.invalidate_tenant(tenant_name)
+
+        return groups
+
+    @staticmethod
+    def ensure_groups_tenant_policy(
+        session,
+        groups: [str],
+        permissions: [str],
+        tenant_name: str,
+        known_groups: TenantGroupsCache = None,
+    ) -> [str]:
+        """
+        Attaches a tenant policy to the groups that have none.
+        Groups found in known_groups are skipped without querying the
+        database. Returns the groups that were attached a policy.
+        """
+        unknown = (
+            known_groups.unknown(groups, tenant_name)
+            if known_groups
+            else {group for group in groups or [] if group}
+        )
+        if not unknown:
+            return []
+        missing = TenantPolicy.find_groups_without_tenant_policy(
+            session, unknown, tenant_name
+        )
+        attached = TenantPolicy.bulk_attach_groups_tenant_policy(
+            session, missing, permissions, tenant_name
+        )
+        if known_groups:
+            known_groups.add(unknown, tenant_name)
+        return attached
+
     @staticmethod
     def validate_attach_tenant_policy(group, permissions, tenant_name):
         if not group:
@@ -272,6 +441,11 @@ class TenantPolicy:
             session.delete(policy)
             session.commit()
 
+        cache = get_permission_cache()
+        if cache:
+            cache.invalidate_tenant(tenant_name)
+        tenant_groups_cache.discard(group, tenant_name)
+
         return True
 
     @staticmethod
@@ -1,12 +1,16 @@
 import json
 import logging
 import os
+import threading
+import time
 from contextlib import contextmanager
+from contextvars import ContextVar
 
 import boto3
 import sqlalchemy
 from sqlalchemy.engine import reflection
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.pool import QueuePool
 
 from .. import db
 from ..db import Base
@@ -21,14 +25,81 @@ except ImportError:
 log = logging.getLogger(__name__)
 ENVNAME = os.getenv('envname', 'local')
 
+# Aurora closes idle connections and fails over by swapping the writer
+# endpoint, so connections are recycled and pinged before being reused
+POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', '30'))
+POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '300'))
+
+_session_scope: ContextVar = ContextVar('session_scope', default=None)
+
+
+def _scope_key():
+    """Sessions are scoped to the current request when inside
+    Engine.request_scope, and to the current thread otherwise"""
+    return _session_scope.get() or threading.get_ident()
+
+
+class MeteredQueuePool(QueuePool):
+    """QueuePool recording how long callers waited for a connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+        self._metrics_lock = threading.Lock()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - start
+            with self._metrics_lock:
+                self.checkouts += 1
+                self.wait_time += waited
+                self.max_wait_time = max(self.max_wait_time, waited)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.checkouts = self.checkouts
+        pool.wait_time = self.wait_time
+        pool.max_wait_time = self.max_wait_time
+        return pool
+
+    def metrics(self) -> dict:
+        return {
+            'size': self.size(),
+            'checked_out': self.checkedout(),
+            'checked_in': self.checkedin(),
+            'overflow': max(self.overflow(), 0),
+            'checkouts': self.checkouts,
+            'wait_time': round(self.wait_time, 6),
+            'max_wait_time': round(self.max_wait_time, 6),
+        }
+
 
 class Engine:
-    def __init__(self, dbconfig: DbConfig):
+    def __init__(
+        self,
+        dbconfig: DbConfig,
+        pool_size: int = POOL_SIZE,
+        max_overflow: int = MAX_OVERFLOW,
+        pool_timeout: int = POOL_TIMEOUT,
+        pool_recycle: int = POOL_RECYCLE,
+    ):
         self.dbconfig = dbconfig
         self.engine = sqlalchemy.create_engine(
             dbconfig.url,
             echo=False,
-            pool_size=1,
+            poolclass=MeteredQueuePool,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=pool_timeout,
+            pool_recycle=pool_recycle,
+            pool_pre_ping=True,
             connect_args={'options': f"-csearch_path={dbconfig.schema}"},
         )
         try:
@@ -45,16 +116,14 @@ class Engine:
         except Exception as e:
             log.error(f'Could not create schema: {e}')
 
-        self.sessions = {}
-        self._session = None
+        self.sessions = scoped_session(
+            sessionmaker(bind=self.engine, autoflush=True, expire_on_commit=False),
+            scopefunc=_scope_key,
+        )
 
     def session(self):
-        if self._session is None:
-            self._session = sessionmaker(
-                bind=self.engine, autoflush=True, expire_on_commit=False
-            )()
-
-        return self._session
+        """Session of the current request, or of the current thread"""
+        return self.sessions()
 
     @contextmanager
     def scoped_session(self):
@@ -68,7 +137,28 @@ class Engine:
         finally:
             s.close()
 
+    @contextmanager
+    def request_scope(self):
+        """
+        Gives the enclosed block its own session, for example one API request
+        or one task run on a thread pool. The session is discarded on exit.
+        """
+        token = _session_scope.set(object())
+        try:
+            yield
+        finally:
+            self.sessions.remove()
+            _session_scope.reset(token)
+
+    def remove_session(self):
+        """Closes and discards the session of the current scope"""
+        self.sessions.remove()
+
+    def pool_metrics(self) -> dict:
+        return self.engine.pool.metrics()
+
     def dispose(self):
+        self.sessions.remove()
         self.engine.dispose()
 
 
@@ -117,11 +207,7 @@ def get_engine(envname=ENVNAME):
         param_store = Parameter()
         secret = Secrets()
         credential_arn = param_store.get_parameter(env=envname, path='aurora/dbcreds')
-        secretsmanager = boto3.client(
-            'secretsmanager', region_name=os.environ.get('AWS_REGION', 'eu-west-1')
-        )
-        db_credentials_string = secretsmanager.get_secret_value(SecretId=credential_arn)
-        creds = json.loads(db_credentials_string['SecretString'])
+        creds = json.loads(secret.get_secret_value(credential_arn))
         user = creds['username']
         pwd = creds['password']
         host = param_store.get_parameter(env=envname, path='aurora/hostname')
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, String
+from sqlalchemy import Boolean, Column, String, Index
 from sqlalchemy.orm import query_expression
 
 from .. import Base, Resource, utils
@@ -6,6 +6,13 @@ from .. import Base, Resource, utils
 
 class DatasetStorageLocation(Resource, Base):
     __tablename__ = 'dataset_storage_location'
+    __table_args__ = (
+        Index(
+            'ix_dataset_storage_location_S3Prefix',
+            'S3Prefix',
+            postgresql_ops={'S3Prefix': 'text_pattern_ops'},
+        ),
+    )
     datasetUri = Column(String, nullable=False)
     locationUri = Column(String, primary_key=True, default=utils.uuid('location'))
     AWSAccountId = Column(String, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text
+from sqlalchemy import Column, String, Text, Index
 from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import query_expression
 
@@ -8,6 +8,9 @@ from .. import Resource, utils
 
 class DatasetTable(Resource, Base):
     __tablename__ = 'dataset_table'
+    __table_args__ = (
+        Index('ix_dataset_table_datasetUri_status', 'datasetUri', 'LastGlueTableStatus'),
+    )
     datasetUri = Column(String, nullable=False)
     tableUri = Column(String, primary_key=True, default=utils.uuid('table'))
     AWSAccountId = Column(String, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String
+from sqlalchemy import Column, String, Index
 
 from .. import Base
 from .. import Resource, utils
@@ -6,6 +6,9 @@ from .. import Resource, utils
 
 class DatasetTableColumn(Resource, Base):
     __tablename__ = 'dataset_table_column'
+    __table_args__ = (
+        Index('ix_dataset_table_column_glue_table', 'GlueDatabaseName', 'GlueTableName'),
+    )
     datasetUri = Column(String, nullable=False)
     tableUri = Column(String, nullable=False)
     columnUri = Column(String, primary_key=True, default=utils.uuid('col'))
@@ -1,6 +1,6 @@
 import datetime
 
-from sqlalchemy import Column, DateTime, String, Boolean
+from sqlalchemy import Column, DateTime, String, Boolean, Index
 
 from .Enums import EnvironmentPermission as EnvironmentPermissionEnum
 from .. import Base
@@ -8,6 +8,9 @@ from .. import Base
 
 class EnvironmentGroup(Base):
     __tablename__ = 'environment_group_permission'
+    __table_args__ = (
+        Index('ix_environment_group_permission_env_group', 'environmentUri', 'groupUri'),
+    )
     groupUri = Column(String, primary_key=True)
     environmentUri = Column(String, primary_key=True)
     invitedBy = Column(String, nullable=True)
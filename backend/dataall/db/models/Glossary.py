@@ -1,7 +1,7 @@
 import enum
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, String, DateTime, Enum
+from sqlalchemy import Boolean, Column, String, DateTime, Enum, Index
 from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import query_expression
 
@@ -19,6 +19,13 @@ class GlossaryNodeStatus(enum.Enum):
 
 class GlossaryNode(Base):
     __tablename__ = 'glossary_node'
+    __table_args__ = (
+        Index(
+            'ix_glossary_node_path',
+            'path',
+            postgresql_ops={'path': 'text_pattern_ops'},
+        ),
+    )
     nodeUri = Column(String, primary_key=True, default=utils.uuid('glossary_node'))
     parentUri = Column(String, nullable=True)
     nodeType = Column(String, default='G')
@@ -52,6 +59,9 @@ class GlossarySchemaMap:
 
 class TermLink(Base):
     __tablename__ = 'term_link'
+    __table_args__ = (
+        Index('ix_term_link_targetUri_approved', 'targetUri', 'approvedBySteward'),
+    )
     linkUri = Column(String, primary_key=True, default=utils.uuid('term_link'))
     nodeUri = Column(String, nullable=False)
     targetUri = Column(String, nullable=False)
@@ -1,6 +1,6 @@
 import datetime
 
-from sqlalchemy import Column, DateTime, String
+from sqlalchemy import Boolean, Column, DateTime, String
 from sqlalchemy.dialects import postgresql
 
 from .. import Base
@@ -31,3 +31,5 @@ class Stack(Base):
         DateTime, default=lambda: datetime.datetime(year=1900, month=1, day=1)
     )
     EcsTaskArn = Column(String, nullable=True)
+    templateFingerprint = Column(String, nullable=True)
+    deploySkipped = Column(Boolean, default=False)
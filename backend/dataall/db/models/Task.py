@@ -1,6 +1,6 @@
 import datetime
 
-from sqlalchemy import Column, DateTime, String
+from sqlalchemy import Column, DateTime, String, Index
 from sqlalchemy.dialects import postgresql
 
 from .. import Base
@@ -9,6 +9,9 @@ from .. import utils
 
 class Task(Base):
     __tablename__ = 'task'
+    __table_args__ = (
+        Index('ix_task_status', 'status'),
+    )
     taskUri = Column(
         String, nullable=False, default=utils.uuid('Task'), primary_key=True
     )
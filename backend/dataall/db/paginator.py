@@ -1,5 +1,16 @@
+import base64
+import datetime
+import enum
+import json
 import math
 
+import sqlalchemy
+from sqlalchemy import and_, or_
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import UnaryExpression
+
+from . import exceptions
+
 __version__ = '0.0.2'
 
 
@@ -34,11 +45,248 @@ class Page(object):
         }
 
 
-def paginate(query, page, page_size):
+COUNT_EXACT = 'exact'
+COUNT_ESTIMATE = 'estimate'
+COUNT_NONE = 'none'
+
+
+def paginate(query, page, page_size, count_mode=COUNT_EXACT):
+    """
+    Paginates a query with an OFFSET.
+    Unless the count is exact, one more row is fetched to know if
+    there is a next page, as the total may be skipped or estimated.
+    """
     if page <= 0:
         raise AttributeError('page needs to be >= 1')
     if page_size <= 0:
         raise AttributeError('page_size needs to be >= 1')
-    items = query.limit(page_size).offset((page - 1) * page_size).all()
-    total = query.order_by(None).count()
-    return Page(items, page, page_size, total)
+    if count_mode == COUNT_EXACT:
+        items = query.limit(page_size).offset((page - 1) * page_size).all()
+        total = query.order_by(None).count()
+        return Page(items, page, page_size, total)
+    items = query.limit(page_size + 1).offset((page - 1) * page_size).all()
+    return KeysetPage(
+        items[:page_size],
+        page,
+        page_size,
+        count_query(query, count_mode),
+        has_next=len(items) > page_size,
+        has_previous=page > 1,
+    )
+
+
+class KeysetPage(Page):
+    """
+    Page of a keyset (cursor) pagination, or of an offset pagination
+    without an exact count.
+    The total may be None when the count was skipped.
+    """
+
+    def __init__(
+        self,
+        items,
+        page,
+        page_size,
+        total,
+        has_next,
+        has_previous,
+        next_cursor=None,
+        previous_cursor=None,
+    ):
+        super().__init__(items, page, page_size, total or 0)
+        self.total = total
+        self.pages = (
+            int(math.ceil(total / float(page_size))) if total is not None else None
+        )
+        self.has_next = has_next
+        self.next_page = page + 1 if has_next else None
+        self.has_previous = has_previous
+        self.previous_page = page - 1 if has_previous else None
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def to_dict(self):
+        page = super().to_dict()
+        page['nextCursor'] = self.next_cursor
+        page['previousCursor'] = self.previous_cursor
+        return page
+
+
+def _encode_value(value):
+    if isinstance(value, datetime.datetime):
+        return {'dt': value.isoformat()}
+    if isinstance(value, enum.Enum):
+        return value.name
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict) and 'dt' in value:
+        return datetime.datetime.fromisoformat(value['dt'])
+    return value
+
+
+def encode_cursor(page, keys, direction):
+    payload = {'p': page, 'd': direction, 'k': [_encode_value(k) for k in keys]}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode('utf-8')).decode('utf-8')
+
+
+def decode_cursor(cursor):
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode('utf-8')))
+        return payload['p'], [_decode_value(k) for k in payload['k']], payload['d']
+    except (ValueError, KeyError, TypeError):
+        raise exceptions.InvalidInput(
+            'cursor', cursor, 'a cursor returned by a previous page'
+        )
+
+
+def _order_columns(query, order_by):
+    """Returns the (column, descending) pairs of the keyset ordering,
+    defaulting to the primary key of the queried entity"""
+    if not order_by:
+        entity = query.column_descriptions[0]['entity']
+        order_by = list(sqlalchemy.inspect(entity).primary_key)
+    columns = []
+    for clause in order_by:
+        if isinstance(clause, UnaryExpression) and clause.modifier in (
+            operators.desc_op,
+            operators.asc_op,
+        ):
+            columns.append((clause.element, clause.modifier == operators.desc_op))
+        else:
+            columns.append((clause, False))
+    return columns
+
+
+def _keyset_filter(columns, keys, backwards):
+    """(c1 > k1) OR (c1 = k1 AND c2 > k2) OR ... honouring each column direction"""
+    clauses = []
+    for i, (column, descending) in enumerate(columns):
+        after = column < keys[i] if descending != backwards else column > keys[i]
+        clauses.append(
+            and_(*[columns[j][0] == keys[j] for j in range(i)], after)
+        )
+    return or_(*clauses)
+
+
+def _row_keys(row, columns):
+    return [getattr(row, column.key) for column, _ in columns]
+
+
+def estimate_count(query):
+    """Returns the planner row estimate of the query, no rows are scanned"""
+    session = query.session
+    dialect = session.bind.dialect
+    compiled = query.order_by(None).statement.compile(dialect=dialect)
+    if dialect.positional:
+        params = [compiled.params[name] for name in compiled.positiontup]
+    else:
+        params = compiled.params
+    plan = (
+        session.connection()
+        .execute(f'EXPLAIN (FORMAT JSON) {compiled}', params)
+        .scalar()
+    )
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def count_query(query, count_mode=COUNT_EXACT):
+    if count_mode == COUNT_NONE:
+        return None
+    if count_mode == COUNT_ESTIMATE:
+        return estimate_count(query)
+    return query.order_by(None).count()
+
+
+def keyset_paginate(
+    query, page_size, cursor=None, order_by=None, count_mode=COUNT_EXACT
+):
+    """
+    Paginates a query with a WHERE clause on the last seen sort key
+    instead of an OFFSET, so that every page costs the same.
+    order_by must be a unique ordering (e.g. end with the primary key) whose
+    columns are readable as attributes of the result rows.
+    """
+    if page_size <= 0:
+        raise AttributeError('page_size needs to be >= 1')
+    columns = _order_columns(query, order_by)
+    total = count_query(query, count_mode)
+
+    page, backwards = 1, False
+    paged = query.order_by(None)
+    if cursor:
+        previous_page, keys, direction = decode_cursor(cursor)
+        if len(keys) != len(columns):
+            raise exceptions.InvalidInput(
+                'cursor', cursor, 'a cursor returned by a previous page'
+            )
+        backwards = direction == 'previous'
+        page = previous_page - 1 if backwards else previous_page + 1
+        paged = paged.filter(_keyset_filter(columns, keys, backwards))
+
+    paged = paged.order_by(
+        *[
+            column.desc() if descending != backwards else column.asc()
+            for column, descending in columns
+        ]
+    )
+    items = paged.limit(page_size + 1).all()
+    has_more = len(items) > page_size
+    items = items[:page_size]
+    if backwards:
+        items.reverse()
+        has_next, has_previous = True, has_more
+    else:
+        has_next, has_previous = has_more, page > 1
+
+    next_cursor = (
+        encode_cursor(page, _row_keys(items[-1], columns), 'next')
+        if has_next and items
+        else None
+    )
+    previous_cursor = (
+        encode_cursor(page, _row_keys(items[0], columns), 'previous')
+        if has_previous and items
+        else None
+    )
+    return KeysetPage(
+        items,
+        page,
+        page_size,
+        total,
+        has_next,
+        has_previous,
+        next_cursor,
+        previous_cursor,
+    )
+
+
+def paginate_data(query, data, default_page_size=10, order_by=None):
+    """
+    Paginates a query from the page, pageSize, cursor and countMode of
+    a GraphQL filter and returns the Page dictionary.
+    An offset page is returned unless a cursor is given, an empty cursor
+    returns the first keyset page. Both are sorted by order_by when given,
+    so that switching to cursors keeps the order of the list.
+    The countMode applies to both.
+    """
+    data = data or {}
+    if data.get('cursor') is None:
+        if order_by:
+            query = query.order_by(None).order_by(*order_by)
+        return paginate(
+            query=query,
+            page=data.get('page', 1),
+            page_size=data.get('pageSize', default_page_size),
+            count_mode=data.get('countMode') or COUNT_EXACT,
+        ).to_dict()
+    return keyset_paginate(
+        query=query,
+        page_size=data.get('pageSize', default_page_size),
+        cursor=data.get('cursor'),
+        order_by=order_by,
+        count_mode=data.get('countMode') or COUNT_EXACT,
+    ).to_dict()
@@ -1,4 +1,4 @@
-from .connect import connect
+from .connect import connect, LazyConnection
 from .indexers import upsert_dataset
 from .indexers import upsert_table
 from .indexers import upsert_dataset_tables
@@ -7,6 +7,7 @@ from .upsert import upsert
 
 __all__ = [
     'connect',
+    'LazyConnection',
     'run_query',
     'upsert',
     'upsert_dataset',
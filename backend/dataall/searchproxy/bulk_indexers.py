@@ -0,0 +1,307 @@
+import logging
+from collections import defaultdict
+
+from opensearchpy import helpers
+from sqlalchemy import and_, or_, false, func
+
+from .indexers import (
+    glossary_terms_query,
+    dataset_query,
+    dataset_doc,
+    table_query,
+    table_doc,
+    folder_query,
+    folder_doc,
+    dashboard_query,
+    dashboard_doc,
+)
+from .upsert import bulk_upsert, bulk_delete
+from ..db import models
+
+log = logging.getLogger(__name__)
+
+
+def get_glossary_terms_by_target(session, *criteria) -> dict:
+    terms = defaultdict(list)
+    for link in glossary_terms_query(session).filter(*criteria):
+        terms[link.targetUri].append(link.path)
+    return terms
+
+
+def count_by(session, column, *criteria) -> dict:
+    return dict(
+        session.query(column, func.count()).filter(*criteria).group_by(column).all()
+    )
+
+
+def iter_dataset_docs(session, *criteria):
+    datasets = dataset_query(session).filter(*criteria).all()
+    uris = [d.datasetUri for d in datasets]
+    if not uris:
+        return
+    glossary = get_glossary_terms_by_target(
+        session, models.TermLink.targetUri.in_(uris)
+    )
+    tables = count_by(
+        session,
+        models.DatasetTable.datasetUri,
+        models.DatasetTable.datasetUri.in_(uris),
+    )
+    folders = count_by(
+        session,
+        models.DatasetStorageLocation.datasetUri,
+        models.DatasetStorageLocation.datasetUri.in_(uris),
+    )
+    upvotes = count_by(
+        session,
+        models.Vote.targetUri,
+        models.Vote.targetUri.in_(uris),
+        models.Vote.targetType == 'dataset',
+        models.Vote.upvote == True,
+    )
+    for dataset in datasets:
+        yield dataset.datasetUri, dataset_doc(
+            dataset,
+            glossary.get(dataset.datasetUri, []),
+            tables.get(dataset.datasetUri, 0),
+            folders.get(dataset.datasetUri, 0),
+            upvotes.get(dataset.datasetUri, 0),
+        )
+
+
+def iter_table_docs(session, *criteria):
+    tables = table_query(session).filter(*criteria).all()
+    if not tables:
+        return
+    glossary = get_glossary_terms_by_target(
+        session, models.TermLink.targetUri.in_([t.uri for t in tables])
+    )
+    for table in tables:
+        yield table.uri, table_doc(table, glossary.get(table.uri, []))
+
+
+def iter_folder_docs(session, *criteria):
+    folders = folder_query(session).filter(*criteria).all()
+    if not folders:
+        return
+    glossary = get_glossary_terms_by_target(
+        session, models.TermLink.targetUri.in_([f.uri for f in folders])
+    )
+    for folder in folders:
+        yield folder.uri, folder_doc(folder, glossary.get(folder.uri, []))
+
+
+def iter_dashboard_docs(session, *criteria):
+    dashboards = dashboard_query(session).filter(*criteria).all()
+    if not dashboards:
+        return
+    glossary = get_glossary_terms_by_target(
+        session, models.TermLink.targetUri.in_([d.uri for d in dashboards])
+    )
+    upvotes = count_by(
+        session,
+        models.Vote.targetUri,
+        models.Vote.targetUri.in_([d.uri for d in dashboards]),
+        models.Vote.targetType == 'dashboard',
+        models.Vote.upvote == True,
+    )
+    for dashboard in dashboards:
+        yield dashboard.uri, dashboard_doc(
+            dashboard,
+            glossary.get(dashboard.uri, []),
+            upvotes.get(dashboard.uri, 0),
+        )
+
+
+def _collect_ids(docs, ids):
+    for doc_id, doc in docs:
+        ids.add(doc_id)
+        yield doc_id, doc
+
+
+def bulk_index_catalog(session, es, chunk_size=500, reconcile=False) -> dict:
+    """
+    Indexes all active datasets with their tables and folders, and all
+    dashboards, with one query per kind of document and _bulk requests of
+    chunk_size documents. Returns the counters of every kind of document.
+    With reconcile, the documents of the index that do not match any
+    indexed object are deleted.
+    """
+    active = models.Dataset.deleted.is_(None)
+    indexed_ids = set()
+    kinds = {
+        'datasets': iter_dataset_docs(session, active),
+        'tables': iter_table_docs(
+            session,
+            active,
+            models.DatasetTable.deleted.is_(None),
+            models.DatasetTable.LastGlueTableStatus != 'Deleted',
+        ),
+        'folders': iter_folder_docs(
+            session, active, models.DatasetStorageLocation.deleted.is_(None)
+        ),
+        'dashboards': iter_dashboard_docs(
+            session, models.Dashboard.deleted.is_(None)
+        ),
+    }
+    stats = {}
+    for kind, docs in kinds.items():
+        stats[kind] = bulk_upsert(
+            es=es,
+            index='dataall-index',
+            docs=_collect_ids(docs, indexed_ids),
+            chunk_size=chunk_size,
+        )
+        log.info(f'Bulk indexing of {kind}: {stats[kind]}')
+    if reconcile:
+        stale_ids = [
+            hit['_id']
+            for hit in helpers.scan(
+                es, index='dataall-index', query={'_source': False}
+            )
+            if hit['_id'] not in indexed_ids
+        ]
+        stats['deleted'] = bulk_delete(
+            es=es, index='dataall-index', ids=stale_ids, chunk_size=chunk_size
+        )
+    return stats
+
+
+def column_in(column, values):
+    return column.in_(list(values)) if values else false()
+
+
+def changed_since(model, since):
+    return or_(model.created > since, model.updated > since)
+
+
+def get_changed_glossary_targets(session, since) -> set:
+    """Targets of the term links or glossary terms updated since the watermark"""
+    links = (
+        session.query(models.TermLink.targetUri)
+        .join(
+            models.GlossaryNode, models.GlossaryNode.nodeUri == models.TermLink.nodeUri
+        )
+        .filter(
+            or_(
+                changed_since(models.TermLink, since),
+                changed_since(models.GlossaryNode, since),
+            )
+        )
+    )
+    return {link.targetUri for link in links}
+
+
+def incremental_index_catalog(session, es, since, chunk_size=500) -> dict:
+    """
+    Indexes the catalog objects created or updated since the watermark and
+    deletes the documents of the objects deleted since then.
+    Tables and folders are re-indexed when their dataset changed, and the
+    dataset when its tables, folders, votes or glossary terms changed.
+    """
+    glossary_targets = get_changed_glossary_targets(session, since)
+    vote_targets = {
+        v.targetUri
+        for v in session.query(models.Vote.targetUri).filter(
+            changed_since(models.Vote, since)
+        )
+    }
+    dataset_uris = {
+        d.datasetUri
+        for q in [
+            session.query(models.Dataset.datasetUri).filter(
+                changed_since(models.Dataset, since)
+            ),
+            session.query(models.DatasetTable.datasetUri).filter(
+                changed_since(models.DatasetTable, since)
+            ),
+            session.query(models.DatasetStorageLocation.datasetUri).filter(
+                changed_since(models.DatasetStorageLocation, since)
+            ),
+        ]
+        for d in q
+    }
+    targets = glossary_targets | vote_targets
+    active = models.Dataset.deleted.is_(None)
+    dataset_changed = changed_since(models.Dataset, since)
+    kinds = {
+        'datasets': iter_dataset_docs(
+            session,
+            active,
+            column_in(models.Dataset.datasetUri, dataset_uris | targets),
+        ),
+        'tables': iter_table_docs(
+            session,
+            active,
+            models.DatasetTable.deleted.is_(None),
+            models.DatasetTable.LastGlueTableStatus != 'Deleted',
+            or_(
+                changed_since(models.DatasetTable, since),
+                dataset_changed,
+                column_in(models.DatasetTable.tableUri, targets),
+            ),
+        ),
+        'folders': iter_folder_docs(
+            session,
+            active,
+            models.DatasetStorageLocation.deleted.is_(None),
+            or_(
+                changed_since(models.DatasetStorageLocation, since),
+                dataset_changed,
+                column_in(models.DatasetStorageLocation.locationUri, targets),
+            ),
+        ),
+        'dashboards': iter_dashboard_docs(
+            session,
+            models.Dashboard.deleted.is_(None),
+            or_(
+                changed_since(models.Dashboard, since),
+                column_in(models.Dashboard.dashboardUri, targets),
+            ),
+        ),
+    }
+    stats = {}
+    for kind, docs in kinds.items():
+        stats[kind] = bulk_upsert(
+            es=es, index='dataall-index', docs=docs, chunk_size=chunk_size
+        )
+        log.info(f'Incremental indexing of {kind}: {stats[kind]}')
+
+    deleted_datasets = [
+        d.datasetUri
+        for d in session.query(models.Dataset.datasetUri).filter(
+            models.Dataset.deleted > since
+        )
+    ]
+    deleted_ids = deleted_datasets + [
+        t.tableUri
+        for t in session.query(models.DatasetTable.tableUri).filter(
+            or_(
+                column_in(models.DatasetTable.datasetUri, deleted_datasets),
+                and_(
+                    models.DatasetTable.LastGlueTableStatus == 'Deleted',
+                    changed_since(models.DatasetTable, since),
+                ),
+                models.DatasetTable.deleted > since,
+            )
+        )
+    ]
+    deleted_ids += [
+        f.locationUri
+        for f in session.query(models.DatasetStorageLocation.locationUri).filter(
+            or_(
+                column_in(models.DatasetStorageLocation.datasetUri, deleted_datasets),
+                models.DatasetStorageLocation.deleted > since,
+            )
+        )
+    ]
+    deleted_ids += [
+        d.dashboardUri
+        for d in session.query(models.Dashboard.dashboardUri).filter(
+            models.Dashboard.deleted > since
+        )
+    ]
+    stats['deleted'] = bulk_delete(
+        es=es, index='dataall-index', ids=deleted_ids, chunk_size=chunk_size
+    )
+    return stats
@@ -84,6 +84,25 @@ def connect(envname='local'):
         return es
 
 
+class LazyConnection:
+    """
+    Opens the OpenSearch connection on first use instead of at import time,
+    so Lambda cold starts do not pay for it on requests not using search.
+    """
+
+    def __init__(self, envname='local'):
+        self.envname = envname
+        self._es = None
+
+    def __getattr__(self, name):
+        if self._es is None:
+            self._es = connect(envname=self.envname)
+        return getattr(self._es, name)
+
+    def __repr__(self):
+        return f'LazyConnection({self.envname}, connected={self._es is not None})'
+
+
 def connect_dev_environment(envname):
     hostname = 'elasticsearch' if envname == 'dkrcompose' else 'localhost'
     try:
@@ -1,7 +1,6 @@
 import logging
 
 from sqlalchemy import and_
-from sqlalchemy.orm import with_expression
 
 from .upsert import upsert
 from .. import db
@@ -10,29 +9,23 @@ from ..db import models
 log = logging.getLogger(__name__)
 
 
-def get_target_glossary_terms(session, targetUri):
-    q = (
-        session.query(models.TermLink)
-        .options(
-            with_expression(models.TermLink.path, models.GlossaryNode.path),
-            with_expression(models.TermLink.label, models.GlossaryNode.label),
-            with_expression(models.TermLink.readme, models.GlossaryNode.readme),
-        )
+def glossary_terms_query(session):
+    return (
+        session.query(models.TermLink.targetUri, models.GlossaryNode.path)
         .join(
             models.GlossaryNode, models.GlossaryNode.nodeUri == models.TermLink.nodeUri
         )
-        .filter(
-            and_(
-                models.TermLink.targetUri == targetUri,
-                models.TermLink.approvedBySteward.is_(True),
-            )
-        )
+        .filter(models.TermLink.approvedBySteward.is_(True))
     )
+
+
+def get_target_glossary_terms(session, targetUri):
+    q = glossary_terms_query(session).filter(models.TermLink.targetUri == targetUri)
     return [t.path for t in q]
 
 
-def upsert_dataset(session, es, datasetUri: str):
-    dataset = (
+def dataset_query(session):
+    return (
         session.query(
             models.Dataset.datasetUri.label('datasetUri'),
             models.Dataset.name.label('name'),
@@ -62,8 +55,40 @@ def upsert_dataset(session, es, datasetUri: str):
             models.Environment,
             models.Dataset.environmentUri == models.Environment.environmentUri,
         )
-        .filter(models.Dataset.datasetUri == datasetUri)
-        .first()
+    )
+
+
+def dataset_doc(dataset, glossary, count_tables, count_folders, count_upvotes):
+    return {
+        'name': dataset.name,
+        'owner': dataset.owner,
+        'label': dataset.label,
+        'admins': dataset.admins,
+        'database': dataset.database,
+        'source': dataset.source,
+        'resourceKind': 'dataset',
+        'description': dataset.description,
+        'classification': dataset.classification,
+        'tags': [t.replace('-', '') for t in dataset.tags or []],
+        'topics': dataset.topics,
+        'region': dataset.region.replace('-', ''),
+        'environmentUri': dataset.envUri,
+        'environmentName': dataset.envName,
+        'organizationUri': dataset.orgUri,
+        'organizationName': dataset.orgName,
+        'created': dataset.created,
+        'updated': dataset.updated,
+        'deleted': dataset.deleted,
+        'glossary': glossary,
+        'tables': count_tables,
+        'folders': count_folders,
+        'upvotes': count_upvotes,
+    }
+
+
+def upsert_dataset(session, es, datasetUri: str):
+    dataset = (
+        dataset_query(session).filter(models.Dataset.datasetUri == datasetUri).first()
     )
     count_tables = db.api.Dataset.count_dataset_tables(session, datasetUri)
     count_folders = db.api.Dataset.count_dataset_locations(session, datasetUri)
@@ -77,37 +102,15 @@ def upsert_dataset(session, es, datasetUri: str):
             es=es,
             index='dataall-index',
             id=datasetUri,
-            doc={
-                'name': dataset.name,
-                'owner': dataset.owner,
-                'label': dataset.label,
-                'admins': dataset.admins,
-                'database': dataset.database,
-                'source': dataset.source,
-                'resourceKind': 'dataset',
-                'description': dataset.description,
-                'classification': dataset.classification,
-                'tags': [t.replace('-', '') for t in dataset.tags or []],
-                'topics': dataset.topics,
-                'region': dataset.region.replace('-', ''),
-                'environmentUri': dataset.envUri,
-                'environmentName': dataset.envName,
-                'organizationUri': dataset.orgUri,
-                'organizationName': dataset.orgName,
-                'created': dataset.created,
-                'updated': dataset.updated,
-                'deleted': dataset.deleted,
-                'glossary': glossary,
-                'tables': count_tables,
-                'folders': count_folders,
-                'upvotes': count_upvotes,
-            },
+            doc=dataset_doc(
+                dataset, glossary, count_tables, count_folders, count_upvotes
+            ),
         )
     return dataset
 
 
-def upsert_table(session, es, tableUri: str):
-    table = (
+def table_query(session):
+    return (
         session.query(
             models.DatasetTable.datasetUri.label('datasetUri'),
             models.DatasetTable.tableUri.label('uri'),
@@ -142,47 +145,55 @@ def upsert_table(session, es, tableUri: str):
             models.Environment,
             models.Dataset.environmentUri == models.Environment.environmentUri,
         )
-        .filter(models.DatasetTable.tableUri == tableUri)
-        .first()
+    )
+
+
+def table_doc(table, glossary):
+    tags = table.tags if table.tags else []
+    return {
+        'name': table.name,
+        'admins': table.admins,
+        'owner': table.owner,
+        'label': table.label,
+        'resourceKind': 'table',
+        'description': table.description,
+        'database': table.database,
+        'source': table.source,
+        'classification': table.classification,
+        'tags': [t.replace('-', '') for t in tags or []],
+        'topics': table.topics,
+        'region': table.region.replace('-', ''),
+        'datasetUri': table.datasetUri,
+        'environmentUri': table.envUri,
+        'environmentName': table.envName,
+        'organizationUri': table.orgUri,
+        'organizationName': table.orgName,
+        'created': table.created,
+        'updated': table.updated,
+        'deleted': table.deleted,
+        'glossary': glossary,
+    }
+
+
+def upsert_table(session, es, tableUri: str):
+    table = (
+        table_query(session).filter(models.DatasetTable.tableUri == tableUri).first()
     )
 
     if table:
         glossary = get_target_glossary_terms(session, tableUri)
-        tags = table.tags if table.tags else []
         upsert(
             es=es,
             index='dataall-index',
             id=tableUri,
-            doc={
-                'name': table.name,
-                'admins': table.admins,
-                'owner': table.owner,
-                'label': table.label,
-                'resourceKind': 'table',
-                'description': table.description,
-                'database': table.database,
-                'source': table.source,
-                'classification': table.classification,
-                'tags': [t.replace('-', '') for t in tags or []],
-                'topics': table.topics,
-                'region': table.region.replace('-', ''),
-                'datasetUri': table.datasetUri,
-                'environmentUri': table.envUri,
-                'environmentName': table.envName,
-                'organizationUri': table.orgUri,
-                'organizationName': table.orgName,
-                'created': table.created,
-                'updated': table.updated,
-                'deleted': table.deleted,
-                'glossary': glossary,
-            },
+            doc=table_doc(table, glossary),
         )
         upsert_dataset(session, es, table.datasetUri)
     return table
 
 
-def upsert_folder(session, es, locationUri: str):
-    folder = (
+def folder_query(session):
+    return (
         session.query(
             models.DatasetStorageLocation.datasetUri.label('datasetUri'),
             models.DatasetStorageLocation.locationUri.label('uri'),
@@ -216,6 +227,37 @@ def upsert_folder(session, es, locationUri: str):
             models.Environment,
             models.Dataset.environmentUri == models.Environment.environmentUri,
         )
+    )
+
+
+def folder_doc(folder, glossary):
+    return {
+        'name': folder.name,
+        'admins': folder.admins,
+        'owner': folder.owner,
+        'label': folder.label,
+        'resourceKind': 'folder',
+        'description': folder.description,
+        'source': folder.source,
+        'classification': folder.classification,
+        'tags': [f.replace('-', '') for f in folder.tags or []],
+        'topics': folder.topics,
+        'region': folder.region.replace('-', ''),
+        'datasetUri': folder.datasetUri,
+        'environmentUri': folder.envUri,
+        'environmentName': folder.envName,
+        'organizationUri': folder.orgUri,
+        'organizationName': folder.orgName,
+        'created': folder.created,
+        'updated': folder.updated,
+        'deleted': folder.deleted,
+        'glossary': glossary,
+    }
+
+
+def upsert_folder(session, es, locationUri: str):
+    folder = (
+        folder_query(session)
         .filter(models.DatasetStorageLocation.locationUri == locationUri)
         .first()
     )
@@ -225,35 +267,14 @@ def upsert_folder(session, es, locationUri: str):
             es=es,
             index='dataall-index',
             id=locationUri,
-            doc={
-                'name': folder.name,
-                'admins': folder.admins,
-                'owner': folder.owner,
-                'label': folder.label,
-                'resourceKind': 'folder',
-                'description': folder.description,
-                'source': folder.source,
-                'classification': folder.classification,
-                'tags': [f.replace('-', '') for f in folder.tags or []],
-                'topics': folder.topics,
-                'region': folder.region.replace('-', ''),
-                'datasetUri': folder.datasetUri,
-                'environmentUri': folder.envUri,
-                'environmentName': folder.envName,
-                'organizationUri': folder.orgUri,
-                'organizationName': folder.orgName,
-                'created': folder.created,
-                'updated': folder.updated,
-                'deleted': folder.deleted,
-                'glossary': glossary,
-            },
+            doc=folder_doc(folder, glossary),
         )
         upsert_dataset(session, es, folder.datasetUri)
     return folder
 
 
-def upsert_dashboard(session, es, dashboardUri: str):
-    dashboard = (
+def dashboard_query(session):
+    return (
         session.query(
             models.Dashboard.dashboardUri.label('uri'),
             models.Dashboard.name.label('name'),
@@ -273,12 +294,41 @@ def upsert_dashboard(session, es, dashboardUri: str):
         )
         .join(
             models.Organization,
-            models.Dashboard.organizationUri == models.Dashboard.organizationUri,
+            models.Dashboard.organizationUri == models.Organization.organizationUri,
         )
         .join(
             models.Environment,
             models.Dashboard.environmentUri == models.Environment.environmentUri,
         )
+    )
+
+
+def dashboard_doc(dashboard, glossary, count_upvotes):
+    return {
+        'name': dashboard.name,
+        'admins': dashboard.admins,
+        'owner': dashboard.owner,
+        'label': dashboard.label,
+        'resourceKind': 'dashboard',
+        'description': dashboard.description,
+        'tags': [f.replace('-', '') for f in dashboard.tags or []],
+        'topics': [],
+        'region': dashboard.region.replace('-', ''),
+        'environmentUri': dashboard.envUri,
+        'environmentName': dashboard.envName,
+        'organizationUri': dashboard.orgUri,
+        'organizationName': dashboard.orgName,
+        'created': dashboard.created,
+        'updated': dashboard.updated,
+        'deleted': dashboard.deleted,
+        'glossary': glossary,
+        'upvotes': count_upvotes,
+    }
+
+
+def upsert_dashboard(session, es, dashboardUri: str):
+    dashboard = (
+        dashboard_query(session)
         .filter(models.Dashboard.dashboardUri == dashboardUri)
         .first()
     )
@@ -291,26 +341,7 @@ def upsert_dashboard(session, es, dashboardUri: str):
             es=es,
             index='dataall-index',
             id=dashboardUri,
-            doc={
-                'name': dashboard.name,
-                'admins': dashboard.admins,
-                'owner': dashboard.owner,
-                'label': dashboard.label,
-                'resourceKind': 'dashboard',
-                'description': dashboard.description,
-                'tags': [f.replace('-', '') for f in dashboard.tags or []],
-                'topics': [],
-                'region': dashboard.region.replace('-', ''),
-                'environmentUri': dashboard.envUri,
-                'environmentName': dashboard.envName,
-                'organizationUri': dashboard.orgUri,
-                'organizationName': dashboard.orgName,
-                'created': dashboard.created,
-                'updated': dashboard.updated,
-                'deleted': dashboard.deleted,
-                'glossary': glossary,
-                'upvotes': count_upvotes,
-            },
+            doc=dashboard_doc(dashboard, glossary, count_upvotes),
         )
     return dashboard
 
@@ -1,5 +1,6 @@
 import logging
 from datetime import datetime
+from time import perf_counter
 
 log = logging.getLogger(__name__)
 
@@ -13,3 +14,61 @@ def upsert(es, index, id, doc):
     else:
         log.error(f'ES config is missing doc {doc} for id {id} was not indexed')
         return False
+
+
+def bulk_upsert(es, index, docs, chunk_size=500):
+    """
+    Indexes an iterable of (id, doc) through the _bulk API, chunk_size
+    documents per request. Returns the number of indexed and failed documents.
+    """
+    stats = {'indexed': 0, 'failed': 0, 'chunks': 0}
+    if not es:
+        log.error(f'ES config is missing, bulk of index {index} was not indexed')
+        return stats
+    chunk = []
+    for doc_id, doc in docs:
+        doc['_indexed'] = datetime.now()
+        chunk.append([{'index': {'_index': index, '_id': doc_id}}, doc])
+        if len(chunk) >= chunk_size:
+            _send_chunk(es, chunk, stats)
+            chunk = []
+    if chunk:
+        _send_chunk(es, chunk, stats)
+    log.info(
+        f'Bulk indexed {stats["indexed"]} docs in {stats["chunks"]} chunks '
+        f'with {stats["failed"]} failures'
+    )
+    return stats
+
+
+def bulk_delete(es, index, ids, chunk_size=500):
+    """Deletes the documents ids through the _bulk API, missing documents are ignored"""
+    stats = {'indexed': 0, 'failed': 0, 'chunks': 0}
+    if not es:
+        log.error(f'ES config is missing, bulk of index {index} was not deleted')
+        return stats
+    actions = [[{'delete': {'_index': index, '_id': doc_id}}] for doc_id in ids]
+    for i in range(0, len(actions), chunk_size):
+        _send_chunk(es, actions[i : i + chunk_size], stats)
+    log.info(f'Bulk deleted {stats["indexed"]} docs with {stats["failed"]} failures')
+    return stats
+
+
+def _send_chunk(es, chunk, stats):
+    body = [line for action in chunk for line in action]
+    start = perf_counter()
+    res = es.bulk(body=body)
+    elapsed = perf_counter() - start
+    results = [list(item.values())[0] for item in res.get('items', [])]
+    failed = [
+        r for r in results if r.get('error') and r.get('result') != 'not_found'
+    ]
+    stats['chunks'] += 1
+    stats['failed'] += len(failed)
+    stats['indexed'] += len(chunk) - len(failed)
+    log.info(
+        f'Chunk {stats["chunks"]}: {len(chunk)} docs in {elapsed:.3f}s '
+        f'({len(chunk) / elapsed if elapsed else 0:.0f} docs/s), {len(failed)} failed'
+    )
+    for item in failed:
+        log.error(f'Failed to index doc {item.get("_id")}: {item.get("error")}')
@@ -1,11 +1,12 @@
 import logging
 import os
 import sys
+from datetime import datetime, timedelta
 
 from .. import db
 from ..db import get_engine, exceptions
 from ..db import models
-from ..searchproxy import indexers
+from ..searchproxy import indexers, bulk_indexers
 from ..searchproxy.connect import (
     connect,
 )
@@ -17,13 +18,19 @@ if not root.hasHandlers():
     root.addHandler(logging.StreamHandler(sys.stdout))
 log = logging.getLogger(__name__)
 
+INDEXING_TASK_ACTION = 'catalog.indexer'
+RECONCILIATION_INTERVAL = timedelta(hours=24)
+WATERMARK_OVERLAP = timedelta(minutes=5)
 
-def index_objects(engine, es):
+
+def index_objects(engine, es, bulk=False, chunk_size=500):
     try:
         if not es:
             raise exceptions.AWSResourceNotFound(
                 action='CATALOG_INDEXER_TASK', message='ES configuration not found'
             )
+        if bulk:
+            return bulk_index_objects(engine, es, chunk_size)
         indexed_objects_counter = 0
         with engine.scoped_session() as session:
 
@@ -55,8 +62,100 @@ def index_objects(engine, es):
         raise e
 
 
+def bulk_index_objects(engine, es, chunk_size):
+    with engine.scoped_session() as session:
+        stats = bulk_indexers.bulk_index_catalog(session, es, chunk_size=chunk_size)
+    indexed_objects_counter = sum(s['indexed'] for s in stats.values())
+    failed_objects_counter = sum(s['failed'] for s in stats.values())
+    log.info(
+        f'Successfully indexed {indexed_objects_counter} objects, '
+        f'{failed_objects_counter} failed'
+    )
+    if failed_objects_counter:
+        raise Exception(f'Failed to index {failed_objects_counter} objects')
+    return indexed_objects_counter
+
+
+def get_last_indexing_run(session, mode=None) -> models.Task:
+    query = session.query(models.Task).filter(
+        models.Task.action == INDEXING_TASK_ACTION,
+        models.Task.status == 'completed',
+    )
+    if mode:
+        query = query.filter(models.Task.payload['mode'].astext == mode)
+    return query.order_by(models.Task.payload['watermark'].astext.desc()).first()
+
+
+def incremental_index_objects(
+    engine, es, chunk_size=500, reconciliation_interval=RECONCILIATION_INTERVAL
+):
+    """
+    Indexes the objects changed since the watermark of the last run, which is
+    stored as a completed Task. A full indexing that also deletes the stale
+    documents runs instead when the last one is older than the
+    reconciliation interval.
+    """
+    try:
+        if not es:
+            raise exceptions.AWSResourceNotFound(
+                action='CATALOG_INDEXER_TASK', message='ES configuration not found'
+            )
+        watermark = datetime.now()
+        with engine.scoped_session() as session:
+            last_run = get_last_indexing_run(session)
+            last_full_run = get_last_indexing_run(session, mode='full')
+            if not last_full_run or watermark - datetime.fromisoformat(
+                last_full_run.payload['watermark']
+            ) > reconciliation_interval:
+                mode = 'full'
+                stats = bulk_indexers.bulk_index_catalog(
+                    session, es, chunk_size=chunk_size, reconcile=True
+                )
+            else:
+                mode = 'incremental'
+                since = (
+                    datetime.fromisoformat(last_run.payload['watermark'])
+                    - WATERMARK_OVERLAP
+                )
+                log.info(f'Indexing objects changed since {since}')
+                stats = bulk_indexers.incremental_index_catalog(
+                    session, es, since, chunk_size=chunk_size
+                )
+            failed_objects_counter = sum(s['failed'] for s in stats.values())
+            session.add(
+                models.Task(
+                    targetUri='catalog',
+                    action=INDEXING_TASK_ACTION,
+                    status='failed' if failed_objects_counter else 'completed',
+                    payload={'mode': mode, 'watermark': watermark.isoformat()},
+                    response=stats,
+                )
+            )
+        log.info(f'Catalog {mode} indexing done: {stats}')
+        if failed_objects_counter:
+            raise Exception(f'Failed to index {failed_objects_counter} objects')
+        return stats
+    except Exception as e:
+        AlarmService().trigger_catalog_indexing_failure_alarm(error=str(e))
+        raise e
+
+
 if __name__ == '__main__':
     ENVNAME = os.environ.get('envname', 'local')
     ENGINE = get_engine(envname=ENVNAME)
     ES = connect(envname=ENVNAME)
-    index_objects(engine=ENGINE, es=ES)
+    MODE = os.environ.get('INDEXING_MODE', 'incremental')
+    CHUNK_SIZE = int(os.environ.get('INDEXING_CHUNK_SIZE', 500))
+    if MODE == 'incremental':
+        incremental_index_objects(
+            engine=ENGINE,
+            es=ES,
+            chunk_size=CHUNK_SIZE,
+            reconciliation_interval=timedelta(
+                hours=int(os.environ.get('INDEXING_RECONCILIATION_HOURS', 24))
+            ),
+        )
+    else:
+        index_objects(
+            engine=ENGINE, es=ES, bulk=MODE == 'bulk', chunk_size=CHUNK_SIZE
+        )
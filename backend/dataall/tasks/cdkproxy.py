@@ -18,6 +18,11 @@ if __name__ == '__main__':
     stack_uri = os.getenv('stackUri')
     logger.info(f'Starting deployment task for stack : {stack_uri}')
 
-    deploy_cdk_stack(engine=engine, stackid=stack_uri, app_path='../cdkproxy/app.py')
+    outcome = deploy_cdk_stack(
+        engine=engine,
+        stackid=stack_uri,
+        app_path='../cdkproxy/app.py',
+        force=os.getenv('forceDeploy', 'false').lower() == 'true',
+    )
 
-    logger.info('Deployment task finished successfully')
+    logger.info(f'Deployment task finished successfully: {outcome}')
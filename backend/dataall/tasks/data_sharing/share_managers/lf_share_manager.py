@@ -297,35 +297,34 @@ class LFShareManager:
             )
             return True
 
-        for principal in principals:
-            logger.info(
-                f'Revoking resource link access '
-                f'on {self.target_environment.AwsAccountId}/{self.shared_db_name}/{table.GlueTableName} '
-                f'for principal {principal}'
-
-            )
-            LakeFormation.batch_revoke_permissions(
-                SessionHelper.remote_session(self.target_environment.AwsAccountId).client(
-                    'lakeformation', region_name=self.target_environment.region
-                ),
-                self.target_environment.AwsAccountId,
-                [
-                    {
-                        'Id': str(uuid.uuid4()),
-                        'Principal': {
-                            'DataLakePrincipalIdentifier': principal
-                        },
-                        'Resource': {
-                            'Table': {
-                                'DatabaseName': self.shared_db_name,
-                                'Name': table.GlueTableName,
-                                'CatalogId': self.target_environment.AwsAccountId,
-                            }
-                        },
-                        'Permissions': ['DESCRIBE'],
-                    }
-                ],
-            )
+        logger.info(
+            f'Revoking resource link access '
+            f'on {self.target_environment.AwsAccountId}/{self.shared_db_name}/{table.GlueTableName} '
+            f'for principals {principals}'
+        )
+        LakeFormation.batch_revoke_permissions(
+            SessionHelper.remote_session(self.target_environment.AwsAccountId).client(
+                'lakeformation', region_name=self.target_environment.region
+            ),
+            self.target_environment.AwsAccountId,
+            [
+                {
+                    'Id': str(uuid.uuid4()),
+                    'Principal': {
+                        'DataLakePrincipalIdentifier': principal
+                    },
+                    'Resource': {
+                        'Table': {
+                            'DatabaseName': self.shared_db_name,
+                            'Name': table.GlueTableName,
+                            'CatalogId': self.target_environment.AwsAccountId,
+                        }
+                    },
+                    'Permissions': ['DESCRIBE'],
+                }
+                for principal in principals
+            ],
+        )
         return True
 
     def revoke_source_table_access(self, table, principals: [str]):
@@ -477,9 +476,9 @@ class LFShareManager:
                     'PermissionsWithGrantOption': ['DESCRIBE', 'SELECT'],
                 }
             )
-            LakeFormation.batch_revoke_permissions(
-                client, self.source_environment.AwsAccountId, revoke_entries
-            )
+        LakeFormation.batch_revoke_permissions(
+            client, self.source_environment.AwsAccountId, revoke_entries
+        )
         return revoke_entries
 
     def delete_ram_resource_shares(self, resource_arn: str) -> [dict]:
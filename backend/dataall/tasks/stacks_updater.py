@@ -2,6 +2,7 @@ import logging
 import os
 import sys
 import time
+from collections import deque
 
 from .. import db
 from ..db import models
@@ -17,6 +18,10 @@ log = logging.getLogger(__name__)
 
 RETRIES = 30
 SLEEP_TIME = 30
+MAX_DEPLOYMENTS = 8
+POLL_INTERVAL = 5
+MAX_POLL_INTERVAL = 60
+DEPLOYMENT_TIMEOUT = RETRIES * SLEEP_TIME
 
 
 def update_stacks(engine, envname):
@@ -61,7 +66,190 @@ def update_stack(session, envname, target_uri, wait=False):
         )
 
 
+def update_stacks_concurrently(
+    engine,
+    envname,
+    max_deployments=MAX_DEPLOYMENTS,
+    poll_interval=POLL_INTERVAL,
+    max_poll_interval=MAX_POLL_INTERVAL,
+    timeout=DEPLOYMENT_TIMEOUT,
+    force=False,
+):
+    """
+    Updates the stacks of the environments and datasets with at most
+    max_deployments cdkproxy ECS tasks running at a time.
+    The datasets of an environment are deployed once its own stack update
+    is done, the others do not wait for it. Environments are started first
+    as they gate the most work.
+    The running tasks are described together in one call, polled with an
+    interval doubling up to max_poll_interval while none of them completes.
+    A task not stopped after timeout seconds is reported and its dependents
+    are started anyway, as update_stack does after its retries. It still
+    counts against max_deployments until ECS reports it stopped.
+    Stacks whose templates did not change are not deployed by cdkproxy
+    unless force is set, they are reported as unchanged.
+    Returns one report entry per stack.
+    """
+    with engine.scoped_session() as session:
+        environments = [
+            e.environmentUri
+            for e in db.api.Environment.list_all_active_environments(session)
+        ]
+        datasets = [
+            (d.datasetUri, d.environmentUri)
+            for d in db.api.Dataset.list_all_active_datasets(session)
+        ]
+    log.info(
+        f'Found {len(environments)} environments and {len(datasets)} datasets, '
+        f'updating their stacks with {max_deployments} concurrent deployments...'
+    )
+    cluster_name = Parameter().get_parameter(env=envname, path='ecs/cluster/name')
+
+    ready = deque(environments)
+    dependents = {uri: [] for uri in environments}
+    for dataset_uri, environment_uri in datasets:
+        if environment_uri in dependents:
+            dependents[environment_uri].append(dataset_uri)
+        else:
+            ready.append(dataset_uri)
+
+    report = []
+    running = {}
+    timed_out = {}
+    start = time.perf_counter()
+
+    def finish(entry, status, error=None):
+        entry['status'] = status
+        entry['error'] = error
+        entry['duration'] = round(time.perf_counter() - entry.pop('started'), 3)
+        log.info(f'Stack update report: {entry}')
+        report.append(entry)
+        ready.extend(dependents.pop(entry['targetUri'], []))
+
+    interval = poll_interval
+    while ready or running:
+        while ready and len(running) + len(timed_out) < max(1, max_deployments):
+            entry = start_stack_update(engine, cluster_name, ready.popleft(), force)
+            if entry['EcsTaskArn']:
+                running[entry['EcsTaskArn']] = entry
+            else:
+                finish(entry, 'failed', entry.pop('error'))
+        if not running and not timed_out:
+            continue
+
+        time.sleep(interval)
+        tasks = Ecs.describe_tasks(cluster_name, list(running) + list(timed_out))
+        completed = 0
+        for task_arn, stack_uri in list(timed_out.items()):
+            task = tasks.get(task_arn)
+            if task is None or task.get('lastStatus') == 'STOPPED':
+                log.info(f'Timed out update for {stack_uri} stopped')
+                del timed_out[task_arn]
+                completed += 1
+        for task_arn, entry in list(running.items()):
+            task = tasks.get(task_arn)
+            if task is None or task.get('lastStatus') == 'STOPPED':
+                error = get_task_error(task)
+                finish(entry, 'failed' if error else 'updated', error)
+            elif time.perf_counter() - entry['started'] > timeout:
+                log.info(
+                    f'Update for {entry["stackUri"]} not complete after {timeout}s, continuing task...'
+                )
+                timed_out[task_arn] = entry['stackUri']
+                finish(entry, 'timeout')
+            else:
+                continue
+            del running[task_arn]
+            completed += 1
+        interval = (
+            poll_interval if completed else min(interval * 2, max_poll_interval)
+        )
+
+    elapsed = time.perf_counter() - start
+    mark_unchanged_stacks(engine, report)
+    outcomes = {}
+    for entry in report:
+        outcomes[entry['status']] = outcomes.get(entry['status'], 0) + 1
+    log.info(
+        f'Updated {len(report)} stacks in {elapsed:.1f}s '
+        f'({len(report) / max(elapsed, 1e-3) * 60:.1f} stacks/min): {outcomes}'
+    )
+    return report
+
+
+def start_stack_update(engine, cluster_name, target_uri, force=False):
+    """
+    Runs the cdkproxy task of the stack of the target, or follows its task
+    when an update is already running. Returns its report entry.
+    """
+    entry = {
+        'targetUri': target_uri,
+        'stackUri': None,
+        'EcsTaskArn': None,
+        'error': None,
+        'started': time.perf_counter(),
+    }
+    with engine.scoped_session() as session:
+        try:
+            stack: models.Stack = db.api.Stack.get_stack_by_target_uri(
+                session, target_uri=target_uri
+            )
+            entry['stackUri'] = stack.stackUri
+            running_tasks = Ecs.get_running_task_arns(
+                cluster_name=cluster_name, started_by=f'awsworker-{stack.stackUri}'
+            )
+            if running_tasks:
+                log.info(
+                    f'Stack update is already running... Following stack {stack.name}//{stack.stackUri}'
+                )
+                entry['EcsTaskArn'] = running_tasks[0]
+            else:
+                # set by cdkproxy when it skips the deployment
+                stack.deploySkipped = False
+                stack.EcsTaskArn = Ecs.run_cdkproxy_task(
+                    stack_uri=stack.stackUri, force=force
+                )
+                entry['EcsTaskArn'] = stack.EcsTaskArn
+        except Exception as e:
+            log.error(f'Failed to start stack update of {target_uri} due to: {e}')
+            entry['error'] = str(e)
+    return entry
+
+
+def mark_unchanged_stacks(engine, report):
+    """Reports the updated stacks whose deployment was skipped as unchanged"""
+    updated = {e['stackUri']: e for e in report if e['status'] == 'updated'}
+    if not updated:
+        return
+    with engine.scoped_session() as session:
+        skipped = session.query(models.Stack.stackUri).filter(
+            models.Stack.stackUri.in_(updated.keys()),
+            models.Stack.deploySkipped.is_(True),
+        )
+        for (stack_uri,) in skipped:
+            updated[stack_uri]['status'] = 'unchanged'
+
+
+def get_task_error(task):
+    """Stop reason of a task whose containers did not all exit with 0"""
+    if task is None:
+        return 'Task not found'
+    if all(c.get('exitCode') == 0 for c in task.get('containers', [])):
+        return None
+    return task.get('stoppedReason') or 'Non zero exit code'
+
+
 if __name__ == '__main__':
     envname = os.environ.get('envname', 'local')
     engine = get_engine(envname=envname)
-    update_stacks(engine=engine, envname=envname)
+    if os.environ.get('STACKS_UPDATE_MODE', 'concurrent') == 'concurrent':
+        update_stacks_concurrently(
+            engine=engine,
+            envname=envname,
+            max_deployments=int(
+                os.environ.get('STACKS_UPDATE_MAX_DEPLOYMENTS', MAX_DEPLOYMENTS)
+            ),
+            force=os.environ.get('STACKS_UPDATE_FORCE', 'false').lower() == 'true',
+        )
+    else:
+        update_stacks(engine=engine, envname=envname)
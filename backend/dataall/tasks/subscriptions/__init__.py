@@ -1,2 +1,2 @@
-from .sqs_poller import poll_queues
+from .sqs_poller import poll_queues, poll_queues_concurrently
 from .subscription_service import SubscriptionService
@@ -0,0 +1,207 @@
+import bisect
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+from datetime import timedelta
+
+from sqlalchemy import or_
+
+from ...db import models
+
+log = logging.getLogger(__name__)
+
+# Rows changed this long before the last refresh are read again, so that
+# rows committed late by another process are not missed
+REFRESH_OVERLAP = timedelta(minutes=5)
+
+PrefixRoute = namedtuple('PrefixRoute', ['message', 'item', 'dataset', 'share_items'])
+
+
+class S3PrefixIndex:
+    """
+    Process wide index of the S3 prefixes of the dataset tables and folders,
+    by model, AWS account and region. Each key holds a sorted list of
+    (S3Prefix, uri), so the items with a prefix starting with the prefix of
+    a producer message are found with one bisection.
+    The index is built with one query per model and then refreshed at most
+    every refresh_interval seconds with the rows created or updated since.
+    """
+
+    MODELS = {
+        models.DatasetTable: models.DatasetTable.tableUri,
+        models.DatasetStorageLocation: models.DatasetStorageLocation.locationUri,
+    }
+
+    def __init__(self, refresh_interval: float = None, clock=time.monotonic):
+        self.refresh_interval = (
+            refresh_interval
+            if refresh_interval is not None
+            else float(os.getenv('SUBSCRIPTIONS_PREFIX_INDEX_REFRESH_INTERVAL', '60'))
+        )
+        self.clock = clock
+        self.prefixes = {}
+        self.entries = {}
+        self.watermark = None
+        self.refreshed = None
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _key(model, account, region):
+        return model.__name__, account, region
+
+    def _remove(self, model, uri):
+        entry = self.entries.pop((model.__name__, uri), None)
+        if entry:
+            key, prefix = entry
+            prefixes = self.prefixes[key]
+            i = bisect.bisect_left(prefixes, (prefix, uri))
+            if i < len(prefixes) and prefixes[i] == (prefix, uri):
+                del prefixes[i]
+
+    def _add(self, model, uri, account, region, prefix):
+        self._remove(model, uri)
+        if not prefix:
+            return
+        key = S3PrefixIndex._key(model, account, region)
+        bisect.insort(self.prefixes.setdefault(key, []), (prefix, uri))
+        self.entries[(model.__name__, uri)] = (key, prefix)
+
+    def _load(self, session, since=None):
+        watermark = self.watermark
+        count = 0
+        for model, uri_column in S3PrefixIndex.MODELS.items():
+            q = session.query(
+                uri_column,
+                model.AWSAccountId,
+                model.region,
+                model.S3Prefix,
+                model.created,
+                model.updated,
+            )
+            if since:
+                q = q.filter(or_(model.created > since, model.updated > since))
+            for uri, account, region, prefix, created, updated in q:
+                self._add(model, uri, account, region, prefix)
+                for changed in (created, updated):
+                    if changed and (watermark is None or changed > watermark):
+                        watermark = changed
+                count += 1
+        self.watermark = watermark
+        self.refreshed = self.clock()
+        return count
+
+    def build(self, session):
+        """Indexes all the tables and folders in one pass"""
+        with self._lock:
+            self.prefixes, self.entries, self.watermark = {}, {}, None
+            count = self._load(session)
+        log.info(f'Built S3 prefix index of {count} tables and folders')
+
+    def refresh(self, session, force=False):
+        """Builds the index, or indexes the rows changed since the last refresh"""
+        with self._lock:
+            if self.refreshed is None:
+                return self.build(session)
+            if not force and self.clock() - self.refreshed < self.refresh_interval:
+                return
+            since = self.watermark - REFRESH_OVERLAP if self.watermark else None
+            count = self._load(session, since)
+        log.info(f'Refreshed S3 prefix index with {count} changed tables and folders')
+
+    def lookup(self, model, prefix, account, region):
+        """Uri of the first item with an S3 prefix starting with the prefix"""
+        if not prefix:
+            return None
+        with self._lock:
+            prefixes = self.prefixes.get(S3PrefixIndex._key(model, account, region))
+            if not prefixes:
+                return None
+            i = bisect.bisect_left(prefixes, (prefix,))
+            if i < len(prefixes) and prefixes[i][0].startswith(prefix):
+                return prefixes[i][1]
+        return None
+
+    def _lookup_rows(self, session, model, messages):
+        """Rows of the model matching the messages, removing deleted items"""
+        uri_column = S3PrefixIndex.MODELS[model]
+        rows = {}
+        while True:
+            uris = {
+                i: self.lookup(
+                    model, m.get('prefix'), m.get('accountid'), m.get('region')
+                )
+                for i, m in enumerate(messages)
+            }
+            missing = {uri for uri in uris.values() if uri and uri not in rows}
+            if missing:
+                rows.update(
+                    {
+                        getattr(row, uri_column.key): row
+                        for row in session.query(model).filter(uri_column.in_(missing))
+                    }
+                )
+            deleted = missing - rows.keys()
+            if not deleted:
+                return {i: rows[uri] for i, uri in uris.items() if uri}
+            with self._lock:
+                for uri in deleted:
+                    self._remove(model, uri)
+
+    def route(self, session, messages):
+        """
+        Routes a batch of producer messages to the tables and folders of their
+        prefix, with their dataset and share items, in a fixed number of queries.
+        Returns the routes in the order of the messages, tables first.
+        """
+        self.refresh(session)
+        tables = self._lookup_rows(session, models.DatasetTable, messages)
+        locations = self._lookup_rows(session, models.DatasetStorageLocation, messages)
+        items = list(tables.values()) + list(locations.values())
+        if not items:
+            return []
+
+        datasets = {
+            dataset.datasetUri: dataset
+            for dataset in session.query(models.Dataset).filter(
+                models.Dataset.datasetUri.in_({item.datasetUri for item in items})
+            )
+        }
+        share_items = {}
+        for share_item in session.query(models.ShareObjectItem).filter(
+            models.ShareObjectItem.itemUri.in_(
+                [t.tableUri for t in tables.values()]
+                + [loc.locationUri for loc in locations.values()]
+            )
+        ):
+            share_items.setdefault(share_item.itemUri, []).append(share_item)
+
+        routes = []
+        for i, message in enumerate(messages):
+            for item, uri in [
+                (tables.get(i), 'tableUri'),
+                (locations.get(i), 'locationUri'),
+            ]:
+                if item is None:
+                    continue
+                dataset = datasets.get(item.datasetUri)
+                if not dataset:
+                    log.error(f'Dataset of {getattr(item, uri)} not found')
+                    continue
+                routes.append(
+                    PrefixRoute(
+                        message,
+                        item,
+                        dataset,
+                        share_items.get(getattr(item, uri), []),
+                    )
+                )
+        return routes
+
+
+prefix_index = S3PrefixIndex()
+
+
+def get_prefix_index() -> S3PrefixIndex:
+    return prefix_index
@@ -2,6 +2,9 @@ import json
 import logging
 import os
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import boto3
 from botocore.exceptions import ClientError
@@ -15,6 +18,10 @@ log = logging.getLogger(__name__)
 ENVNAME = os.getenv('envname', 'local')
 region = os.getenv('AWS_REGION', 'eu-west-1')
 
+MAX_WORKERS = 16
+WAIT_TIME_SECONDS = 1
+MAX_MESSAGES_PER_QUEUE = 100
+
 
 def poll_queues(queues):
     log.debug(f'Received Queues URL: {queues}')
@@ -73,3 +80,144 @@ def poll_queues(queues):
             log.error(f'Failed to get messages from queue {queue} due to: {e}')
 
     return messages
+
+
+class SqsClients:
+    """Pool of SQS clients shared by the poller threads, one per region"""
+
+    def __init__(self):
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def client(self, region):
+        with self._lock:
+            if region not in self._clients:
+                self._clients[region] = boto3.client(
+                    'sqs',
+                    region_name=region,
+                    endpoint_url=f'https://sqs.{region}.amazonaws.com',
+                )
+            return self._clients[region]
+
+
+def extract_message(message):
+    """Producer message published to SNS and delivered in the SQS message body"""
+    return json.loads(json.loads(message['Body']).get('Message'))
+
+
+def delete_messages(sqs, queue, messages):
+    """Deletes the messages with batches of 10, returns the number deleted"""
+    deleted = 0
+    for i in range(0, len(messages), 10):
+        batch = messages[i : i + 10]
+        try:
+            response = sqs.delete_message_batch(
+                QueueUrl=queue['url'],
+                Entries=[
+                    {'Id': str(index), 'ReceiptHandle': message['ReceiptHandle']}
+                    for index, message in enumerate(batch)
+                ],
+            )
+        except ClientError as e:
+            log.error(f'Failed to delete messages from queue {queue} due to: {e}')
+            continue
+        deleted += len(response.get('Successful', []))
+        for failure in response.get('Failed', []):
+            log.error(
+                f"Failed to delete message {failure['Id']} from queue "
+                f"{queue['url']} due to: {failure.get('Message')}"
+            )
+    return deleted
+
+
+def drain_queue(
+    sqs,
+    queue,
+    consume,
+    wait_time_seconds=WAIT_TIME_SECONDS,
+    max_messages=MAX_MESSAGES_PER_QUEUE,
+):
+    """
+    Receives the messages of the queue with long polling until it is empty
+    or max_messages were received. Every batch received is passed to consume
+    and deleted once consumed. Batches that fail to be consumed are left in
+    the queue, to be received again or moved to its dead letter queue.
+    Returns the report entry of the queue.
+    """
+    entry = {'url': queue['url'], 'received': 0, 'consumed': 0, 'deleted': 0}
+    while entry['received'] < max_messages:
+        try:
+            response = sqs.receive_message(
+                QueueUrl=queue['url'],
+                AttributeNames=['SentTimestamp'],
+                MaxNumberOfMessages=min(10, max_messages - entry['received']),
+                MessageAttributeNames=['All'],
+                WaitTimeSeconds=wait_time_seconds,
+            )
+        except ClientError as e:
+            log.error(f'Failed to get messages from queue {queue} due to: {e}')
+            entry['error'] = str(e)
+            break
+        received = response.get('Messages', [])
+        if not received:
+            break
+        entry['received'] += len(received)
+
+        consumed, extracted = [], []
+        for message in received:
+            if not message.get('Body'):
+                continue
+            try:
+                extracted.append(extract_message(message))
+                consumed.append(message)
+            except (ValueError, TypeError, AttributeError) as e:
+                log.error(f'Failed to extract message {message} due to: {e}')
+        if extracted:
+            try:
+                consume(extracted)
+            except Exception as e:
+                log.error(
+                    f"Failed to consume messages of queue {queue['url']} due to: {e}"
+                )
+                entry['error'] = str(e)
+                continue
+        entry['consumed'] += len(extracted)
+        entry['deleted'] += delete_messages(sqs, queue, consumed)
+    return entry
+
+
+def poll_queues_concurrently(
+    queues,
+    consume,
+    max_workers=MAX_WORKERS,
+    wait_time_seconds=WAIT_TIME_SECONDS,
+    max_messages=MAX_MESSAGES_PER_QUEUE,
+    clients: SqsClients = None,
+):
+    """
+    Drains the queues on a pool of max_workers threads, passing the messages
+    to consume as soon as they are received. consume is called from the
+    worker threads. Returns one report entry per queue.
+    """
+    log.debug(f'Received Queues URL: {queues}')
+    clients = clients or SqsClients()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = [
+            executor.submit(
+                drain_queue,
+                clients.client(queue['region']),
+                queue,
+                consume,
+                wait_time_seconds,
+                max_messages,
+            )
+            for queue in queues
+        ]
+        report = [future.result() for future in futures]
+    log.info(
+        f'Polled {len(queues)} queues in {time.perf_counter() - start:.1f}s: '
+        f"{sum(e['consumed'] for e in report)} messages consumed, "
+        f"{len([e for e in report if e.get('error')])} queues failed"
+    )
+    return report
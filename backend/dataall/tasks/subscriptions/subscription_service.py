@@ -12,7 +12,13 @@ from ...aws.handlers.sts import SessionHelper
 from ...aws.handlers.sqs import SqsQueue
 from ...db import get_engine
 from ...db import models
-from ...tasks.subscriptions import poll_queues
+from ...tasks.subscriptions import poll_queues, poll_queues_concurrently
+from ...tasks.subscriptions.prefix_index import get_prefix_index
+from ...tasks.subscriptions.sqs_poller import (
+    MAX_WORKERS,
+    WAIT_TIME_SECONDS,
+    MAX_MESSAGES_PER_QUEUE,
+)
 from ...utils import json_utils
 
 root = logging.getLogger()
@@ -52,14 +58,50 @@ class SubscriptionService:
         log.info(f'Notifying consumers with messages {messages}')
 
         with engine.scoped_session() as session:
+            routes = get_prefix_index().route(session, messages)
 
-            for message in messages:
+        for route in routes:
+            if isinstance(route.item, models.DatasetTable):
+                log.info(
+                    f'Found table {route.item.tableUri}|{route.item.GlueTableName}'
+                    f'|{route.item.S3Prefix} with shared items {route.share_items}'
+                )
+                SubscriptionService.publish_sns_message(
+                    engine,
+                    route.message,
+                    route.dataset,
+                    route.share_items,
+                    route.item.S3Prefix,
+                    table=route.item,
+                )
+            else:
+                log.info(
+                    f'Found location {route.item.locationUri}|{route.item.S3Prefix}'
+                    f' with shared items {route.share_items}'
+                )
+                SubscriptionService.publish_sns_message(
+                    engine,
+                    route.message,
+                    route.dataset,
+                    route.share_items,
+                    route.item.S3Prefix,
+                )
 
-                SubscriptionService.publish_table_update_message(engine, message)
+        return True
 
-                SubscriptionService.publish_location_update_message(session, message)
+    @staticmethod
+    def poll_and_notify_consumers(engine, queues, **kwargs):
+        """
+        Polls the queues concurrently and notifies the consumers of every
+        batch of messages as soon as it is received, each batch in its own
+        session. Returns the report of poll_queues_concurrently.
+        """
 
-        return True
+        def consume(messages):
+            with engine.request_scope():
+                SubscriptionService.notify_consumers(engine, messages)
+
+        return poll_queues_concurrently(queues, consume, **kwargs)
 
     @staticmethod
     def publish_table_update_message(engine, message):
@@ -331,6 +373,23 @@ if __name__ == '__main__':
     log.info('Polling datasets updates...')
     service = SubscriptionService()
     queues = service.get_queues(service.get_environments(ENGINE))
-    messages = poll_queues(queues)
-    service.notify_consumers(ENGINE, messages)
+    with ENGINE.scoped_session() as session:
+        get_prefix_index().build(session)
+    if os.environ.get('SUBSCRIPTIONS_POLL_MODE', 'concurrent') == 'concurrent':
+        service.poll_and_notify_consumers(
+            ENGINE,
+            queues,
+            max_workers=int(os.environ.get('SUBSCRIPTIONS_MAX_WORKERS', MAX_WORKERS)),
+            wait_time_seconds=int(
+                os.environ.get('SUBSCRIPTIONS_WAIT_TIME_SECONDS', WAIT_TIME_SECONDS)
+            ),
+            max_messages=int(
+                os.environ.get(
+                    'SUBSCRIPTIONS_MAX_MESSAGES_PER_QUEUE', MAX_MESSAGES_PER_QUEUE
+                )
+            ),
+        )
+    else:
+        messages = poll_queues(queues)
+        service.notify_consumers(ENGINE, messages)
     log.info('Datasets updates shared successfully')
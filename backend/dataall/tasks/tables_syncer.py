@@ -1,10 +1,16 @@
 import logging
 import os
+import random
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from operator import and_
 
+from botocore.exceptions import ClientError
+
 from .. import db
-from ..aws.handlers.glue import Glue
+from ..aws.handlers.glue import Glue, THROTTLING_ERROR_CODES
 from ..aws.handlers.sts import SessionHelper
 from ..db import get_engine
 from ..db import models
@@ -20,6 +26,11 @@ if not root.hasHandlers():
     root.addHandler(logging.StreamHandler(sys.stdout))
 log = logging.getLogger(__name__)
 
+MAX_WORKERS = 16
+MAX_PER_ACCOUNT = 2
+MAX_ATTEMPTS = 5
+BACKOFF_BASE = 1.0
+
 
 def sync_tables(engine, es=None):
     with engine.scoped_session() as session:
@@ -30,72 +41,178 @@ def sync_tables(engine, es=None):
         log.info(f'Found {len(all_datasets)} datasets for tables sync')
         dataset: models.Dataset
         for dataset in all_datasets:
-            log.info(
-                f'Synchronizing dataset {dataset.name}|{dataset.datasetUri} tables'
-            )
-            env: models.Environment = (
-                session.query(models.Environment)
-                .filter(
-                    and_(
-                        models.Environment.environmentUri == dataset.environmentUri,
-                        models.Environment.deleted.is_(None),
-                    )
+            try:
+                processed_tables.extend(
+                    sync_dataset_tables(session, dataset, es) or []
                 )
-                .first()
-            )
-            env_group: models.EnvironmentGroup = (
-                db.api.Environment.get_environment_group(
-                    session, dataset.SamlAdminGroupName, env.environmentUri
+            except Exception as e:
+                log.error(
+                    f'Failed to sync tables for dataset '
+                    f'{dataset.AwsAccountId}/{dataset.GlueDatabaseName} '
+                    f'due to: {e}'
                 )
+                AlarmService().trigger_dataset_sync_failure_alarm(dataset, str(e))
+        return processed_tables
+
+
+def sync_dataset_tables(session, dataset: models.Dataset, es=None):
+    """
+    Syncs the tables of one dataset with its Glue database and grants the
+    pivot role and the dataset admins role all permissions on them.
+    Returns the tables of the dataset, or None if its environment is invalid.
+    """
+    log.info(f'Synchronizing dataset {dataset.name}|{dataset.datasetUri} tables')
+    env: models.Environment = (
+        session.query(models.Environment)
+        .filter(
+            and_(
+                models.Environment.environmentUri == dataset.environmentUri,
+                models.Environment.deleted.is_(None),
             )
+        )
+        .first()
+    )
+    if not env or not is_assumable_pivot_role(env):
+        log.info(f'Dataset {dataset.GlueDatabaseName} has an invalid environment')
+        return None
+    env_group: models.EnvironmentGroup = db.api.Environment.get_environment_group(
+        session, dataset.SamlAdminGroupName, env.environmentUri
+    )
+
+    tables = Glue.list_glue_database_tables(
+        dataset.AwsAccountId, dataset.GlueDatabaseName, dataset.region
+    )
+    log.info(f'Found {len(tables)} tables on Glue database {dataset.GlueDatabaseName}')
+
+    db.api.DatasetTable.sync(session, dataset.datasetUri, glue_tables=tables)
+
+    tables = (
+        session.query(models.DatasetTable)
+        .filter(models.DatasetTable.datasetUri == dataset.datasetUri)
+        .all()
+    )
+
+    log.info('Updating tables permissions on Lake Formation...')
+    principals = [
+        SessionHelper.get_delegation_role_arn(env.AwsAccountId),
+        env_group.environmentIAMRoleArn,
+    ]
+    Glue.grant_principals_all_tables_permissions(tables, principals=principals)
+
+    if es:
+        indexers.upsert_dataset_tables(session, es, dataset.datasetUri)
+    return tables
+
+
+def is_throttling_error(error: Exception):
+    return (
+        isinstance(error, ClientError)
+        and error.response.get('Error', {}).get('Code') in THROTTLING_ERROR_CODES
+    )
+
+
+def with_backoff(fn, max_attempts=MAX_ATTEMPTS, base=BACKOFF_BASE):
+    """Calls fn, retrying with exponential backoff and jitter while AWS throttles it"""
+    for attempt in range(1, max_attempts + 1):
+        try:
+            return fn()
+        except Exception as e:
+            if attempt == max_attempts or not is_throttling_error(e):
+                raise e
+            delay = base * 2 ** (attempt - 1) * (1 + random.random())
+            log.warning(f'Throttled by AWS ({e}), retrying in {delay:.1f}s')
+            time.sleep(delay)
+
+
+def sync_tables_concurrently(
+    engine,
+    es=None,
+    max_workers=MAX_WORKERS,
+    max_per_account=MAX_PER_ACCOUNT,
+    backoff_base=BACKOFF_BASE,
+):
+    """
+    Syncs the datasets on a pool of max_workers threads, with at most
+    max_per_account datasets of the same AWS account synced at a time.
+    Each account gets up to max_per_account lanes syncing its datasets one
+    after the other, and the lanes of the accounts with the most datasets
+    are started first, so the run takes about as long as its slowest account.
+    Every dataset is synced in its own session. The assumed role sessions
+    are shared per account by SessionHelper.remote_session.
+    Returns one report entry per dataset.
+    """
+    with engine.scoped_session() as session:
+        datasets = [
+            (d.datasetUri, d.AwsAccountId)
+            for d in db.api.Dataset.list_all_active_datasets(session)
+        ]
+    log.info(f'Found {len(datasets)} datasets for concurrent tables sync')
+
+    accounts = {}
+    for dataset_uri, account_id in datasets:
+        accounts.setdefault(account_id, []).append(dataset_uri)
+    lanes = []
+    for account_id, uris in sorted(accounts.items(), key=lambda a: -len(a[1])):
+        for lane in range(min(max_per_account, len(uris))):
+            lanes.append(uris[lane::max_per_account])
+    lanes.sort(key=len, reverse=True)
+
+    report = []
+    report_lock = threading.Lock()
+
+    def sync_lane(uris):
+        for dataset_uri in uris:
+            entry = sync_dataset(engine, dataset_uri, es, backoff_base)
+            with report_lock:
+                report.append(entry)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        for future in [executor.submit(sync_lane, lane) for lane in lanes]:
+            future.result()
+
+    outcomes = {}
+    for entry in report:
+        outcomes[entry['status']] = outcomes.get(entry['status'], 0) + 1
+    log.info(
+        f'Synced {len(report)} datasets of {len(accounts)} accounts in '
+        f'{time.perf_counter() - start:.1f}s: {outcomes}'
+    )
+    return report
+
+
+def sync_dataset(engine, dataset_uri, es=None, backoff_base=BACKOFF_BASE):
+    """Syncs one dataset in its own session and returns its report entry"""
+    start = time.perf_counter()
+    entry = {'datasetUri': dataset_uri, 'tables': 0, 'error': None}
+    with engine.request_scope():
+        with engine.scoped_session() as session:
+            dataset = session.query(models.Dataset).get(dataset_uri)
+            entry['AwsAccountId'] = dataset.AwsAccountId
+            entry['GlueDatabaseName'] = dataset.GlueDatabaseName
             try:
-                if not env or not is_assumable_pivot_role(env):
-                    log.info(
-                        f'Dataset {dataset.GlueDatabaseName} has an invalid environment'
-                    )
+                tables = with_backoff(
+                    lambda: sync_dataset_tables(session, dataset, es),
+                    base=backoff_base,
+                )
+                if tables is None:
+                    entry['status'] = 'skipped'
                 else:
-
-                    tables = Glue.list_glue_database_tables(
-                        dataset.AwsAccountId, dataset.GlueDatabaseName, dataset.region
-                    )
-
-                    log.info(
-                        f'Found {len(tables)} tables on Glue database {dataset.GlueDatabaseName}'
-                    )
-
-                    db.api.DatasetTable.sync(
-                        session, dataset.datasetUri, glue_tables=tables
-                    )
-
-                    tables = (
-                        session.query(models.DatasetTable)
-                        .filter(models.DatasetTable.datasetUri == dataset.datasetUri)
-                        .all()
-                    )
-
-                    log.info('Updating tables permissions on Lake Formation...')
-
-                    for table in tables:
-                        Glue.grant_principals_all_table_permissions(
-                            table,
-                            principals=[
-                                SessionHelper.get_delegation_role_arn(env.AwsAccountId),
-                                env_group.environmentIAMRoleArn,
-                            ],
-                        )
-
-                    processed_tables.extend(tables)
-
-                    if es:
-                        indexers.upsert_dataset_tables(session, es, dataset.datasetUri)
+                    entry['status'] = 'synced'
+                    entry['tables'] = len(tables)
             except Exception as e:
+                session.rollback()
                 log.error(
                     f'Failed to sync tables for dataset '
                     f'{dataset.AwsAccountId}/{dataset.GlueDatabaseName} '
                     f'due to: {e}'
                 )
+                entry['status'] = 'failed'
+                entry['error'] = str(e)
                 AlarmService().trigger_dataset_sync_failure_alarm(dataset, str(e))
-        return processed_tables
+    entry['duration'] = round(time.perf_counter() - start, 3)
+    log.info(f'Dataset tables sync report: {entry}')
+    return entry
 
 
 def is_assumable_pivot_role(env: models.Environment):
@@ -112,4 +229,14 @@ if __name__ == '__main__':
     ENVNAME = os.environ.get('envname', 'local')
     ENGINE = get_engine(envname=ENVNAME)
     ES = connect(envname=ENVNAME)
-    sync_tables(engine=ENGINE, es=ES)
+    if os.environ.get('TABLES_SYNC_MODE', 'concurrent') == 'concurrent':
+        sync_tables_concurrently(
+            engine=ENGINE,
+            es=ES,
+            max_workers=int(os.environ.get('TABLES_SYNC_MAX_WORKERS', MAX_WORKERS)),
+            max_per_account=int(
+                os.environ.get('TABLES_SYNC_MAX_PER_ACCOUNT', MAX_PER_ACCOUNT)
+            ),
+        )
+    else:
+        sync_tables(engine=ENGINE, es=ES)
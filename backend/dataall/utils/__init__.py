@@ -1,3 +1,4 @@
 from .parameter import Parameter
+from .parameter_cache import ParameterCache, get_parameter_cache
 from .secrets_manager import Secrets
 from .slugify import slugify
@@ -5,6 +5,8 @@ import os
 import boto3
 from botocore.exceptions import ClientError
 
+from .parameter_cache import parameter_cache, KNOWN_PATHS
+
 log = logging.getLogger('utils:Parameter')
 
 
@@ -13,8 +15,7 @@ class Parameter:
 
     @classmethod
     def ssm(cls):
-        client = boto3.client('ssm', region_name=os.getenv('AWS_REGION', 'eu-west-1'))
-        return client
+        return parameter_cache.client('ssm')
 
     @classmethod
     def get_parameter_name(cls, env, path=''):
@@ -34,26 +35,36 @@ class Parameter:
             Type='String',
             Overwrite=True,
         )
+        parameter_cache.invalidate(pname)
         return Parameter.get_parameter(env, path)
 
     @classmethod
     def get_parameter(cls, env, path=''):
         pname = cls.get_parameter_name(env, path)
-        ssm = cls.ssm()
+        prefetch = (
+            [cls.get_parameter_name(env, p) for p in KNOWN_PATHS]
+            if path.strip('/') in KNOWN_PATHS
+            else None
+        )
         try:
-            param_value = ssm.get_parameter(Name=pname)['Parameter']['Value']
-            return param_value
-        except ClientError as e:
-            if e.response['Error']['Code'] == 'ParameterNotFound':
+            param_value = parameter_cache.get_parameter(pname, prefetch=prefetch)
+            if param_value is None:
                 log.warning(
                     'Parameter `{}` not found for env `{}`, defaulting to None'.format(
                         path, env
                     )
                 )
-                return None
-            else:
-                log.error('Error trying to retrieve parameter from SSM')
-                raise e
+            return param_value
+        except ClientError as e:
+            log.error('Error trying to retrieve parameter from SSM')
+            raise e
+
+    @classmethod
+    def invalidate(cls, env=None, path=''):
+        """Drops the cached value of one parameter, or of all of them"""
+        parameter_cache.invalidate(
+            cls.get_parameter_name(env, path) if env else None
+        )
 
     @classmethod
     def clean_environment(cls, env):
@@ -61,6 +72,7 @@ class Parameter:
         for p in params[env]:
             pname = Parameter.get_parameter_name(env=env, path=p['Name'])
             cls.ssm().delete_parameter(Name=pname)
+            parameter_cache.invalidate(pname)
 
     @classmethod
     def get_parameters(cls, env, prefix=None):
@@ -0,0 +1,123 @@
+import logging
+import os
+import threading
+import time
+
+import boto3
+from botocore.exceptions import ClientError
+
+log = logging.getLogger('utils:ParameterCache')
+
+# Parameters read on hot paths, fetched together on the first miss of any of them
+KNOWN_PATHS = [
+    'sqs/queue_url',
+    'pivotRole/externalId',
+    'pivotRole/pivotRoleName',
+    'ecs/cluster/name',
+    'ecs/private_subnets',
+    'ecs/security_groups',
+    'ecs/task_def_arn/cdkproxy',
+    'ecs/container/cdkproxy',
+    'resourcePrefix',
+    'elasticsearch/endpoint',
+    'elasticsearch/service',
+]
+
+# Maximum number of names accepted by ssm:GetParameters
+GET_PARAMETERS_BATCH_SIZE = 10
+
+
+class ParameterCache:
+    """
+    Process wide TTL cache of SSM parameters and Secrets Manager secrets,
+    holding one boto3 client per service and region.
+    Parameters that do not exist are cached as None.
+    """
+
+    def __init__(self, ttl: float = None, clock=time.monotonic):
+        self.ttl = (
+            ttl if ttl is not None else float(os.getenv('PARAMETER_CACHE_TTL', '300'))
+        )
+        self.clock = clock
+        self._values = {}
+        self._clients = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def client(self, service, region=None):
+        region = region or os.getenv('AWS_REGION', 'eu-west-1')
+        with self._lock:
+            if (service, region) not in self._clients:
+                self._clients[(service, region)] = boto3.client(
+                    service, region_name=region
+                )
+            return self._clients[(service, region)]
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._values.get(key)
+            if entry and entry[0] > self.clock():
+                self.hits += 1
+                return True, entry[1]
+            self.misses += 1
+            return False, None
+
+    def _set(self, key, value):
+        with self._lock:
+            self._values[key] = (self.clock() + self.ttl, value)
+
+    def get_parameter(self, name, prefetch=None):
+        """
+        Value of the parameter, or None if it does not exist.
+        On a miss, the names in prefetch are fetched in the same calls.
+        """
+        found, value = self._get(('ssm', name))
+        if found:
+            return value
+        self.prefetch([name] + [p for p in prefetch or [] if p != name])
+        return self._get(('ssm', name))[1]
+
+    def prefetch(self, names):
+        """Fetches the parameters with batched ssm:GetParameters calls"""
+        ssm = self.client('ssm')
+        names = list(dict.fromkeys(names))
+        for i in range(0, len(names), GET_PARAMETERS_BATCH_SIZE):
+            batch = names[i : i + GET_PARAMETERS_BATCH_SIZE]
+            response = ssm.get_parameters(Names=batch)
+            for parameter in response.get('Parameters', []):
+                self._set(('ssm', parameter['Name']), parameter['Value'])
+            for name in response.get('InvalidParameters', []):
+                log.warning(f'Parameter `{name}` not found, defaulting to None')
+                self._set(('ssm', name), None)
+
+    def get_secret(self, secret_id):
+        found, value = self._get(('secretsmanager', secret_id))
+        if found:
+            return value
+        value = (
+            self.client('secretsmanager')
+            .get_secret_value(SecretId=secret_id)
+            .get('SecretString')
+        )
+        self._set(('secretsmanager', secret_id), value)
+        return value
+
+    def invalidate(self, name=None):
+        """Drops one parameter or secret, or everything when name is None"""
+        with self._lock:
+            if name is None:
+                self._values.clear()
+            else:
+                self._values.pop(('ssm', name), None)
+                self._values.pop(('secretsmanager', name), None)
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._values)}
+
+
+parameter_cache = ParameterCache()
+
+
+def get_parameter_cache() -> ParameterCache:
+    return parameter_cache
@@ -1,7 +1,6 @@
 import logging
-import os
 
-import boto3
+from .parameter_cache import parameter_cache
 
 log = logging.getLogger('utils:Secrets')
 
@@ -17,9 +16,9 @@ class Secrets:
         secret_name = f'/{cls.prefix}/{env}/{secret_name}'
         secret_name = secret_name.replace('//', '/')
         print(secret_name)
-        client = boto3.client(
-            'secretsmanager', region_name=os.getenv('AWS_REGION', 'eu-west-1')
-        )
-        secret = client.get_secret_value(SecretId=secret_name).get('SecretString')
-        print('secret = ', secret)
-        return secret
+        return parameter_cache.get_secret(secret_name)
+
+    @classmethod
+    def get_secret_value(cls, secret_id):
+        """SecretString of a secret given by its ARN or full name"""
+        return parameter_cache.get_secret(secret_id)
@@ -0,0 +1,41 @@
+"""hot_path_indexes
+
+Revision ID: 03ecac74df6c
+Revises: e1cd4927482b
+Create Date: 2026-10-18 09:12:41.518093
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '03ecac74df6c'
+down_revision = 'e1cd4927482b'
+branch_labels = None
+depends_on = None
+
+# (name, table, columns, postgresql_ops) mirroring the models __table_args__
+INDEXES = [
+    ('ix_share_object_item_shareUri_status', 'share_object_item', ['shareUri', 'status'], None),
+    ('ix_share_object_item_itemUri', 'share_object_item', ['itemUri'], None),
+    ('ix_dataset_table_datasetUri_status', 'dataset_table', ['datasetUri', 'LastGlueTableStatus'], None),
+    ('ix_dataset_table_column_glue_table', 'dataset_table_column', ['GlueDatabaseName', 'GlueTableName'], None),
+    ('ix_environment_group_permission_env_group', 'environment_group_permission', ['environmentUri', 'groupUri'], None),
+    ('ix_term_link_targetUri_approved', 'term_link', ['targetUri', 'approvedBySteward'], None),
+    ('ix_notification_username_is_read', 'notification', ['username', 'is_read'], None),
+    ('ix_task_status', 'task', ['status'], None),
+    ('ix_dataset_storage_location_S3Prefix', 'dataset_storage_location', ['S3Prefix'], {'S3Prefix': 'text_pattern_ops'}),
+    ('ix_glossary_node_path', 'glossary_node', ['path'], {'path': 'text_pattern_ops'}),
+]
+
+
+def upgrade():
+    for name, table, columns, ops in INDEXES:
+        op.create_index(
+            name, table, columns, unique=False, postgresql_ops=ops or {}
+        )
+
+
+def downgrade():
+    for name, table, _, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,31 @@
+"""stack_template_fingerprint
+
+Revision ID: bfbd1b164d95
+Revises: 03ecac74df6c
+Create Date: 2026-10-18 16:04:27.730514
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'bfbd1b164d95'
+down_revision = '03ecac74df6c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'stack', sa.Column('templateFingerprint', sa.String(), nullable=True)
+    )
+    op.add_column(
+        'stack',
+        sa.Column('deploySkipped', sa.Boolean(), nullable=True, default=False),
+    )
+
+
+def downgrade():
+    op.drop_column('stack', 'deploySkipped')
+    op.drop_column('stack', 'templateFingerprint')
@@ -504,6 +504,7 @@ class ContainerStack(pyNestedClass):
                 iam.PolicyStatement(
                     actions=[
                         'ecs:ListTasks',
+                        'ecs:DescribeTasks',
                     ],
                     resources=['*'],
                 ),
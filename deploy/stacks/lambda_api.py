@@ -125,7 +125,10 @@ class LambdaApiStack(pyNestedClass):
         self.aws_handler.add_event_source(
             lambda_event_sources.SqsEventSource(
                 queue=sqs_queue,
-                batch_size=1,
+                # tasks are not started within WORKER_TASK_TIME_BUDGET of the
+                # timeout, their messages are failed and delivered again
+                batch_size=10,
+                report_batch_item_failures=True,
             )
         )
 
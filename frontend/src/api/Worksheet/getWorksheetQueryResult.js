@@ -0,0 +1,46 @@
+import { gql } from 'apollo-boost';
+
+const getWorksheetQueryResult = ({
+  environmentUri,
+  worksheetUri,
+  athenaQueryId,
+  nextToken,
+  limit
+}) => ({
+  variables: {
+    environmentUri,
+    worksheetUri,
+    athenaQueryId,
+    nextToken,
+    limit
+  },
+  query: gql`
+    query getWorksheetQueryResult(
+      $environmentUri: String!
+      $worksheetUri: String!
+      $athenaQueryId: String!
+      $nextToken: String
+      $limit: Int
+    ) {
+      getWorksheetQueryResult(
+        environmentUri: $environmentUri
+        worksheetUri: $worksheetUri
+        athenaQueryId: $athenaQueryId
+        nextToken: $nextToken
+        limit: $limit
+      ) {
+        AthenaQueryId
+        Status
+        Error
+        columns {
+          columnName
+          typeName
+        }
+        records
+        nextToken
+      }
+    }
+  `
+});
+
+export default getWorksheetQueryResult;
@@ -0,0 +1,34 @@
+import { gql } from 'apollo-boost';
+
+const getWorksheetQueryStatus = ({
+  environmentUri,
+  worksheetUri,
+  athenaQueryId
+}) => ({
+  variables: {
+    environmentUri,
+    worksheetUri,
+    athenaQueryId
+  },
+  query: gql`
+    query getWorksheetQueryStatus(
+      $environmentUri: String!
+      $worksheetUri: String!
+      $athenaQueryId: String!
+    ) {
+      getWorksheetQueryStatus(
+        environmentUri: $environmentUri
+        worksheetUri: $worksheetUri
+        athenaQueryId: $athenaQueryId
+      ) {
+        AthenaQueryId
+        Status
+        Error
+        ElapsedTimeInMs
+        DataScannedInBytes
+      }
+    }
+  `
+});
+
+export default getWorksheetQueryStatus;
@@ -8,11 +8,19 @@ import removeWorksheetShare from './removeWorksheetShare';
 import updateWorksheetShare from './updateWorksheetShare';
 import deleteWorksheet from './deleteWorksheet';
 import runAthenaSqlQuery from './runAthenaSqlQuery';
+import getAthenaQueryResultPage from './getAthenaQueryResultPage';
+import startWorksheetQuery from './startWorksheetQuery';
+import getWorksheetQueryStatus from './getWorksheetQueryStatus';
+import getWorksheetQueryResult from './getWorksheetQueryResult';
 
 export {
   listWorksheets,
   createWorksheet,
   runAthenaSqlQuery,
+  getAthenaQueryResultPage,
+  startWorksheetQuery,
+  getWorksheetQueryStatus,
+  getWorksheetQueryResult,
   updateWorksheet,
   getWorksheet,
   listWorksheetShares,
@@ -6,6 +6,7 @@ import {
   InMemoryCache
 } from 'apollo-boost';
 import { onError } from '@apollo/client/link/error';
+import { createPersistedQueryLink } from '@apollo/client/link/persisted-queries';
 import { from } from '@apollo/client';
 import useToken from './useToken';
 import { useDispatch } from '../store';
@@ -26,6 +27,16 @@ const defaultOptions = {
   }
 };
 
+const sha256 = async (query) => {
+  const digest = await window.crypto.subtle.digest(
+    'SHA-256',
+    new TextEncoder().encode(query)
+  );
+  return Array.from(new Uint8Array(digest))
+    .map((b) => b.toString(16).padStart(2, '0'))
+    .join('');
+};
+
 const useClient = () => {
   const dispatch = useDispatch();
   const [client, setClient] = useState(null);
@@ -65,8 +76,11 @@ const useClient = () => {
         }
       });
 
+      // Sends the hash of the query instead of the query once the API knows it
+      const persistedQueriesLink = createPersistedQueryLink({ sha256 });
+
       const apolloClient = new ApolloClient({
-        link: from([errorLink, authLink, httpLink]),
+        link: from([errorLink, authLink, persistedQueriesLink, httpLink]),
         cache: new InMemoryCache(),
         defaultOptions
       });
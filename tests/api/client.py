@@ -58,19 +58,20 @@ def app(db, es):
 
         username = request.headers.get('Username', 'anonym')
         groups = json.loads(request.headers.get('Groups', '[]'))
-        success, result = graphql_sync(
-            schema,
-            data,
-            context_value={
-                'schema': None,
-                'engine': db,
-                'username': username,
-                'groups': groups,
-                'es': es,
-                'cdkproxyurl': 'cdkproxyurl',
-            },
-            debug=app.debug,
-        )
+        with dataall.db.api.request_permission_cache():
+            success, result = graphql_sync(
+                schema,
+                data,
+                context_value={
+                    'schema': None,
+                    'engine': db,
+                    'username': username,
+                    'groups': groups,
+                    'es': es,
+                    'cdkproxyurl': 'cdkproxyurl',
+                },
+                debug=app.debug,
+            )
 
         status_code = 200 if success else 400
         return jsonify(result), status_code
@@ -1,6 +1,7 @@
 import typing
 
 import pytest
+from sqlalchemy import event
 
 import dataall
 
@@ -344,6 +345,98 @@ def test_list_dataset_tables(client, dataset1, group):
     assert len(response.data.getDataset.tables.nodes) == 2
 
 
+def test_list_dataset_tables_with_cursor(client, dataset1, group):
+    q = """
+        query GetDataset($datasetUri:String!,$tableFilter:DatasetTableFilter){
+            getDataset(datasetUri:$datasetUri){
+                datasetUri
+                tables(filter:$tableFilter){
+                    count
+                    page
+                    hasNext
+                    hasPrevious
+                    nextCursor
+                    previousCursor
+                    nodes{
+                        tableUri
+                    }
+                }
+            }
+        }
+    """
+    seen = []
+    cursor = ''
+    for page in range(1, 5):
+        response = client.query(
+            q,
+            username=dataset1.owner,
+            groups=[group.name],
+            datasetUri=dataset1.datasetUri,
+            tableFilter={'pageSize': 3, 'cursor': cursor, 'countMode': 'Skip'},
+        )
+        tables = response.data.getDataset.tables
+        assert tables.count is None
+        assert tables.page == page
+        assert tables.hasNext == (page < 4)
+        assert tables.hasPrevious == (page > 1)
+        seen.extend([t.tableUri for t in tables.nodes])
+        cursor = tables.nextCursor
+    assert len(seen) == len(set(seen)) == 10
+    assert cursor is None
+
+    response = client.query(
+        q,
+        username=dataset1.owner,
+        groups=[group.name],
+        datasetUri=dataset1.datasetUri,
+        tableFilter={'pageSize': 3, 'cursor': tables.previousCursor},
+    )
+    tables = response.data.getDataset.tables
+    assert tables.count == 10
+    assert tables.page == 3
+    assert [t.tableUri for t in tables.nodes] == seen[6:9]
+
+    response = client.query(
+        q,
+        username=dataset1.owner,
+        groups=[group.name],
+        datasetUri=dataset1.datasetUri,
+        tableFilter={'pageSize': 3, 'cursor': '', 'countMode': 'Estimate'},
+    )
+    assert response.data.getDataset.tables.count >= 0
+
+    response = client.query(
+        q,
+        username=dataset1.owner,
+        groups=[group.name],
+        datasetUri=dataset1.datasetUri,
+        tableFilter={'page': 4, 'pageSize': 3, 'countMode': 'Skip'},
+    )
+    tables = response.data.getDataset.tables
+    assert tables.count is None
+    assert not tables.hasNext
+    assert [t.tableUri for t in tables.nodes] == seen[9:]
+
+    response = client.query(
+        q,
+        username=dataset1.owner,
+        groups=[group.name],
+        datasetUri=dataset1.datasetUri,
+        tableFilter={'page': 1, 'pageSize': 3, 'countMode': 'Skip'},
+    )
+    assert response.data.getDataset.tables.count is None
+    assert response.data.getDataset.tables.hasNext
+
+    response = client.query(
+        q,
+        username=dataset1.owner,
+        groups=[group.name],
+        datasetUri=dataset1.datasetUri,
+        tableFilter={'pageSize': 3, 'cursor': 'invalid'},
+    )
+    assert 'cursor' in response.errors[0].message
+
+
 def test_dataset_in_environment(client, env1, dataset1, group):
     q = """
     query ListDatasetsCreatedInEnvironment($environmentUri:String!){
@@ -547,3 +640,43 @@ def test_stewardship(client, dataset, env1, org1, db, group2, group, user, patch
         },
     )
     assert response.data.createDataset.stewards == group2.name
+
+
+def test_list_datasets_batches_nested_fields(db, client, dataset, org1, env1, dataset1, group):
+    dataset(org=org1, env=env1, name='dataset2', owner=env1.owner, group=group.name)
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        response = client.query(
+            """
+            query ListDatasets($filter:DatasetFilter){
+                listDatasets(filter:$filter){
+                    count
+                    nodes{
+                        datasetUri
+                        organization{ organizationUri }
+                        environment{ environmentUri }
+                        statistics{ tables locations upvotes }
+                    }
+                }
+            }
+            """,
+            filter=None,
+            username='alice',
+            groups=[group.name],
+        )
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capture)
+
+    nodes = response.data.listDatasets.nodes
+    assert len(nodes) >= 2
+    assert env1.environmentUri in {node.environment.environmentUri for node in nodes}
+    assert org1.organizationUri in {node.organization.organizationUri for node in nodes}
+    # one query per nested field, whatever the number of datasets
+    for table in ['environment', 'organization', 'dataset_table', 'dataset_storage_location', 'vote']:
+        lookups = [s for s in statements if f'\nFROM {table} \n' in s or f'\nFROM {table}\n' in s]
+        assert len(lookups) == 1, (table, lookups)
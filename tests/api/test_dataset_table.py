@@ -330,6 +330,59 @@ def test_sync_tables_and_columns(client, table, dataset1, db):
         assert deleted_table.LastGlueTableStatus == 'Deleted'
 
 
+def test_resync_only_writes_changed_columns(client, table, dataset1, db, group):
+    glue_table = {
+        'Name': 'resync_table',
+        'DatabaseName': dataset1.GlueDatabaseName,
+        'StorageDescriptor': {
+            'Columns': [
+                {'Name': 'id', 'Type': 'string', 'Comment': 'id'},
+                {'Name': 'amount', 'Type': 'int', 'Comment': 'amount'},
+                {'Name': 'dropped', 'Type': 'string', 'Comment': 'dropped'},
+            ],
+            'Location': f's3://{dataset1.S3BucketName}/resync_table',
+        },
+        'Parameters': {'p1': 'p1'},
+    }
+
+    def get_columns(session):
+        return {
+            c.name: c
+            for c in session.query(dataall.db.models.DatasetTableColumn).filter(
+                dataall.db.models.DatasetTableColumn.GlueTableName == 'resync_table'
+            )
+        }
+
+    with db.scoped_session() as session:
+        assert dataall.db.api.DatasetTable.sync(
+            session, dataset1.datasetUri, [glue_table]
+        )
+        before = get_columns(session)
+        new_table = (
+            session.query(dataall.db.models.DatasetTable)
+            .filter(dataall.db.models.DatasetTable.GlueTableName == 'resync_table')
+            .one()
+        )
+        assert dataall.db.api.ResourcePolicy.find_resource_policy(
+            session, group.name, new_table.tableUri
+        )
+
+    glue_table['StorageDescriptor']['Columns'] = [
+        {'Name': 'id', 'Type': 'string', 'Comment': 'id'},
+        {'Name': 'amount', 'Type': 'bigint', 'Comment': 'amount'},
+        {'Name': 'added', 'Type': 'string', 'Comment': 'added'},
+    ]
+    with db.scoped_session() as session:
+        assert dataall.db.api.DatasetTable.sync(
+            session, dataset1.datasetUri, [glue_table]
+        )
+        after = get_columns(session)
+        assert set(after) == {'id', 'amount', 'added'}
+        assert after['id'].columnUri == before['id'].columnUri
+        assert after['amount'].columnUri == before['amount'].columnUri
+        assert after['amount'].typeName == 'bigint'
+
+
 def test_delete_table(client, table, dataset1, db, group):
     table_to_delete = table(
         dataset=dataset1, name=f'table_to_update', username=dataset1.owner
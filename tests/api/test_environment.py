@@ -351,6 +351,64 @@ def test_paging(db, client, org1, env1, user, group):
         first_id = response.data.listEnvironments.nodes[0].environmentUri
 
 
+def test_paging_with_cursor(db, client, org1, env1, user, group, group2):
+    added = []
+    with db.scoped_session() as session:
+        environments = session.query(dataall.db.models.Environment).all()
+        for environment in environments:
+            for group_uri in [group.name, group2.name]:
+                if not session.query(dataall.db.models.EnvironmentGroup).get(
+                    (group_uri, environment.environmentUri)
+                ):
+                    added.append((group_uri, environment.environmentUri))
+                    session.add(
+                        dataall.db.models.EnvironmentGroup(
+                            groupUri=group_uri,
+                            environmentUri=environment.environmentUri,
+                            environmentIAMRoleArn='arn:aws::123456789012:role/EnvRole',
+                            environmentIAMRoleName='EnvRole',
+                            environmentAthenaWorkGroup='workgroup',
+                        )
+                    )
+    query = """
+        query LE($filter:EnvironmentFilter){
+            listEnvironments(filter:$filter){
+                count
+                hasNext
+                nextCursor
+                nodes{
+                    environmentUri
+                }
+            }
+        }
+    """
+    response = client.query(
+        query,
+        username='bob',
+        filter={'page': 1, 'pageSize': 100},
+        groups=[group.name, group2.name],
+    )
+    listed = [e.environmentUri for e in response.data.listEnvironments.nodes]
+    assert len(listed) == len(set(listed)) == response.data.listEnvironments.count
+
+    seen, cursor = [], ''
+    while cursor is not None:
+        response = client.query(
+            query,
+            username='bob',
+            filter={'pageSize': 4, 'cursor': cursor},
+            groups=[group.name, group2.name],
+        )
+        assert response.data.listEnvironments.count == len(listed)
+        seen.extend([e.environmentUri for e in response.data.listEnvironments.nodes])
+        cursor = response.data.listEnvironments.nextCursor
+    assert seen == listed
+
+    with db.scoped_session() as session:
+        for key in added:
+            session.delete(session.query(dataall.db.models.EnvironmentGroup).get(key))
+
+
 def test_group_invitation(db, client, env1, org1, group2, user, group3, group, dataset):
     response = client.query(
         """
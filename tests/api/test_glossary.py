@@ -1,6 +1,7 @@
 from typing import List
 from dataall.db import models
 import pytest
+from sqlalchemy import event
 
 
 @pytest.fixture(scope='module')
@@ -580,6 +581,84 @@ def test_get_term_associations(t1, client):
     print(r)
 
 
+def test_glossary_tree_from_snapshot(db, client, g1, c1, t1):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', count)
+    try:
+        response = client.query(
+            """
+            query ListGlossaries{
+                listGlossaries{
+                    nodes{
+                        nodeUri
+                        stats{ categories terms associations }
+                        categories{
+                            nodes{
+                                nodeUri
+                                stats{ categories terms associations }
+                            }
+                        }
+                    }
+                }
+            }
+            """
+        )
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', count)
+    glossary = response.data.listGlossaries.nodes[0]
+    # the subcategory is deleted and the term linked by the tests above
+    assert glossary.stats == {'categories': 1, 'terms': 1, 'associations': 2}
+    category = glossary.categories.nodes[0]
+    assert category.nodeUri == c1.nodeUri
+    assert category.stats == {'categories': 1, 'terms': 1, 'associations': 2}
+    # no subtree scan per node, the stats come from the tree snapshot
+    assert not [s for s in statements if 'glossary_node.path LIKE' in s]
+
+    response = client.query(
+        """
+        query SearchGlossaryHierarchy($filter:TermFilter){
+            searchGlossaryHierarchy(filter:$filter){
+                count
+                nodes{
+                    ... on Glossary{ nodeUri isMatch }
+                    ... on Category{ nodeUri isMatch }
+                    ... on Term{ nodeUri isMatch }
+                }
+            }
+        }
+        """,
+        filter={'term': 'customer id'},
+    )
+    nodes = response.data.searchGlossaryHierarchy.nodes
+    assert [n.nodeUri for n in nodes] == [g1.nodeUri, c1.nodeUri, t1.nodeUri]
+    # the category readme 'Customer identifiers category' matches as well
+    assert [n.isMatch for n in nodes] == [False, True, True]
+
+    response = client.query(
+        """
+        query GetGlossaryTree($nodeUri:String!, $filter:GlossaryNodeSearchFilter){
+            getGlossary(nodeUri:$nodeUri){
+                tree(filter:$filter){
+                    count
+                    nodes{
+                        ... on Category{ nodeUri }
+                    }
+                }
+            }
+        }
+        """,
+        nodeUri=g1.nodeUri,
+        filter={'nodeType': 'C', 'term': '%identifiers%'},
+    )
+    tree = response.data.getGlossary.tree
+    assert tree.count == 1
+    assert tree.nodes[0].nodeUri == c1.nodeUri
+
+
 def test_delete_category(client, c1, group):
     r = client.query(
         """
@@ -0,0 +1,20 @@
+import dataall
+from dataall.api.Objects import save_type_defs
+
+
+def test_executable_schema_from_prebuilt_type_defs(tmp_path):
+    path = str(tmp_path / 'schema.prebuilt.graphql')
+    save_type_defs(path)
+    schema = dataall.api.bootstrap()
+    executable_schema = dataall.api.get_executable_schema(
+        schema=schema, type_defs_path=path
+    )
+    assert executable_schema.query_type.fields.get('getDataset')
+    assert executable_schema.mutation_type.fields.get('createDataset')
+
+
+def test_executable_schema_without_prebuilt_type_defs(tmp_path):
+    executable_schema = dataall.api.get_executable_schema(
+        type_defs_path=str(tmp_path / 'missing.graphql')
+    )
+    assert executable_schema.query_type.fields.get('getDataset')
@@ -0,0 +1,130 @@
+import pytest
+
+import dataall
+from dataall.api.query_cache import (
+    DocumentCache,
+    client_query,
+    graphql_cached,
+    load_operations,
+    query_hash,
+    save_operations,
+)
+
+LIST_ORGANIZATIONS = """
+query ListOrganizations($filter: OrganizationFilter) {
+  listOrganizations(filter: $filter) {
+    count
+  }
+}
+"""
+
+
+@pytest.fixture(scope='module')
+def schema():
+    yield dataall.api.get_executable_schema()
+
+
+@pytest.fixture(scope='function')
+def context(db, es):
+    yield {
+        'schema': None,
+        'engine': db,
+        'username': 'alice',
+        'groups': ['admins'],
+        'es': es,
+        'cdkproxyurl': 'cdkproxyurl',
+    }
+
+
+def persisted(sha256_hash, **data):
+    return {
+        'extensions': {'persistedQuery': {'version': 1, 'sha256Hash': sha256_hash}},
+        **data,
+    }
+
+
+def test_documents_are_parsed_once(schema, context):
+    cache = DocumentCache()
+    data = {'query': LIST_ORGANIZATIONS, 'variables': {'filter': {}}}
+    success, first = graphql_cached(schema, data, context, cache)
+    assert success and 'errors' not in first
+    success, second = graphql_cached(schema, data, context, cache)
+    assert success and second == first
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'size': 1}
+
+
+def test_persisted_queries(schema, context):
+    cache = DocumentCache()
+    sha256_hash = query_hash(LIST_ORGANIZATIONS)
+
+    success, response = graphql_cached(schema, persisted(sha256_hash), context, cache)
+    assert success
+    assert response['errors'][0]['message'] == 'PersistedQueryNotFound'
+
+    success, response = graphql_cached(
+        schema, persisted(sha256_hash, query=LIST_ORGANIZATIONS), context, cache
+    )
+    assert success and 'errors' not in response
+
+    success, response = graphql_cached(schema, persisted(sha256_hash), context, cache)
+    assert success and response['data']['listOrganizations']['count'] is not None
+
+    success, response = graphql_cached(
+        schema, persisted('not-the-hash', query=LIST_ORGANIZATIONS), context, cache
+    )
+    assert not success
+    assert response['errors'][0]['message'] == 'provided sha does not match query'
+
+
+def test_invalid_documents_are_not_cached(schema, context):
+    cache = DocumentCache()
+    success, response = graphql_cached(
+        schema, {'query': '{ listOrganizations { unknownField } }'}, context, cache
+    )
+    assert not success
+    assert 'unknownField' in response['errors'][0]['message']
+    assert len(cache) == 0
+
+    success, response = graphql_cached(schema, {'query': '{ ...'}, context, cache)
+    assert not success
+    assert len(cache) == 0
+
+
+def test_least_recently_used_documents_are_evicted(schema):
+    cache = DocumentCache(max_size=2)
+    queries = [
+        '{ listOrganizations { count } }',
+        '{ listEnvironments { count } }',
+        '{ listDatasets { count } }',
+    ]
+    cache.warm_up(schema, queries[:2])
+    assert cache.get(query_hash(queries[0]))
+    cache.warm_up(schema, queries[2:])
+    assert cache.get(query_hash(queries[0]))
+    assert cache.get(query_hash(queries[1])) is None
+    assert cache.get(query_hash(queries[2]))
+
+
+def test_warm_up_with_frontend_operations(schema, tmp_path):
+    source = tmp_path / 'api'
+    source.mkdir()
+    (source / 'listOrganizations.js').write_text(
+        "import { gql } from 'apollo-boost';\n"
+        'const listOrganizations = (filter) => ({\n'
+        '  variables: { filter },\n'
+        f'  query: gql`{LIST_ORGANIZATIONS}`\n'
+        '});\n'
+    )
+    (source / 'removed.js').write_text(
+        "const removed = () => ({ query: gql`query { removedField }` });\n"
+    )
+    path = str(tmp_path / 'operations.prebuilt.json')
+
+    operations = save_operations(str(source), path, schema=schema)
+    assert list(operations.values()) == [client_query(LIST_ORGANIZATIONS)]
+    assert '__typename' in client_query(LIST_ORGANIZATIONS)
+
+    cache = DocumentCache()
+    assert cache.warm_up(schema, load_operations(path)) == 1
+    assert cache.get(query_hash(client_query(LIST_ORGANIZATIONS)))
+    assert load_operations(str(tmp_path / 'missing.json')) == []
@@ -1,8 +1,12 @@
 import random
 import typing
+from argparse import Namespace
+
 import pytest
+from sqlalchemy import event
 
 import dataall
+from dataall.api.Objects.ShareObject import resolvers as share_resolvers
 
 
 def random_table_name():
@@ -1048,6 +1052,55 @@ def test_list_shares_from_me_requester(
     assert get_share_requests_from_me_response.data.getShareRequestsFromMe.count == 2
 
 
+def test_list_shares_statistics_in_one_query(
+        db, client, user2, group2, share1_draft
+):
+    # Given the share objects sent by the requesters
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if 'FROM share_object_item' in statement:
+            statements.append(statement)
+
+    # When they list them with their statistics
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        response = client.query(
+            """
+            query getShareRequestsFromMe($filter: ShareObjectFilter){
+                getShareRequestsFromMe(filter: $filter){
+                    count
+                    nodes{
+                        shareUri
+                        statistics {
+                            tables
+                            locations
+                            sharedItems
+                            revokedItems
+                            failedItems
+                            pendingItems
+                        }
+                    }
+                }
+            }
+            """,
+            username=user2.userName,
+            groups=[group2.name],
+        )
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capture)
+
+    # Then the items of all the shares are counted with a single query
+    nodes = response.data.getShareRequestsFromMe.nodes
+    assert len(nodes) == 2
+    assert len(statements) == 1
+    with db.scoped_session() as session:
+        for node in nodes:
+            assert dict(node.statistics) == dataall.db.api.ShareObject.resolve_share_object_statistics(
+                session, node.shareUri
+            )
+
+
 def test_add_share_item(
         client, user2, group2, share1_draft,
 
@@ -1506,3 +1559,11 @@ def _successfull_processing_for_share_object(db, share):
 
         Share_SM.update_state(session, share, new_share_state)
 
+
+def test_share_links_of_a_deleted_dataset_are_empty(db):
+    context = Namespace(engine=db)
+    share = dataall.db.models.ShareObject(
+        datasetUri='deleted-dataset', environmentUri='deleted-environment'
+    )
+    assert share_resolvers.resolve_dataset(context, share) is None
+    assert share_resolvers.resolve_environment(context, share) is None
@@ -1,5 +1,11 @@
+import io
+import json
+
 import pytest
+from botocore.response import StreamingBody
+
 from dataall.api.constants import WorksheetRole
+from dataall.api.Objects.AthenaQueryResult import helpers as athena_helpers
 
 
 @pytest.fixture(scope='module', autouse=True)
@@ -275,3 +281,254 @@ def test_share_with_individual(client, worksheet, group2, group):
         groups=[group.name],
     )
     assert response.data.deleteWorksheet
+
+
+def test_run_athena_sql_query_paginated(client, env_fixture, group, mocker):
+    worksheet = client.query(
+        """
+        mutation CreateWorksheet ($input:NewWorksheetInput){
+            createWorksheet(input:$input){
+                worksheetUri
+            }
+        }
+        """,
+        input={'label': 'paginated worksheet', 'SamlAdminGroupName': group.name},
+        username='alice',
+        groups=[group.name],
+    ).data.createWorksheet
+    athena = mocker.MagicMock()
+    athena.start_query_execution.return_value = {'QueryExecutionId': 'query-id'}
+    athena.get_query_execution.return_value = {
+        'QueryExecution': {
+            'QueryExecutionId': 'query-id',
+            'StatementType': 'DML',
+            'Status': {'State': 'SUCCEEDED'},
+            'Statistics': {'TotalExecutionTimeInMillis': 42},
+        }
+    }
+    column_info = [
+        {'Name': 'id', 'Type': 'bigint'},
+        {'Name': 'name', 'Type': 'varchar'},
+        {'Name': 'active', 'Type': 'boolean'},
+    ]
+    athena.get_query_results.side_effect = [
+        {
+            'ResultSet': {
+                'ResultSetMetadata': {'ColumnInfo': column_info},
+                'Rows': [
+                    {'Data': [{'VarCharValue': 'id'}, {'VarCharValue': 'name'}, {'VarCharValue': 'active'}]},
+                    {'Data': [{'VarCharValue': '1'}, {'VarCharValue': 'a'}, {'VarCharValue': 'true'}]},
+                    {'Data': [{'VarCharValue': '2'}, {}, {'VarCharValue': 'false'}]},
+                ],
+            },
+            'NextToken': 'token-1',
+        },
+        {
+            'ResultSet': {
+                'ResultSetMetadata': {'ColumnInfo': column_info},
+                'Rows': [
+                    {'Data': [{'VarCharValue': '3'}, {'VarCharValue': 'c'}, {'VarCharValue': 'true'}]},
+                ],
+            },
+        },
+    ]
+    mocker.patch(
+        'dataall.api.Objects.AthenaQueryResult.helpers.get_athena_client',
+        return_value=athena,
+    )
+
+    response = client.query(
+        """
+        query runAthenaSqlQuery($environmentUri: String!, $worksheetUri: String!, $sqlQuery: String!, $limit: Int) {
+            runAthenaSqlQuery(environmentUri: $environmentUri, worksheetUri: $worksheetUri, sqlQuery: $sqlQuery, limit: $limit) {
+                AthenaQueryId
+                Status
+                ElapsedTimeInMs
+                columns { columnName typeName }
+                records
+                nextToken
+            }
+        }
+        """,
+        environmentUri=env_fixture.environmentUri,
+        worksheetUri=worksheet.worksheetUri,
+        sqlQuery='SELECT * FROM t',
+        limit=2,
+        username='alice',
+        groups=[group.name],
+    )
+    result = response.data.runAthenaSqlQuery
+    assert result.Status == 'SUCCEEDED'
+    assert [c.typeName for c in result.columns] == ['bigint', 'varchar', 'boolean']
+    assert json.loads(result.records) == [[1, 'a', True], [2, None, False]]
+    assert result.nextToken == 'token-1'
+    athena.get_query_results.assert_called_with(QueryExecutionId='query-id', MaxResults=3)
+
+    response = client.query(
+        """
+        query getAthenaQueryResultPage($environmentUri: String!, $worksheetUri: String!, $athenaQueryId: String!, $nextToken: String, $limit: Int) {
+            getAthenaQueryResultPage(environmentUri: $environmentUri, worksheetUri: $worksheetUri, athenaQueryId: $athenaQueryId, nextToken: $nextToken, limit: $limit) {
+                records
+                nextToken
+            }
+        }
+        """,
+        environmentUri=env_fixture.environmentUri,
+        worksheetUri=worksheet.worksheetUri,
+        athenaQueryId='query-id',
+        nextToken='token-1',
+        limit=2,
+        username='alice',
+        groups=[group.name],
+    )
+    page = response.data.getAthenaQueryResultPage
+    assert json.loads(page.records) == [[3, 'c', True]]
+    assert page.nextToken is None
+    athena.get_query_results.assert_called_with(
+        QueryExecutionId='query-id', MaxResults=2, NextToken='token-1'
+    )
+
+
+def test_run_athena_sql_query_returns_running_query(client, env_fixture, group, mocker, monkeypatch):
+    worksheet = client.query(
+        """
+        mutation CreateWorksheet ($input:NewWorksheetInput){
+            createWorksheet(input:$input){
+                worksheetUri
+            }
+        }
+        """,
+        input={'label': 'long worksheet', 'SamlAdminGroupName': group.name},
+        username='alice',
+        groups=[group.name],
+    ).data.createWorksheet
+    athena = mocker.MagicMock()
+    athena.start_query_execution.return_value = {'QueryExecutionId': 'long-query-id'}
+    athena.get_query_execution.return_value = {
+        'QueryExecution': {
+            'QueryExecutionId': 'long-query-id',
+            'StatementType': 'DML',
+            'Status': {'State': 'RUNNING'},
+        }
+    }
+    mocker.patch(
+        'dataall.api.Objects.AthenaQueryResult.helpers.get_athena_client',
+        return_value=athena,
+    )
+    monkeypatch.setenv('ATHENA_QUERY_WAIT_TIMEOUT', '0')
+
+    response = client.query(
+        """
+        query runAthenaSqlQuery($environmentUri: String!, $worksheetUri: String!, $sqlQuery: String!, $limit: Int) {
+            runAthenaSqlQuery(environmentUri: $environmentUri, worksheetUri: $worksheetUri, sqlQuery: $sqlQuery, limit: $limit) {
+                AthenaQueryId
+                Status
+                records
+            }
+        }
+        """,
+        environmentUri=env_fixture.environmentUri,
+        worksheetUri=worksheet.worksheetUri,
+        sqlQuery='SELECT * FROM big_table',
+        limit=2,
+        username='alice',
+        groups=[group.name],
+    )
+    result = response.data.runAthenaSqlQuery
+    assert result.AthenaQueryId == 'long-query-id'
+    assert result.Status == 'RUNNING'
+    assert json.loads(result.records) == []
+    athena.get_query_results.assert_not_called()
+
+
+def test_start_worksheet_query_reuses_recent_execution(client, env_fixture, group, mocker):
+    worksheet = client.query(
+        """
+        mutation CreateWorksheet ($input:NewWorksheetInput){
+            createWorksheet(input:$input){
+                worksheetUri
+            }
+        }
+        """,
+        input={'label': 'async worksheet', 'SamlAdminGroupName': group.name},
+        username='alice',
+        groups=[group.name],
+    ).data.createWorksheet
+    athena = mocker.MagicMock()
+    athena.start_query_execution.return_value = {'QueryExecutionId': 'async-query-id'}
+    athena.get_query_execution.return_value = {
+        'QueryExecution': {
+            'QueryExecutionId': 'async-query-id',
+            'StatementType': 'DML',
+            'Status': {'State': 'RUNNING'},
+        }
+    }
+    mocker.patch(
+        'dataall.api.Objects.AthenaQueryResult.helpers.get_athena_client',
+        return_value=athena,
+    )
+    athena_helpers.QUERY_RESULT_CACHE.clear()
+
+    def start(sql):
+        return client.query(
+            """
+            mutation StartWorksheetQuery($worksheetUri: String!, $input: WorksheetQueryInput!) {
+                startWorksheetQuery(worksheetUri: $worksheetUri, input: $input) {
+                    AthenaQueryId
+                    Status
+                }
+            }
+            """,
+            worksheetUri=worksheet.worksheetUri,
+            input={'sqlBody': sql, 'environmentUri': env_fixture.environmentUri},
+            username='alice',
+            groups=[group.name],
+        ).data.startWorksheetQuery
+
+    first = start('SELECT * FROM t')
+    assert first.AthenaQueryId == 'async-query-id'
+    assert first.Status == 'QUEUED'
+    second = start('  SELECT * FROM t\n')
+    assert second.AthenaQueryId == 'async-query-id'
+    assert second.Status == 'RUNNING'
+    athena.start_query_execution.assert_called_once()
+
+    status = client.query(
+        """
+        query getWorksheetQueryStatus($environmentUri: String!, $worksheetUri: String!, $athenaQueryId: String!) {
+            getWorksheetQueryStatus(environmentUri: $environmentUri, worksheetUri: $worksheetUri, athenaQueryId: $athenaQueryId) {
+                AthenaQueryId
+                Status
+            }
+        }
+        """,
+        environmentUri=env_fixture.environmentUri,
+        worksheetUri=worksheet.worksheetUri,
+        athenaQueryId='async-query-id',
+        username='alice',
+        groups=[group.name],
+    ).data.getWorksheetQueryStatus
+    assert status.Status == 'RUNNING'
+
+    athena.get_query_execution.return_value['QueryExecution']['Status']['State'] = 'FAILED'
+    start('SELECT * FROM t')
+    assert athena.start_query_execution.call_count == 2
+    athena_helpers.QUERY_RESULT_CACHE.clear()
+
+
+def test_read_csv_results_pages_by_offset():
+    data = b'"id","name","score"\n"1","a","1.5"\n"2","multi\nline",""\n"3","c","2.0"\n'
+
+    class S3:
+        def get_object(self, Bucket, Key, Range=None):
+            assert (Bucket, Key) == ('bucket', 'athenaqueries/wg/q.csv')
+            body = data[int(Range[len('bytes='):-1]):] if Range else data
+            return {'ContentLength': len(body), 'Body': StreamingBody(io.BytesIO(body), len(body))}
+
+    types = ['integer', 'varchar', 'double']
+    location = 's3://bucket/athenaqueries/wg/q.csv'
+    records, offset = athena_helpers.read_csv_results(S3(), location, types, limit=2)
+    assert records == [[1, 'a', 1.5], [2, 'multi\nline', None]]
+    records, offset = athena_helpers.read_csv_results(S3(), location, types, offset, limit=2)
+    assert records == [[3, 'c', 2.0]]
+    assert offset is None
@@ -0,0 +1,63 @@
+import json
+
+from dataall.cdkproxy.cdk_cli_wrapper import is_stack_unchanged, template_fingerprint
+from dataall.db import models
+
+
+def write_assembly(path, template, asset_hash='asset-1'):
+    path.mkdir(exist_ok=True)
+    (path / 'manifest.json').write_text(
+        json.dumps(
+            {
+                'artifacts': {
+                    'stack': {
+                        'type': 'aws:cloudformation:stack',
+                        'properties': {'templateFile': 'stack.template.json'},
+                    },
+                    'stack.assets': {
+                        'type': 'cdk:asset-manifest',
+                        'properties': {'file': 'stack.assets.json'},
+                    },
+                    'Tree': {'type': 'cdk:tree', 'properties': {'file': 'tree.json'}},
+                }
+            }
+        )
+    )
+    (path / 'stack.template.json').write_text(json.dumps(template))
+    (path / 'stack.assets.json').write_text(
+        json.dumps({'files': {asset_hash: {}}, 'dockerImages': {}})
+    )
+    return str(path)
+
+
+def test_template_fingerprint(tmp_path):
+    parameters = {'appid': 'stack', 'account': '111111111111'}
+    template = {'Resources': {'Bucket': {'Type': 'AWS::S3::Bucket'}}}
+    fingerprint = template_fingerprint(
+        write_assembly(tmp_path / 'a', template), parameters
+    )
+    assert fingerprint == template_fingerprint(
+        write_assembly(tmp_path / 'b', template), dict(reversed(parameters.items()))
+    )
+    assert fingerprint != template_fingerprint(
+        write_assembly(tmp_path / 'c', {'Resources': {}}), parameters
+    )
+    assert fingerprint != template_fingerprint(
+        write_assembly(tmp_path / 'd', template, asset_hash='asset-2'), parameters
+    )
+    assert fingerprint != template_fingerprint(
+        write_assembly(tmp_path / 'e', template), {**parameters, 'region': 'eu-west-1'}
+    )
+
+
+def test_unchanged_stacks_are_skipped_when_deployed(mocker):
+    describe_stack = mocker.patch(
+        'dataall.cdkproxy.cdk_cli_wrapper.describe_stack',
+        return_value={'StackId': 'id', 'StackStatus': 'UPDATE_COMPLETE'},
+    )
+    stack = models.Stack(name='stack', templateFingerprint='abc')
+    assert is_stack_unchanged(stack, 'abc')
+    assert not is_stack_unchanged(stack, 'def')
+    assert not is_stack_unchanged(stack, None)
+    describe_stack.return_value = {'StackId': 'id', 'StackStatus': 'UPDATE_ROLLBACK_COMPLETE'}
+    assert not is_stack_unchanged(stack, 'abc')
@@ -17,3 +17,26 @@ def test(db: dataall.db.Engine):
                 assert nb == 0
     else:
         assert True
+
+
+def test_session_per_thread_and_request(db: dataall.db.Engine):
+    from concurrent.futures import ThreadPoolExecutor
+
+    def count_tenants():
+        with db.scoped_session() as session:
+            return id(session), session.query(dataall.db.models.Tenant).count()
+
+    main_session = db.session()
+    assert db.session() is main_session
+    with db.request_scope():
+        assert db.session() is not main_session
+    assert db.session() is main_session
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        results = list(executor.map(lambda _: count_tenants(), range(6)))
+    assert id(main_session) not in {session_id for session_id, _ in results}
+    assert {count for _, count in results} == {0}
+
+    metrics = db.pool_metrics()
+    assert metrics['checkouts'] > 0
+    assert metrics['checked_out'] == 0
@@ -266,3 +266,151 @@ def test_create_dataset(db, env, user, group, group_user, dataset, permissions,
             check_perm=True,
         )
         assert dataset
+
+
+def test_request_permission_cache(db, user, group, group_user, dataset, permissions):
+    with dataall.db.api.request_permission_cache() as cache:
+        with db.scoped_session() as session:
+            dataall.db.api.ResourcePolicy.attach_resource_policy(
+                session=session,
+                group=group.name,
+                permissions=dataall.db.permissions.DATASET_READ,
+                resource_uri=dataset.datasetUri,
+                resource_type=dataall.db.models.Dataset.__name__,
+            )
+            for permission in dataall.db.permissions.DATASET_READ:
+                assert dataall.db.api.ResourcePolicy.check_user_resource_permission(
+                    session=session,
+                    username=user.userName,
+                    groups=[group.name],
+                    permission_name=permission,
+                    resource_uri=dataset.datasetUri,
+                )
+            assert cache.queries == 1
+            assert cache.hits == len(dataall.db.permissions.DATASET_READ) - 1
+
+            dataall.db.api.ResourcePolicy.delete_resource_policy(
+                session=session,
+                group=group.name,
+                resource_uri=dataset.datasetUri,
+            )
+            assert not dataall.db.api.ResourcePolicy.has_user_resource_permission(
+                session=session,
+                username=user.userName,
+                groups=[group.name],
+                permission_name=dataall.db.permissions.GET_DATASET,
+                resource_uri=dataset.datasetUri,
+            )
+            assert cache.queries == 2
+
+    assert not dataall.db.api.get_permission_cache()
+
+
+def test_prefetch_resource_permissions(db, user, group, group_user, dataset, permissions):
+    with dataall.db.api.request_permission_cache() as cache:
+        with db.scoped_session() as session:
+            dataall.db.api.ResourcePolicy.attach_resource_policy(
+                session=session,
+                group=group.name,
+                permissions=dataall.db.permissions.DATASET_WRITE,
+                resource_uri=dataset.datasetUri,
+                resource_type=dataall.db.models.Dataset.__name__,
+            )
+            dataall.db.api.ResourcePolicy.prefetch_user_resource_permissions(
+                session,
+                groups=[group.name],
+                resource_uris=[dataset.datasetUri, 'unknown-uri'],
+            )
+            assert dataall.db.api.ResourcePolicy.has_user_resource_permission(
+                session=session,
+                username=user.userName,
+                groups=[group.name],
+                permission_name=dataall.db.permissions.UPDATE_DATASET,
+                resource_uri=dataset.datasetUri,
+            )
+            assert not dataall.db.api.ResourcePolicy.has_user_resource_permission(
+                session=session,
+                username=user.userName,
+                groups=[group.name],
+                permission_name=dataall.db.permissions.UPDATE_DATASET,
+                resource_uri='unknown-uri',
+            )
+            assert cache.stats() == {'hits': 2, 'queries': 1, 'saved': 2}
+
+
+def test_ensure_groups_tenant_policy(db, user, group, permissions, tenant):
+    now = [0]
+    known_groups = dataall.db.api.TenantGroupsCache(ttl=60, clock=lambda: now[0])
+    with db.scoped_session() as session:
+        attached = dataall.db.api.TenantPolicy.ensure_groups_tenant_policy(
+            session=session,
+            groups=[group.name, 'saml-team-1', 'saml-team-2', ''],
+            permissions=dataall.db.permissions.TENANT_ALL,
+            tenant_name='dataall',
+            known_groups=known_groups,
+        )
+        assert attached == ['saml-team-1', 'saml-team-2']
+        assert dataall.db.api.TenantPolicy.has_group_tenant_permission(
+            session,
+            group_uri='saml-team-2',
+            permission_name=dataall.db.permissions.MANAGE_DATASETS,
+            tenant_name='dataall',
+        )
+        assert not dataall.db.api.TenantPolicy.find_groups_without_tenant_policy(
+            session, [group.name, 'saml-team-1', 'saml-team-2'], 'dataall'
+        )
+
+        process_groups = dataall.db.api.get_tenant_groups_cache()
+        process_groups.add(['saml-team-1'], 'dataall')
+        dataall.db.api.TenantPolicy.delete_tenant_policy(
+            session, group='saml-team-1', tenant_name='dataall'
+        )
+        assert process_groups.unknown(['saml-team-1'], 'dataall') == {'saml-team-1'}
+        assert not dataall.db.api.TenantPolicy.ensure_groups_tenant_policy(
+            session=session,
+            groups=[group.name, 'saml-team-1'],
+            permissions=dataall.db.permissions.TENANT_ALL,
+            tenant_name='dataall',
+            known_groups=known_groups,
+        )
+
+        now[0] = 61
+        assert dataall.db.api.TenantPolicy.ensure_groups_tenant_policy(
+            session=session,
+            groups=[group.name, 'saml-team-1'],
+            permissions=dataall.db.permissions.TENANT_ALL,
+            tenant_name='dataall',
+            known_groups=known_groups,
+        ) == ['saml-team-1']
+
+
+def test_bulk_attach_resource_policies(db, permissions):
+    read, write = dataall.db.permissions.DATASET_TABLE_READ[:2]
+    with db.scoped_session() as session:
+        dataall.db.api.ResourcePolicy.attach_resource_policy(
+            session, 'bulk-team-1', [read], 'bulk-table-1', 'DatasetTable'
+        )
+        created = dataall.db.api.ResourcePolicy.bulk_attach_resource_policies(
+            session,
+            groups=['bulk-team-1', 'bulk-team-2'],
+            permissions=[read, write],
+            resource_uris=['bulk-table-1', 'bulk-table-2'],
+            resource_type='DatasetTable',
+        )
+        assert created == 3
+        for group in ['bulk-team-1', 'bulk-team-2']:
+            for resource_uri in ['bulk-table-1', 'bulk-table-2']:
+                for permission in [read, write]:
+                    assert dataall.db.api.ResourcePolicy.has_group_resource_permission(
+                        session,
+                        group_uri=group,
+                        permission_name=permission,
+                        resource_uri=resource_uri,
+                    )
+        session.rollback()
+        assert not dataall.db.api.ResourcePolicy.has_group_resource_permission(
+            session,
+            group_uri='bulk-team-1',
+            permission_name=write,
+            resource_uri='bulk-table-1',
+        )
@@ -0,0 +1,156 @@
+import importlib
+import json
+from argparse import Namespace
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+import dataall
+from dataall.db import models
+from dataall.tasks.catalog_indexer import get_last_indexing_run
+
+
+@contextmanager
+def captured_statements(db):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE')):
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capture)
+
+
+def scanned_relations(plan, scans=None):
+    scans = scans if scans is not None else []
+    if plan.get('Relation Name') and plan['Node Type'] != 'ModifyTable':
+        # an index only serves the lookup when it has a condition on it
+        indexed = bool(plan.get('Index Cond') or plan.get('Recheck Cond'))
+        scans.append((plan['Node Type'], plan['Relation Name'], indexed))
+    for child in plan.get('Plans', []):
+        scanned_relations(child, scans)
+    return scans
+
+
+def explain(db, statements):
+    """
+    Plans of the statements with sequential scans disabled, so that they
+    are only chosen when no index can serve the lookup
+    """
+    connection = db.engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute('SET enable_seqscan = off')
+        scans = []
+        for statement, parameters in statements:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {statement}', parameters)
+            plan = cursor.fetchone()[0]
+            plan = json.loads(plan) if isinstance(plan, str) else plan
+            scans += scanned_relations(plan[0]['Plan'])
+        return scans
+    finally:
+        connection.rollback()
+        connection.close()
+
+
+def assert_index_used(db, statements, table):
+    scans = explain(db, statements)
+    table_scans = [scan for scan in scans if scan[1] == table]
+    assert table_scans, scans
+    assert all(indexed for _, _, indexed in table_scans), table_scans
+
+
+def test_models_declare_migration_indexes(db):
+    pytest.importorskip('alembic')
+    migration = importlib.import_module(
+        'migrations.versions.03ecac74df6c_hot_path_indexes'
+    )
+    declared = {
+        index.name
+        for table in dataall.db.Base.metadata.tables.values()
+        for index in table.indexes
+    }
+    for name, *_ in migration.INDEXES:
+        assert name in declared
+
+
+def test_share_item_lookups(db):
+    with db.scoped_session() as session:
+        with captured_statements(db) as statements:
+            dataall.db.api.ShareObject.resolve_share_object_statistics(
+                session, 'share-uri'
+            )
+        assert_index_used(db, statements, 'share_object_item')
+
+        with captured_statements(db) as statements:
+            dataall.db.api.ShareObject.find_share_item_by_table(
+                session,
+                Namespace(shareUri='share-uri'),
+                Namespace(tableUri='table-uri'),
+            )
+        assert_index_used(db, statements, 'share_object_item')
+
+
+def test_dataset_table_lookups(db):
+    with db.scoped_session() as session:
+        with captured_statements(db) as statements:
+            dataall.db.api.Dataset.paginated_dataset_tables(
+                session=session,
+                username='alice',
+                groups=['admins'],
+                uri='dataset-uri',
+                data={'page': 1, 'pageSize': 10},
+                check_perm=False,
+            )
+        assert_index_used(db, statements, 'dataset_table')
+
+        with captured_statements(db) as statements:
+            dataall.db.api.DatasetTable.delete_all_table_columns(
+                session,
+                Namespace(GlueDatabaseName='db', GlueTableName='table'),
+            )
+        assert_index_used(db, statements, 'dataset_table_column')
+
+
+def test_prefix_lookups(db):
+    with db.scoped_session() as session:
+        with captured_statements(db) as statements:
+            dataall.db.api.DatasetStorageLocation.get_location_by_s3_prefix(
+                session, 's3://bucket/prefix', '111111111111', 'eu-west-1'
+            )
+        assert_index_used(db, statements, 'dataset_storage_location')
+
+        with captured_statements(db) as statements:
+            session.query(models.GlossaryNode).filter(
+                models.GlossaryNode.path.startswith('/G1/'),
+                models.GlossaryNode.deleted.is_(None),
+            ).count()
+        assert_index_used(db, statements, 'glossary_node')
+
+
+def test_glossary_environment_notification_and_task_lookups(db):
+    with db.scoped_session() as session:
+        with captured_statements(db) as statements:
+            dataall.db.api.Glossary.get_glossary_terms_links(
+                session, 'target-uri', 'Dataset'
+            )
+        assert_index_used(db, statements, 'term_link')
+
+        with captured_statements(db) as statements:
+            dataall.db.api.Environment.query_user_environment_groups(
+                session, 'alice', ['admins'], 'environment-uri', {}
+            ).all()
+        assert_index_used(db, statements, 'environment_group_permission')
+
+        with captured_statements(db) as statements:
+            dataall.db.api.Notification.count_unread_notifications(session, 'alice')
+        assert_index_used(db, statements, 'notification')
+
+        with captured_statements(db) as statements:
+            get_last_indexing_run(session)
+        assert_index_used(db, statements, 'task')
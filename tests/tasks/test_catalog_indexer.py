@@ -1,3 +1,5 @@
+from datetime import datetime, timedelta
+
 import pytest
 import dataall
 
@@ -92,3 +94,69 @@ def test_catalog_indexer(db, org, env, sync_dataset, table, mocker):
         engine=db, es=True
     )
     assert indexed_objects_counter == 2
+
+
+def test_catalog_indexer_bulk(db, org, env, sync_dataset, table, mocker):
+    es = mocker.MagicMock()
+    es.bulk.side_effect = lambda body: {
+        'errors': False,
+        'items': [{'index': {'_id': a['index']['_id']}} for a in body[::2]],
+    }
+    indexed_objects_counter = dataall.tasks.catalog_indexer.index_objects(
+        engine=db, es=es, bulk=True, chunk_size=1
+    )
+    assert indexed_objects_counter == 2
+    assert es.bulk.call_count == 2
+    indexed = {call.kwargs['body'][0]['index']['_id'] for call in es.bulk.mock_calls}
+    assert indexed == {sync_dataset.datasetUri, table.tableUri}
+    dataset_doc = es.bulk.mock_calls[0].kwargs['body'][1]
+    assert dataset_doc['tables'] == 1
+    assert dataset_doc['resourceKind'] == 'dataset'
+
+
+def test_catalog_indexer_incremental(db, org, env, sync_dataset, table, mocker):
+    es = mocker.MagicMock()
+    es.bulk.side_effect = lambda body: {
+        'errors': False,
+        'items': [
+            {action: {'_id': line[action]['_id']}}
+            for line in body
+            for action in ('index', 'delete')
+            if action in line
+        ],
+    }
+    mocker.patch(
+        'dataall.searchproxy.bulk_indexers.helpers.scan',
+        return_value=[{'_id': sync_dataset.datasetUri}, {'_id': 'stale-uri'}],
+    )
+    stats = dataall.tasks.catalog_indexer.incremental_index_objects(engine=db, es=es)
+    assert stats['datasets']['indexed'] == 1
+    assert stats['tables']['indexed'] == 1
+    assert stats['deleted']['indexed'] == 1
+    assert es.bulk.mock_calls[-1].kwargs['body'] == [
+        {'delete': {'_index': 'dataall-index', '_id': 'stale-uri'}}
+    ]
+
+    with db.scoped_session() as session:
+        last_run = dataall.tasks.catalog_indexer.get_last_indexing_run(session)
+        assert last_run.payload['mode'] == 'full'
+        last_run.payload = {
+            'mode': 'full',
+            'watermark': (datetime.now() - timedelta(hours=1)).isoformat(),
+        }
+        session.query(dataall.db.models.DatasetTable).get(
+            table.tableUri
+        ).deleted = datetime.now()
+
+    es.reset_mock()
+    stats = dataall.tasks.catalog_indexer.incremental_index_objects(engine=db, es=es)
+    assert stats['datasets']['indexed'] == 1
+    assert stats['tables']['indexed'] == 0
+    assert stats['folders']['indexed'] == 0
+    assert stats['deleted']['indexed'] == 1
+    assert es.bulk.mock_calls[-1].kwargs['body'] == [
+        {'delete': {'_index': 'dataall-index', '_id': table.tableUri}}
+    ]
+    with db.scoped_session() as session:
+        last_run = dataall.tasks.catalog_indexer.get_last_indexing_run(session)
+        assert last_run.payload['mode'] == 'incremental'
@@ -73,3 +73,119 @@ def test_stacks_update(db, org, env, sync_dataset, mocker):
     )
     assert len(envs) == 1
     assert len(datasets) == 1
+
+
+def test_stacks_update_concurrently(db, org, env, sync_dataset, mocker):
+    with db.scoped_session() as session:
+        for target_uri, target_type in [
+            (env.environmentUri, 'environment'),
+            (sync_dataset.datasetUri, 'dataset'),
+        ]:
+            session.add(
+                dataall.db.models.Stack(
+                    targetUri=target_uri,
+                    accountid='123456789012',
+                    region='eu-west-1',
+                    stack=target_type,
+                    payload={},
+                )
+            )
+        stack_uris = {
+            s.targetUri: s.stackUri for s in session.query(dataall.db.models.Stack)
+        }
+    mocker.patch(
+        'dataall.tasks.stacks_updater.Parameter.get_parameter', return_value='cluster'
+    )
+    mocker.patch(
+        'dataall.tasks.stacks_updater.Ecs.get_running_task_arns', return_value=[]
+    )
+    started = []
+
+    def run_cdkproxy_task(stack_uri, force=False):
+        started.append(stack_uri)
+        return f'arn:{stack_uri}'
+
+    mocker.patch(
+        'dataall.tasks.stacks_updater.Ecs.run_cdkproxy_task',
+        side_effect=run_cdkproxy_task,
+    )
+    described = []
+
+    def describe_tasks(cluster_name, task_arns):
+        described.append(sorted(task_arns))
+        return {
+            arn: {'taskArn': arn, 'lastStatus': 'STOPPED', 'containers': [{'exitCode': 0}]}
+            for arn in task_arns
+        }
+
+    mocker.patch(
+        'dataall.tasks.stacks_updater.Ecs.describe_tasks', side_effect=describe_tasks
+    )
+    report = dataall.tasks.stacks_updater.update_stacks_concurrently(
+        engine=db, envname='local', poll_interval=0
+    )
+    env_stack = stack_uris[env.environmentUri]
+    dataset_stack = stack_uris[sync_dataset.datasetUri]
+    assert started == [env_stack, dataset_stack]
+    assert described == [[f'arn:{env_stack}'], [f'arn:{dataset_stack}']]
+    assert [entry['status'] for entry in report] == ['updated', 'updated']
+
+    def skip_dataset_deployment(cluster_name, task_arns):
+        with db.scoped_session() as session:
+            stack = session.query(dataall.db.models.Stack).get(dataset_stack)
+            stack.deploySkipped = f'arn:{dataset_stack}' in task_arns
+        return describe_tasks(cluster_name, task_arns)
+
+    mocker.patch(
+        'dataall.tasks.stacks_updater.Ecs.describe_tasks',
+        side_effect=skip_dataset_deployment,
+    )
+    report = dataall.tasks.stacks_updater.update_stacks_concurrently(
+        engine=db, envname='local', poll_interval=0
+    )
+    assert [entry['status'] for entry in report] == ['updated', 'unchanged']
+
+    # a flag left by a previous run is reset when the update starts
+    mocker.patch(
+        'dataall.tasks.stacks_updater.Ecs.describe_tasks', side_effect=describe_tasks
+    )
+    report = dataall.tasks.stacks_updater.update_stacks_concurrently(
+        engine=db, envname='local', poll_interval=0
+    )
+    assert [entry['status'] for entry in report] == ['updated', 'updated']
+
+    mocker.patch(
+        'dataall.tasks.stacks_updater.Ecs.describe_tasks',
+        return_value={f'arn:{env_stack}': {'lastStatus': 'RUNNING'}},
+    )
+    report = dataall.tasks.stacks_updater.update_stacks_concurrently(
+        engine=db, envname='local', poll_interval=0, timeout=0
+    )
+    assert [entry['status'] for entry in report] == ['timeout', 'failed']
+    assert report[1]['error'] == 'Task not found'
+
+    # a timed out task keeps its deployment slot until it stops
+    env_polls = []
+
+    def stop_env_task_on_third_poll(cluster_name, task_arns):
+        described.append(sorted(task_arns))
+        tasks = describe_tasks(cluster_name, task_arns)
+        if f'arn:{env_stack}' in task_arns:
+            env_polls.append(started[:])
+            if len(env_polls) < 3:
+                tasks[f'arn:{env_stack}'] = {'lastStatus': 'RUNNING'}
+        return tasks
+
+    started.clear()
+    described.clear()
+    mocker.patch(
+        'dataall.tasks.stacks_updater.Ecs.describe_tasks',
+        side_effect=stop_env_task_on_third_poll,
+    )
+    report = dataall.tasks.stacks_updater.update_stacks_concurrently(
+        engine=db, envname='local', max_deployments=1, poll_interval=0, timeout=0
+    )
+    assert [entry['status'] for entry in report] == ['timeout', 'updated']
+    assert env_polls == [[env_stack]] * 3
+    assert started == [env_stack, dataset_stack]
+    assert described[-1] == [f'arn:{dataset_stack}']
@@ -1,3 +1,5 @@
+import json
+
 import pytest
 
 import dataall
@@ -150,3 +152,106 @@ def test_subscriptions(org, env, otherenv, db, dataset, share, mocker):
     queues = subscriber.get_queues(envs)
     assert queues
     assert subscriber.notify_consumers(db, messages)
+
+
+def test_poll_queues_concurrently(db, env, otherenv, share, mocker):
+    mocker.patch(
+        'dataall.tasks.subscriptions.subscription_service.SubscriptionService.sns_call',
+        return_value=True,
+    )
+    notify_consumers = mocker.spy(
+        dataall.tasks.subscriptions.SubscriptionService, 'notify_consumers'
+    )
+    body = json.dumps(
+        {
+            'Message': json.dumps(
+                {
+                    'prefix': 's3://dataset/testtable/csv/',
+                    'accountid': '123456789012',
+                    'region': 'eu-west-1',
+                }
+            )
+        }
+    )
+    sqs = mocker.MagicMock()
+    # one full batch, a malformed message, then an empty long poll
+    sqs.receive_message.side_effect = [
+        {
+            'Messages': [
+                {'Body': body, 'ReceiptHandle': f'handle-{i}'} for i in range(10)
+            ]
+        },
+        {'Messages': [{'Body': 'not json', 'ReceiptHandle': 'handle-bad'}]},
+        {},
+    ]
+    sqs.delete_message_batch.side_effect = lambda QueueUrl, Entries: {
+        'Successful': [{'Id': e['Id']} for e in Entries]
+    }
+    clients = mocker.MagicMock()
+    clients.client.return_value = sqs
+
+    queue = dataall.tasks.subscriptions.SubscriptionService.get_queues([env])[0]
+    report = dataall.tasks.subscriptions.SubscriptionService.poll_and_notify_consumers(
+        db, [queue], max_workers=4, wait_time_seconds=5, clients=clients
+    )
+
+    assert report == [
+        {'url': queue['url'], 'received': 11, 'consumed': 10, 'deleted': 10}
+    ]
+    assert sqs.receive_message.call_count == 3
+    assert sqs.receive_message.call_args.kwargs['WaitTimeSeconds'] == 5
+    # the ten messages are deleted with one call, the malformed one is kept
+    sqs.delete_message_batch.assert_called_once()
+    notify_consumers.assert_called_once()
+    assert len(notify_consumers.call_args.args[1]) == 10
+
+
+def test_prefix_index_routes_messages(db, dataset, share):
+    index = dataall.tasks.subscriptions.prefix_index.S3PrefixIndex(
+        refresh_interval=0
+    )
+    DatasetTable = dataall.db.models.DatasetTable
+    message = {
+        'prefix': 's3://dataset/testtable/',
+        'accountid': '123456789012',
+        'region': 'eu-west-1',
+    }
+    with db.scoped_session() as session:
+        index.build(session)
+        assert index.lookup(DatasetTable, *message.values()) == 'foo'
+        assert not index.lookup(
+            DatasetTable, 's3://dataset/other', '123456789012', 'eu-west-1'
+        )
+        assert not index.lookup(
+            DatasetTable, message['prefix'], '111111111111', 'eu-west-1'
+        )
+
+        location = dataall.db.models.DatasetStorageLocation(
+            datasetUri=dataset.datasetUri,
+            label='folder',
+            owner='alice',
+            AWSAccountId='123456789012',
+            S3BucketName='dataset',
+            S3Prefix='s3://dataset/testtable/folder',
+            region='eu-west-1',
+        )
+        session.add(location)
+        session.commit()
+
+        other = {**message, 'prefix': 's3://dataset/nothing/'}
+        routes = index.route(session, [message, other])
+        assert [route.item for route in routes] == [
+            session.query(DatasetTable).get('foo'),
+            location,
+        ]
+        assert routes[0].dataset.datasetUri == dataset.datasetUri
+        assert [item.itemUri for item in routes[0].share_items] == ['foo']
+        assert routes[1].share_items == []
+
+        session.delete(location)
+        session.commit()
+        routes = index.route(session, [message])
+        assert [route.item.tableUri for route in routes] == ['foo']
+        assert not index.lookup(
+            dataall.db.models.DatasetStorageLocation, *message.values()
+        )
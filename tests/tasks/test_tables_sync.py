@@ -1,4 +1,5 @@
 import pytest
+from botocore.exceptions import ClientError
 import dataall
 from dataall.api.constants import OrganisationUserRole
 
@@ -150,7 +151,7 @@ def _test_tables_sync(db, org, env, sync_dataset, table, mocker):
         'dataall.tasks.tables_syncer.is_assumable_pivot_role', return_value=True
     )
     mocker.patch(
-        'dataall.aws.handlers.glue.Glue.grant_principals_all_table_permissions',
+        'dataall.aws.handlers.glue.Glue.grant_principals_all_tables_permissions',
         return_value=True,
     )
 
@@ -164,3 +165,59 @@ def _test_tables_sync(db, org, env, sync_dataset, table, mocker):
         )
         assert saved_table
         assert saved_table.GlueTableName == 'table1'
+
+
+def test_tables_sync_skips_unassumable_environment(db, sync_dataset, mocker):
+    mocker.patch(
+        'dataall.tasks.tables_syncer.is_assumable_pivot_role', return_value=False
+    )
+    list_tables = mocker.patch(
+        'dataall.aws.handlers.glue.Glue.list_glue_database_tables'
+    )
+    alarm = mocker.patch(
+        'dataall.utils.alarm_service.AlarmService.trigger_dataset_sync_failure_alarm'
+    )
+    processed_tables = dataall.tasks.tables_syncer.sync_tables(engine=db)
+    assert processed_tables == []
+    list_tables.assert_not_called()
+    alarm.assert_not_called()
+
+
+def test_tables_sync_concurrently(db, org, env, sync_dataset, table, mocker):
+    throttled = ClientError(
+        {'Error': {'Code': 'ThrottlingException', 'Message': 'Rate exceeded'}},
+        'GetTables',
+    )
+    list_tables = mocker.patch(
+        'dataall.aws.handlers.glue.Glue.list_glue_database_tables',
+        side_effect=lambda accountid, database, region: (
+            [{'Name': 'table1', 'DatabaseName': database}]
+            if list_tables.call_count > 1
+            else _raise(throttled)
+        ),
+    )
+    mocker.patch(
+        'dataall.tasks.tables_syncer.is_assumable_pivot_role', return_value=True
+    )
+    mocker.patch(
+        'dataall.aws.handlers.glue.Glue.grant_principals_all_tables_permissions',
+        return_value=True,
+    )
+    mocker.patch('dataall.db.api.DatasetTable.sync')
+    mocker.patch(
+        'dataall.aws.handlers.sts.SessionHelper.get_delegation_role_arn',
+        return_value='arn:aws:iam::123456789012:role/dataallPivotRole',
+    )
+
+    report = dataall.tasks.tables_syncer.sync_tables_concurrently(
+        engine=db, max_workers=4, max_per_account=2, backoff_base=0
+    )
+    entry = next(e for e in report if e['datasetUri'] == sync_dataset.datasetUri)
+    assert entry['status'] == 'synced'
+    assert entry['tables'] == 1
+    assert entry['AwsAccountId'] == sync_dataset.AwsAccountId
+    assert list_tables.call_count >= 2
+
+
+def _raise(error):
+    raise error
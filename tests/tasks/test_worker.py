@@ -0,0 +1,84 @@
+import json
+import threading
+import time
+
+import dataall
+from dataall.aws.handlers.service_handlers import WorkerHandler
+from dataall.aws.handlers.sqs import SqsQueue
+
+
+def create_tasks(db, actions):
+    with db.scoped_session() as session:
+        tasks = [dataall.db.models.Task(action=a, targetUri='target') for a in actions]
+        session.add_all(tasks)
+        session.commit()
+        return [t.taskUri for t in tasks]
+
+
+def get_statuses(db, task_ids):
+    with db.scoped_session() as session:
+        return [session.query(dataall.db.models.Task).get(t).status for t in task_ids]
+
+
+def test_process_runs_every_task(db):
+    worker = WorkerHandler()
+    worker.handler('test.ok')(lambda engine, task: {'uri': task.taskUri})
+    worker.handler('test.fail')(lambda engine, task: 1 / 0)
+    task_ids = create_tasks(db, ['test.ok', 'test.fail', 'test.ok', 'test.unknown'])
+
+    responses = worker.process(engine=db, task_ids=task_ids)
+
+    assert [r['taskUri'] for r in responses] == task_ids[:3]
+    assert [r['status'] for r in responses] == ['completed', 'failed', 'completed']
+    assert get_statuses(db, task_ids) == ['completed', 'failed', 'completed', 'pending']
+    # tasks already claimed are not run twice
+    assert worker.process(engine=db, task_ids=task_ids) == []
+
+
+def test_process_messages_concurrently(db):
+    worker = WorkerHandler()
+    threads = set()
+
+    def handle(engine, task):
+        threads.add(threading.get_ident())
+        with engine.scoped_session() as session:
+            return {'status': session.query(dataall.db.models.Task).get(task.taskUri).status}
+
+    worker.handler('test.concurrent')(handle)
+    task_ids = create_tasks(db, ['test.concurrent'] * 6)
+    messages = {f'm{i}': json.dumps([t]) for i, t in enumerate(task_ids)}
+    messages['broken'] = 'not json'
+
+    failures = worker.process_messages(engine=db, messages=messages, max_workers=3)
+
+    assert failures == ['broken']
+    assert get_statuses(db, task_ids) == ['completed'] * 6
+    assert len(threads) > 1
+
+
+def test_process_messages_within_time_budget(db):
+    worker = WorkerHandler()
+    worker.handler('test.slow')(lambda engine, task: time.sleep(0.2))
+    task_ids = create_tasks(db, ['test.slow'] * 3)
+    messages = {'m0': json.dumps(task_ids[:2]), 'm1': json.dumps(task_ids[2:])}
+
+    failures = worker.process_messages(
+        engine=db, messages=messages, max_workers=1, deadline=time.monotonic() + 0.1
+    )
+
+    assert failures == ['m0', 'm1']
+    # tasks that were not started are left pending for the redelivery
+    assert get_statuses(db, task_ids) == ['completed', 'pending', 'pending']
+
+
+def test_sqs_send_batches(mocker):
+    client = mocker.MagicMock()
+    client.send_message_batch.return_value = {'Successful': []}
+    mocker.patch.object(SqsQueue, 'get_sqs_client', return_value=client)
+    mocker.patch('dataall.utils.Parameter.get_parameter', return_value='queue-url')
+
+    SqsQueue.send(engine=None, task_ids=[f't{i}' for i in range(12)])
+
+    calls = client.send_message_batch.call_args_list
+    assert [len(c.kwargs['Entries']) for c in calls] == [10, 2]
+    assert json.loads(calls[1].kwargs['Entries'][1]['MessageBody']) == ['t11']
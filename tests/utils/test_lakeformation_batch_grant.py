@@ -0,0 +1,108 @@
+import pytest
+from botocore.exceptions import ClientError
+
+from dataall.aws.handlers.lakeformation import LakeFormation
+
+
+class FakeLakeFormationClient:
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = []
+
+    def batch_grant_permissions(self, CatalogId, Entries):
+        self.calls.append([entry['Id'] for entry in Entries])
+        failures = []
+        for entry in Entries:
+            code = self.failures.get(entry['Principal']['DataLakePrincipalIdentifier'])
+            if code:
+                failures.append(
+                    {'RequestEntry': entry, 'Error': {'ErrorCode': code, 'ErrorMessage': code}}
+                )
+        return {'Failures': failures}
+
+
+def grant_entries(count):
+    return [
+        {
+            'Principal': {'DataLakePrincipalIdentifier': f'principal-{i}'},
+            'Resource': {'Table': {'DatabaseName': 'db', 'Name': f'table-{i}'}},
+            'Permissions': ['ALL'],
+        }
+        for i in range(count)
+    ]
+
+
+def test_batch_grant_chunks_entries():
+    client = FakeLakeFormationClient(failures={})
+    calls = LakeFormation.batch_grant_permissions(client, '111111111111', grant_entries(45))
+    assert calls == 3
+    assert [len(ids) for ids in client.calls] == [20, 20, 5]
+
+
+def test_batch_grant_retries_only_failed_entries():
+    client = FakeLakeFormationClient(
+        failures={'principal-3': 'ConcurrentModificationException'}
+    )
+    with pytest.raises(ClientError):
+        LakeFormation.batch_grant_permissions(
+            client, '111111111111', grant_entries(5), max_attempts=3, backoff=0
+        )
+    assert [len(ids) for ids in client.calls] == [5, 1, 1]
+    assert client.calls[1] == client.calls[2]
+
+
+def test_batch_grant_does_not_retry_invalid_entries():
+    client = FakeLakeFormationClient(failures={'principal-0': 'InvalidInputException'})
+    with pytest.raises(ClientError):
+        LakeFormation.batch_grant_permissions(
+            client, '111111111111', grant_entries(2), backoff=0
+        )
+    assert len(client.calls) == 1
+
+
+def test_batch_grant_keeps_permanent_failures_while_retrying():
+    client = FakeLakeFormationClient(
+        failures={
+            'principal-0': 'InvalidInputException',
+            'principal-1': 'ConcurrentModificationException',
+        }
+    )
+    with pytest.raises(ClientError) as e:
+        LakeFormation.batch_grant_permissions(
+            client, '111111111111', grant_entries(3), max_attempts=2, backoff=0
+        )
+    assert [len(ids) for ids in client.calls] == [3, 1]
+    assert 'InvalidInputException' in str(e.value)
+
+
+def test_batch_grant_retries_throttled_calls():
+    client = FakeLakeFormationClient(failures={})
+    batch_grant = client.batch_grant_permissions
+
+    def throttle_first_call(CatalogId, Entries):
+        if not client.calls:
+            client.calls.append([entry['Id'] for entry in Entries])
+            raise ClientError(
+                {'Error': {'Code': 'ThrottlingException', 'Message': 'Rate exceeded'}},
+                'BatchGrantPermissions',
+            )
+        return batch_grant(CatalogId, Entries)
+
+    client.batch_grant_permissions = throttle_first_call
+    calls = LakeFormation.batch_grant_permissions(
+        client, '111111111111', grant_entries(5), backoff=0
+    )
+    assert calls == 2
+    assert client.calls[0] == client.calls[1]
+
+
+def test_grant_all_tables_permissions_raises_failures(mocker):
+    from dataall.aws.handlers.glue import Glue
+
+    table = mocker.Mock(
+        AWSAccountId='111111111111', region='eu-west-1', GlueDatabaseName='db'
+    )
+    table.name = 'table'
+    client = FakeLakeFormationClient(failures={'role': 'InvalidInputException'})
+    with pytest.raises(ClientError):
+        Glue.grant_principals_all_tables_permissions([table], ['role'], client=client)
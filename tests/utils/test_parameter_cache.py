@@ -0,0 +1,54 @@
+from dataall.utils import Parameter, ParameterCache
+
+
+class FakeSsm:
+    def __init__(self, values):
+        self.values = values
+        self.calls = []
+
+    def get_parameters(self, Names):
+        self.calls.append(Names)
+        return {
+            'Parameters': [
+                {'Name': n, 'Value': self.values[n]} for n in Names if n in self.values
+            ],
+            'InvalidParameters': [n for n in Names if n not in self.values],
+        }
+
+
+def test_parameter_cache_ttl_and_invalidation(mocker):
+    ssm = FakeSsm({'/dataall/test/sqs/queue_url': 'url'})
+    mocker.patch('boto3.client', return_value=ssm)
+    now = [0]
+    cache = ParameterCache(ttl=60, clock=lambda: now[0])
+
+    assert cache.get_parameter('/dataall/test/sqs/queue_url') == 'url'
+    assert cache.get_parameter('/dataall/test/sqs/queue_url') == 'url'
+    assert cache.get_parameter('/dataall/test/missing') is None
+    assert cache.get_parameter('/dataall/test/missing') is None
+    assert len(ssm.calls) == 2
+
+    cache.invalidate('/dataall/test/sqs/queue_url')
+    assert cache.get_parameter('/dataall/test/sqs/queue_url') == 'url'
+    now[0] = 61
+    assert cache.get_parameter('/dataall/test/sqs/queue_url') == 'url'
+    assert len(ssm.calls) == 4
+    assert cache.client('ssm') is cache.client('ssm')
+
+
+def test_parameter_prefetches_known_paths(mocker):
+    ssm = FakeSsm(
+        {
+            '/dataall/test/sqs/queue_url': 'url',
+            '/dataall/test/ecs/cluster/name': 'cluster',
+        }
+    )
+    mocker.patch('boto3.client', return_value=ssm)
+    cache = ParameterCache(ttl=60)
+    mocker.patch('dataall.utils.parameter.parameter_cache', cache)
+
+    assert Parameter.get_parameter(env='test', path='sqs/queue_url') == 'url'
+    assert Parameter.get_parameter(env='test', path='ecs/cluster/name') == 'cluster'
+    assert Parameter.get_parameter(env='test', path='pivotRole/externalId') is None
+    assert len(ssm.calls) == 2
+    assert all(len(names) <= 10 for names in ssm.calls)
@@ -0,0 +1,157 @@
+from types import SimpleNamespace
+
+import pytest
+
+from dataall.aws.handlers.redshift import GlueSchemaCache, Redshift
+
+
+class FakeRedshiftDataClient:
+    def __init__(self, describe_calls=2, status='FINISHED'):
+        self.describe_calls = describe_calls
+        self.status = status
+        self.batches = {}
+        self.described = 0
+
+    def batch_execute_statement(self, ClusterIdentifier, Database, DbUser, Sqls):
+        statement_id = f'{ClusterIdentifier}-statement'
+        self.batches[statement_id] = Sqls
+        return {'Id': statement_id}
+
+    def describe_statement(self, Id):
+        self.described += 1
+        if self.described < self.describe_calls:
+            return {'Id': Id, 'Status': 'STARTED'}
+        return {
+            'Id': Id,
+            'Status': self.status,
+            'Duration': 3_000_000_000,
+            'SubStatements': [
+                {'QueryString': sql, 'Status': self.status, 'Duration': 1_000_000}
+                for sql in self.batches[Id]
+            ],
+        }
+
+
+def cluster(name):
+    return SimpleNamespace(
+        clusterUri=f'{name}-uri',
+        name=name,
+        AwsAccountId='111111111111',
+        region='eu-west-1',
+        databaseName='dev',
+        databaseUser='datahubuser',
+    )
+
+
+@pytest.fixture
+def client(mocker):
+    client = FakeRedshiftDataClient()
+    session = mocker.MagicMock()
+    session.client.return_value = client
+    mocker.patch(
+        'dataall.aws.handlers.redshift.SessionHelper.remote_session',
+        return_value=session,
+    )
+    yield client
+
+
+def test_copy_statements_run_in_one_batch_per_cluster(client):
+    statements = Redshift.get_copy_statements(
+        'sales', 'orders', 'datahubuser', 's3://bucket/orders', 'arn:role', 'id int'
+    )
+    assert statements[-2:] == [
+        'GRANT ALL ON TABLE sales.orders TO datahubuser',
+        'GRANT ALL ON TABLE sales.orders TO GROUP PUBLIC',
+    ]
+    assert not [s for s in statements if s in ('begin transaction', 'end transaction')]
+
+    report = Redshift.batch_execute_statements(
+        [(cluster('c1'), statements), (cluster('c2'), statements)], poll_interval=0
+    )
+    assert sorted(client.batches) == ['c1-statement', 'c2-statement']
+    assert [entry['status'] for entry in report] == ['FINISHED', 'FINISHED']
+    assert report[0]['duration'] == 3
+    assert [s['sql'] for s in report[0]['statements']] == statements
+    assert report[0]['statements'][0]['duration'] == 0.001
+
+
+def test_failed_and_timed_out_batches_are_reported(client):
+    client.status = 'FAILED'
+    report = Redshift.batch_execute_statements(
+        [(cluster('c1'), ['SELECT 1'])], poll_interval=0
+    )
+    assert report[0]['status'] == 'FAILED'
+
+    client.described, client.describe_calls = 0, 1000
+    report = Redshift.batch_execute_statements(
+        [(cluster('c1'), ['SELECT 1'])], poll_interval=0, timeout=0
+    )
+    assert report[0]['status'] == 'TIMEOUT'
+
+
+def test_copy_data_fails_when_a_cluster_fails(client, mocker):
+    engine = mocker.MagicMock()
+    session = engine.scoped_session.return_value.__enter__.return_value
+    session.query.return_value.filter.return_value.all.return_value = [cluster('c1')]
+    mocker.patch(
+        'dataall.db.api.Dataset.get_dataset_by_uri',
+        return_value=SimpleNamespace(datasetUri='dataset', name='dataset'),
+    )
+    mocker.patch(
+        'dataall.db.api.DatasetTable.get_dataset_table_by_uri',
+        return_value=SimpleNamespace(tableUri='table', GlueTableName='orders'),
+    )
+    mocker.patch(
+        'dataall.db.api.RedshiftCluster.get_cluster_dataset_table',
+        return_value=SimpleNamespace(schema='sales', dataLocation='s3://bucket/orders'),
+    )
+    mocker.patch(
+        'dataall.aws.handlers.redshift.glue_schema_cache.get_columns',
+        return_value=([{'Name': 'id', 'Type': 'int'}], '2'),
+    )
+    mocker.patch('dataall.aws.handlers.redshift.STATEMENT_POLL_INTERVAL', 0)
+    task = SimpleNamespace(
+        targetUri='env',
+        payload={
+            'datasetUri': 'dataset',
+            'tableUri': 'table',
+            'message': {'prefix': 's3://bucket/orders'},
+        },
+    )
+
+    response = Redshift.copy_data(engine, task)
+    assert response['glueTableVersion'] == '2'
+    assert response['clusters'][0]['status'] == 'FINISHED'
+
+    client.described, client.status = 0, 'FAILED'
+    with pytest.raises(Exception, match='failed on 1 of 1 clusters'):
+        Redshift.copy_data(engine, task)
+
+
+def test_glue_schema_is_cached_per_table_version(mocker):
+    table_exists = mocker.patch(
+        'dataall.aws.handlers.redshift.Glue.table_exists',
+        return_value={
+            'Table': {
+                'VersionId': '2',
+                'StorageDescriptor': {'Columns': [{'Name': 'id', 'Type': 'int'}]},
+            }
+        },
+    )
+    cache = GlueSchemaCache(ttl=300)
+    table = SimpleNamespace(
+        AWSAccountId='111111111111',
+        region='eu-west-1',
+        GlueDatabaseName='db',
+        GlueTableName='orders',
+        created='2022-01-01',
+        updated='2022-01-01',
+    )
+    assert cache.get_columns(table) == ([{'Name': 'id', 'Type': 'int'}], '2')
+    assert cache.get_columns(table)[1] == '2'
+    assert table_exists.call_count == 1
+
+    table.updated = '2022-01-02'
+    cache.get_columns(table)
+    assert table_exists.call_count == 2
+    assert (cache.hits, cache.misses) == (1, 2)
@@ -0,0 +1,49 @@
+import datetime
+
+from dateutil.tz import tzutc
+
+from dataall.aws.handlers import sts
+from dataall.aws.handlers.sts import SessionHelper, RemoteSessionCache
+
+
+class FakeSts:
+    def __init__(self, lifetime):
+        self.lifetime = lifetime
+        self.calls = 0
+
+    def assume_role(self, **kwargs):
+        self.calls += 1
+        return {
+            'Credentials': {
+                'AccessKeyId': f'key-{self.calls}',
+                'SecretAccessKey': 'secret',
+                'SessionToken': 'token',
+                'Expiration': datetime.datetime.now(tzutc()) + self.lifetime,
+            }
+        }
+
+
+def test_remote_session_is_cached_and_refreshed(mocker):
+    fake_sts = FakeSts(lifetime=datetime.timedelta(minutes=5))
+    base_session = mocker.MagicMock()
+    base_session.client.return_value = fake_sts
+    mocker.patch.object(SessionHelper, 'get_session', return_value=base_session)
+    mocker.patch.object(SessionHelper, 'get_external_id_secret', return_value=None)
+    mocker.patch.object(SessionHelper, 'get_delegation_role_name', return_value='pivot')
+    cache = RemoteSessionCache()
+    mocker.patch.object(sts, 'REMOTE_SESSIONS', cache)
+
+    session = SessionHelper.remote_session(accountid='111111111111')
+    assert SessionHelper.remote_session(accountid='111111111111') is session
+    assert SessionHelper.remote_session(accountid='222222222222') is not session
+    assert fake_sts.calls == 2
+    assert session.client('s3', region_name='eu-west-1') is session.client(
+        's3', region_name='eu-west-1'
+    )
+
+    # credentials expiring within the mandatory refresh window are renewed
+    assert session.get_credentials().get_frozen_credentials().access_key == 'key-3'
+    assert cache.stats() == {'hits': 1, 'misses': 2, 'refreshes': 1, 'size': 2}
+
+    cache.invalidate('111111111111')
+    assert SessionHelper.remote_session(accountid='111111111111') is not session